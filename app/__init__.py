@@ -7,12 +7,14 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from flask_migrate import Migrate
+from flask_caching import Cache
 from config import config
 
 # Initialize extensions
 db = SQLAlchemy()
 jwt = JWTManager()
 migrate = Migrate()
+cache = Cache()
 
 def create_app(config_name='development'):
     """
@@ -33,10 +35,17 @@ def create_app(config_name='development'):
     db.init_app(app)
     jwt.init_app(app)
     migrate.init_app(app, db)
+    cache.init_app(app)
+    
+    from app.jobs import jobs
+    jobs.init_app(app)
+    
+    from app import json_provider
+    json_provider.init_app(app)
     CORS(app)
     
     # Register blueprints
-    from app.api import stakeholders_bp, interactions_bp, tasks_bp, campaigns_bp, relationships_bp, auth_bp
+    from app.api import stakeholders_bp, interactions_bp, tasks_bp, campaigns_bp, relationships_bp, auth_bp, jobs_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(stakeholders_bp, url_prefix='/api/stakeholders')
@@ -44,10 +53,47 @@ def create_app(config_name='development'):
     app.register_blueprint(tasks_bp, url_prefix='/api/tasks')
     app.register_blueprint(campaigns_bp, url_prefix='/api/campaigns')
     app.register_blueprint(relationships_bp, url_prefix='/api/relationships')
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
+    
+    # Register CLI commands
+    from app.cli import register_commands
+    register_commands(app)
+    
+    from app.api.pagination import InvalidCursorError
+    from app.models.serialization import InvalidFieldsError, compile_serializers
+    from app.models.tag import InvalidTagsError
+    from app.services.tag_service import InvalidTagMatchError
+    
+    # Build the model serializers now rather than on the first request
+    compile_serializers()
+    
+    @app.errorhandler(InvalidCursorError)
+    def invalid_cursor(error):
+        return {'error': str(error)}, 400
+    
+    @app.errorhandler(InvalidFieldsError)
+    def invalid_fields(error):
+        return {'error': str(error)}, 400
+    
+    @app.errorhandler(InvalidTagsError)
+    def invalid_tags(error):
+        # Usually raised while flushing the tag links: discard the flush
+        db.session.rollback()
+        return {'error': str(error)}, 400
+    
+    @app.errorhandler(InvalidTagMatchError)
+    def invalid_tag_match(error):
+        return {'error': str(error)}, 400
     
     # Health check endpoint
     @app.route('/health')
     def health():
         return {'status': 'healthy', 'service': 'stakeholder-platform'}, 200
     
+    # Cache hit/miss counters for this worker process
+    @app.route('/health/cache')
+    def cache_health():
+        from app.caching import stats
+        return stats.snapshot(), 200
+    
     return app
@@ -11,9 +11,10 @@ interactions_bp = Blueprint('interactions', __name__)
 tasks_bp = Blueprint('tasks', __name__)
 campaigns_bp = Blueprint('campaigns', __name__)
 relationships_bp = Blueprint('relationships', __name__)
+jobs_bp = Blueprint('jobs', __name__)
 
 # Import routes after blueprint creation to avoid circular imports
-from app.api import auth, stakeholders, interactions, tasks, campaigns, relationships
+from app.api import auth, stakeholders, interactions, tasks, campaigns, relationships, jobs
 
 __all__ = [
     'auth_bp',
@@ -21,5 +22,6 @@ __all__ = [
     'interactions_bp',
     'tasks_bp',
     'campaigns_bp',
-    'relationships_bp'
+    'relationships_bp',
+    'jobs_bp'
 ]
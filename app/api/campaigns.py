@@ -5,41 +5,79 @@ HP 10-step stakeholder engagement framework
 from flask import request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.api import campaigns_bp
-from app.models.campaign import Campaign
+from app.api.conditional import namespace_version, not_modified, row_version, with_version
+from app.api.fieldsets import request_fields, select_fields
+from app.api.pagination import paginate, sort_key
+from app.models.campaign import Campaign, campaign_stakeholders
 from app.models.stakeholder import Stakeholder
 from app import db
 
 @campaigns_bp.route('', methods=['GET'])
 @jwt_required()
 def list_campaigns():
-    """List campaigns"""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 50, type=int)
+    """
+    List campaigns
+    
+    Supports conditional requests (ETag / If-None-Match).
+    """
+    fields = request_fields(Campaign)
+    version = namespace_version('campaigns', 'stakeholders')
+    unchanged = not_modified(version)
+    if unchanged:
+        return unchanged
+    
     status = request.args.get('status')
     phase = request.args.get('phase')
     
-    query = Campaign.query
+    query = select_fields(Campaign.query, Campaign, fields, Campaign.created_at)
     
     if status:
         query = query.filter_by(status=status)
     if phase:
         query = query.filter_by(phase=phase)
     
-    query = query.order_by(Campaign.created_at.desc())
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    page = paginate(query, [
+        sort_key(Campaign.created_at, descending=True),
+        sort_key(Campaign.id, descending=True)
+    ])
     
-    return jsonify({
-        'campaigns': [c.to_dict(include_stakeholders=True) for c in pagination.items],
-        'total': pagination.total,
-        'pages': pagination.pages
-    }), 200
+    return with_version(jsonify({
+        'campaigns': [c.to_dict(include_stakeholders=True, fields=fields) for c in page.items],
+        **page.meta()
+    }), version), 200
 
 @campaigns_bp.route('/<int:id>', methods=['GET'])
 @jwt_required()
 def get_campaign(id):
-    """Get campaign by ID"""
-    campaign = Campaign.query.get_or_404(id)
-    return jsonify({'campaign': campaign.to_dict(include_stakeholders=True)}), 200
+    """
+    Get campaign by ID
+    
+    Supports conditional requests (ETag / If-None-Match, Last-Modified /
+    If-Modified-Since).
+    """
+    fields = request_fields(Campaign)
+    columns = [Campaign.updated_at]
+    if Campaign.wants(fields, 'stakeholders') or Campaign.wants(fields, 'stakeholder_count'):
+        # Any membership change alters the link count or the newest added_at
+        links = campaign_stakeholders.c
+        members = db.select(links.stakeholder_id).where(links.campaign_id == Campaign.id)
+        columns += [
+            db.select(db.func.count(links.stakeholder_id))
+            .where(links.campaign_id == Campaign.id).scalar_subquery(),
+            db.select(db.func.max(links.added_at))
+            .where(links.campaign_id == Campaign.id).scalar_subquery(),
+            db.select(db.func.max(Stakeholder.updated_at))
+            .where(Stakeholder.id.in_(members)).scalar_subquery()
+        ]
+    version = row_version(*columns, where=Campaign.id == id)
+    unchanged = not_modified(version)
+    if unchanged:
+        return unchanged
+    
+    campaign = select_fields(Campaign.query, Campaign, fields).get_or_404(id)
+    return with_version(jsonify({
+        'campaign': campaign.to_dict(include_stakeholders=True, fields=fields)
+    }), version), 200
 
 @campaigns_bp.route('', methods=['POST'])
 @jwt_required()
@@ -0,0 +1,131 @@
+"""
+Conditional GET helpers shared by the list and detail endpoints
+
+Every GET response carries a weak ETag (detail endpoints also send
+Last-Modified). A client repeating the request with If-None-Match (or
+If-Modified-Since) gets 304 Not Modified when nothing it would receive
+has changed. The version is worked out before any row is loaded or
+serialized:
+
+- Detail endpoints read updated_at of the row and of the rows it embeds
+  with one query by primary key (row_version()).
+- List endpoints use the cache namespace versions of app.caching, which
+  change whenever a write to one of the namespaces commits, so checking
+  them costs no query at all (namespace_version()). They send no
+  Last-Modified: a date cannot reflect deleted rows.
+"""
+import hashlib
+from datetime import datetime, timezone
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+from app.caching import current_versions
+from app import db
+
+class Version:
+    """
+    ETag value and optional last modification time of a response
+
+    The ETag is worked out on first use: parts given as callables (e.g.
+    a query) are only evaluated when a request validator is checked or
+    the full response is sent.
+    """
+
+    def __init__(self, parts, last_modified=None):
+        self._parts = parts
+        self._etag = None
+        self.last_modified = last_modified
+
+    @property
+    def etag(self):
+        if self._etag is None:
+            parts = [part() if callable(part) else part for part in self._parts]
+            key = repr([part.isoformat() if isinstance(part, datetime) else part for part in parts])
+            self._etag = hashlib.sha1(key.encode()).hexdigest()
+        return self._etag
+
+def make_version(*parts, last_modified=None):
+    """
+    Version of the current request's response from its data version parts
+
+    The ETag also covers the endpoint, view arguments, query string and
+    user, since those select what the response contains.
+    """
+    return Version([
+        request.endpoint,
+        sorted((request.view_args or {}).items()),
+        sorted(request.args.items(multi=True)),
+        get_jwt_identity(),
+        *parts
+    ], last_modified)
+
+def namespace_version(*namespaces, extra=()):
+    """
+    Version of a list response from the namespaces its rows come from
+
+    Args:
+        namespaces: Cache namespaces (app.caching.MODEL_NAMESPACES) of
+            the listed model and of every model it embeds
+        extra: Further version parts, e.g. for fields that change with
+            time rather than with writes; callables are only evaluated
+            when the ETag is needed
+
+    Returns:
+        Version, or None (no conditional handling) when caching is disabled
+    """
+    versions = current_versions(*namespaces)
+    if versions is None:
+        return None
+    return make_version(*versions, *extra)
+
+def row_version(*columns, where, extra=()):
+    """
+    Version of a detail response from one row of update timestamps
+
+    Args:
+        columns: Column expressions to read, e.g. Task.updated_at and
+            max(updated_at) of embedded rows
+        where: Criterion selecting the object, e.g. Task.id == id
+        extra: Further version parts
+
+    Returns:
+        Version with Last-Modified set to the newest timestamp read, or
+        None when the object does not exist (the view then answers 404)
+    """
+    row = db.session.query(*columns).filter(where).first()
+    if row is None:
+        return None
+    timestamps = [value for value in (*row, *extra) if isinstance(value, datetime)]
+    return make_version(*row, *extra, last_modified=max(timestamps, default=None))
+
+def not_modified(version):
+    """
+    304 response when the request's validators match a version
+
+    If-None-Match takes precedence; If-Modified-Since is only checked
+    without it, and only for versions with a last modification time.
+
+    Returns:
+        Response, or None when the full response must be sent
+    """
+    if version is None:
+        return None
+    if request.if_none_match:
+        matched = request.if_none_match.contains_weak(version.etag)
+    elif version.last_modified and request.if_modified_since:
+        last_modified = version.last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+        matched = last_modified <= request.if_modified_since
+    else:
+        matched = False
+    if not matched:
+        return None
+    return with_version(current_app.response_class(status=304), version)
+
+def with_version(response, version):
+    """Set a response's validators (ETag, Last-Modified) from a version"""
+    if version is not None:
+        response.set_etag(version.etag, weak=True)
+        if version.last_modified:
+            response.last_modified = version.last_modified.replace(tzinfo=timezone.utc)
+        # Clients may keep the response but must revalidate before reuse
+        response.headers['Cache-Control'] = 'private, no-cache'
+    return response
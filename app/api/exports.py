@@ -0,0 +1,42 @@
+"""
+Streaming export responses shared by the resource blueprints
+"""
+from datetime import datetime
+from flask import request, jsonify, Response, stream_with_context
+from app.services.export_service import ExportService, ExportDependencyError, FORMATS
+
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet'
+}
+
+EXPORT_EXTENSIONS = {
+    'csv': 'csv',
+    'jsonl': 'jsonl',
+    'parquet': 'parquet'
+}
+
+def export_response(resource):
+    """
+    Stream a full-table export as a file download
+    
+    Query parameters:
+        - format: 'csv' (default), 'jsonl' or 'parquet'
+    """
+    fmt = request.args.get('format', 'csv')
+    
+    if fmt not in FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(FORMATS)}"}), 400
+    
+    try:
+        chunks = ExportService.iter_export(resource, fmt)
+    except ExportDependencyError as exc:
+        return jsonify({'error': str(exc)}), 400
+    
+    filename = f"{resource}-{datetime.utcnow():%Y%m%d%H%M%S}.{EXPORT_EXTENSIONS[fmt]}"
+    return Response(
+        stream_with_context(chunks),
+        mimetype=EXPORT_MIMETYPES[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,31 @@
+"""
+Sparse fieldset helpers shared by the list and detail endpoints
+
+`?fields=id,name,organization` limits each serialized object to the
+named fields and restricts the SELECT to the columns they read (see
+app.models.serialization.SerializerMixin).
+"""
+from flask import request
+
+def request_fields(model):
+    """
+    Fieldset requested for a model, None when all fields are wanted
+    
+    Query parameters:
+        - fields: Comma-separated field names; id is always included
+    """
+    return model.parse_fields(request.args.get('fields'))
+
+def select_fields(query, model, fields, *extra_columns):
+    """
+    Load only the columns a fieldset needs
+    
+    Args:
+        query: Query over model
+        model: SerializerMixin model
+        fields: Fieldset from request_fields()
+        extra_columns: Further columns read outside to_dict(), e.g. the
+            keyset sort keys
+    """
+    options = model.load_only_options(fields, *extra_columns)
+    return query.options(*options) if options else query
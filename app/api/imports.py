@@ -0,0 +1,35 @@
+"""
+Request body helpers shared by the bulk import endpoints
+"""
+import io
+from flask import request, jsonify
+from app.services.import_service import read_records
+
+# Request content types accepted as streamed bulk input
+BULK_CONTENT_TYPES = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'jsonl',
+    'application/jsonl': 'jsonl'
+}
+
+def request_records(list_key):
+    """
+    Records of a bulk request
+    
+    Reads a streamed CSV / JSON Lines body when the content type says so,
+    otherwise the JSON list under list_key.
+    
+    Returns:
+        (records, None) with an iterable of (line, record) pairs, or
+        (None, error response)
+    """
+    fmt = BULK_CONTENT_TYPES.get(request.mimetype)
+    if fmt:
+        stream = io.TextIOWrapper(request.stream, encoding=request.mimetype_params.get('charset', 'utf-8'))
+        return read_records(stream, fmt), None
+    
+    data = request.get_json(silent=True)
+    items = data.get(list_key) if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return None, (jsonify({'error': f'{list_key} must be a non-empty list'}), 400)
+    return enumerate(items, start=1), None
@@ -5,40 +5,141 @@ Log and retrieve stakeholder interactions
 from flask import request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.api import interactions_bp
+from app.api.conditional import namespace_version, not_modified, row_version, with_version
+from app.api.fieldsets import request_fields, select_fields
+from app.api.pagination import paginate, sort_key
+from app.api.tagging import filter_by_request_tags, tag_facets_response
 from app.models.interaction import Interaction
+from app.models.stakeholder import Stakeholder
+from app.models.user import User
+from app.api.imports import request_records
+from app.api.exports import export_response
+from app.services.follow_up_service import FollowUpService
+from app.services.import_service import ImportService
+from app.services.stakeholder_service import StakeholderService
 from app import db
 
 @interactions_bp.route('', methods=['GET'])
 @jwt_required()
 def list_interactions():
-    """List interactions with filtering"""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 50, type=int)
+    """
+    List interactions with filtering
+    
+    Supports conditional requests (ETag / If-None-Match).
+    """
+    fields = request_fields(Interaction)
+    version = namespace_version('interactions', 'stakeholders', 'users')
+    unchanged = not_modified(version)
+    if unchanged:
+        return unchanged
+    
     stakeholder_id = request.args.get('stakeholder_id', type=int)
     interaction_type = request.args.get('type')
     
-    query = Interaction.query
+    query = select_fields(Interaction.query, Interaction, fields, Interaction.date).options(
+        *Interaction.eager_load_options(include_stakeholder=True, include_user=True, fields=fields)
+    )
     
     if stakeholder_id:
         query = query.filter_by(stakeholder_id=stakeholder_id)
     if interaction_type:
         query = query.filter_by(interaction_type=interaction_type)
     
-    query = query.order_by(Interaction.date.desc())
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    query = filter_by_request_tags(query, Interaction)
+    
+    page = paginate(query, [
+        sort_key(Interaction.date, descending=True),
+        sort_key(Interaction.id, descending=True)
+    ])
     
+    return with_version(jsonify({
+        'interactions': [i.to_dict(include_stakeholder=True, include_user=True, fields=fields)
+                         for i in page.items],
+        **page.meta()
+    }), version), 200
+
+@interactions_bp.route('/tags', methods=['GET'])
+@jwt_required()
+def interaction_tag_facets():
+    """Get interaction counts per tag"""
+    return tag_facets_response(Interaction)
+
+@interactions_bp.route('/follow-ups/overdue', methods=['GET'])
+@jwt_required()
+def list_overdue_follow_ups():
+    """
+    List a user's overdue follow-ups, oldest due first
+    
+    Query parameters:
+        - user_id: Whose follow-ups (default: current user)
+        - page/per_page or cursor: See app.api.pagination
+        - fields: Comma-separated fields to return (default: all)
+    
+    Supports conditional requests (ETag / If-None-Match).
+    """
+    fields = request_fields(Interaction)
+    user_id = request.args.get('user_id', type=int) or get_jwt_identity()
+    
+    # Follow-ups also join the list by falling due, without any write
+    version = namespace_version('interactions', 'stakeholders',
+                                extra=[FollowUpService.latest_overdue_date])
+    unchanged = not_modified(version)
+    if unchanged:
+        return unchanged
+    
+    query = select_fields(
+        FollowUpService.overdue_query(user_id), Interaction, fields, Interaction.follow_up_date
+    ).options(*Interaction.eager_load_options(include_stakeholder=True, fields=fields))
+    page = paginate(query, [
+        sort_key(Interaction.follow_up_date),
+        sort_key(Interaction.id)
+    ])
+    
+    return with_version(jsonify({
+        'user_id': user_id,
+        'follow_ups': [i.to_dict(include_stakeholder=True, fields=fields) for i in page.items],
+        **page.meta()
+    }), version), 200
+
+@interactions_bp.route('/follow-ups/overdue/users', methods=['GET'])
+@jwt_required()
+def overdue_follow_up_counts():
+    """Get the number of overdue follow-ups per user"""
+    counts = FollowUpService.overdue_counts_by_user()
     return jsonify({
-        'interactions': [i.to_dict(include_stakeholder=True, include_user=True) for i in pagination.items],
-        'total': pagination.total,
-        'pages': pagination.pages
+        'users': [
+            {'user_id': user_id, 'overdue_follow_ups': count}
+            for user_id, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        ]
     }), 200
 
 @interactions_bp.route('/<int:id>', methods=['GET'])
 @jwt_required()
 def get_interaction(id):
-    """Get interaction by ID"""
-    interaction = Interaction.query.get_or_404(id)
-    return jsonify({'interaction': interaction.to_dict(include_stakeholder=True, include_user=True)}), 200
+    """
+    Get interaction by ID
+    
+    Supports conditional requests (ETag / If-None-Match, Last-Modified /
+    If-Modified-Since).
+    """
+    fields = request_fields(Interaction)
+    version = row_version(
+        Interaction.updated_at,
+        db.select(Stakeholder.updated_at).where(
+            Stakeholder.id == Interaction.stakeholder_id).scalar_subquery(),
+        db.select(User.updated_at).where(User.id == Interaction.user_id).scalar_subquery(),
+        where=Interaction.id == id
+    )
+    unchanged = not_modified(version)
+    if unchanged:
+        return unchanged
+    
+    interaction = select_fields(Interaction.query, Interaction, fields).options(
+        *Interaction.eager_load_options(include_stakeholder=True, include_user=True, fields=fields)
+    ).get_or_404(id)
+    return with_version(jsonify({
+        'interaction': interaction.to_dict(include_stakeholder=True, include_user=True, fields=fields)
+    }), version), 200
 
 @interactions_bp.route('', methods=['POST'])
 @jwt_required()
@@ -63,6 +164,8 @@ def create_interaction():
             setattr(interaction, field, data[field])
     
     db.session.add(interaction)
+    db.session.flush()
+    StakeholderService.update_relationship_health(interaction.stakeholder_id, commit=False)
     db.session.commit()
     
     return jsonify({
@@ -70,6 +173,38 @@ def create_interaction():
         'interaction': interaction.to_dict()
     }), 201
 
+@interactions_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_interactions():
+    """Download every interaction as CSV, JSON Lines or Parquet"""
+    return export_response('interactions')
+
+@interactions_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_create_interactions():
+    """
+    Ingest many interactions in one request
+    
+    Accepts either a JSON body:
+        {"interactions": [{"stakeholder_id": 1, "interaction_type": "email", ...}, ...]}
+    or a streamed CSV (text/csv) / JSON Lines (application/x-ndjson) body
+    with the same fields, one interaction per row.
+    
+    Rows are validated and written in batched transactions; the response
+    reports totals, throughput and per-row errors.
+    """
+    current_user_id = get_jwt_identity()
+    records, error = request_records('interactions')
+    if error:
+        return error
+    
+    report = ImportService.import_interactions(records, user_id=int(current_user_id))
+    
+    return jsonify({
+        'message': f'{report.imported} interaction(s) imported',
+        **report.to_dict()
+    }), 201 if report.imported else 400
+
 @interactions_bp.route('/<int:id>', methods=['PUT'])
 @jwt_required()
 def update_interaction(id):
@@ -83,6 +218,12 @@ def update_interaction(id):
         if field in data:
             setattr(interaction, field, data[field])
     
+    # Only these feed the relationship health window
+    state = db.inspect(interaction)
+    if any(state.attrs[name].history.has_changes()
+           for name in ('sentiment', 'impact_on_relationship', 'date', 'stakeholder_id')):
+        db.session.flush()
+        StakeholderService.update_relationship_health(interaction.stakeholder_id, commit=False)
     db.session.commit()
     
     return jsonify({
@@ -95,7 +236,10 @@ def update_interaction(id):
 def delete_interaction(id):
     """Delete interaction"""
     interaction = Interaction.query.get_or_404(id)
+    stakeholder_id = interaction.stakeholder_id
     db.session.delete(interaction)
+    db.session.flush()
+    StakeholderService.update_relationship_health(stakeholder_id, commit=False)
     db.session.commit()
     
     return jsonify({'message': 'Interaction deleted successfully'}), 200
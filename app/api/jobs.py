@@ -0,0 +1,78 @@
+"""
+Jobs API Endpoints
+Queue background recomputations and check their status
+"""
+from flask import request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.api import jobs_bp
+from app.jobs import jobs, public_job, JOB_HANDLERS
+from app.models.user import User
+
+@jobs_bp.route('', methods=['GET'])
+@jwt_required()
+def list_jobs():
+    """
+    List recently enqueued jobs
+    
+    Query parameters:
+        - status: Filter by job status
+        - limit: Maximum number of jobs (default: 50)
+    """
+    status = request.args.get('status')
+    limit = min(max(1, request.args.get('limit', 50, type=int)), 1000)
+    
+    records = jobs.recent(limit)
+    if status:
+        records = [r for r in records if r['status'] == status]
+    
+    return jsonify({
+        'queued': jobs.backend.queued_count(),
+        'jobs': [public_job(r) for r in records]
+    }), 200
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    """Get job status"""
+    record = jobs.get(job_id)
+    if record is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    return jsonify({'job': public_job(record)}), 200
+
+@jobs_bp.route('', methods=['POST'])
+@jwt_required()
+def enqueue_job():
+    """
+    Queue a job
+    
+    Request body:
+        {
+            "name": "stakeholder.engagement",
+            "args": {"stakeholder_ids": [1, 2]}
+        }
+    """
+    current_user_id = get_jwt_identity()
+    user = User.query.get(current_user_id)
+    
+    if not user.has_permission('update'):
+        return jsonify({'error': 'Insufficient permissions'}), 403
+    
+    data = request.get_json() or {}
+    name = data.get('name')
+    args = data.get('args') or {}
+    
+    if name not in JOB_HANDLERS:
+        return jsonify({'error': f"name must be one of {', '.join(sorted(JOB_HANDLERS))}"}), 400
+    if not isinstance(args, dict):
+        return jsonify({'error': 'args must be an object'}), 400
+    
+    try:
+        record = jobs.enqueue(name, args)
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    
+    return jsonify({
+        'message': 'Job queued',
+        'job': public_job(record)
+    }), 202
@@ -0,0 +1,217 @@
+"""
+Pagination helpers shared by the list endpoints
+
+Supports the classic page/per_page (OFFSET) mode and an opt-in keyset
+(cursor) mode. Keyset mode seeks directly past the last row of the
+previous page using the sort columns, so deep pages cost the same as
+the first one, and the total row count is only computed on request.
+"""
+import base64
+import json
+from collections import namedtuple
+from datetime import date, datetime
+from flask import current_app, request
+from app import db
+
+SortKey = namedtuple('SortKey', ['column', 'descending', 'nulls_last'])
+
+
+def sort_key(column, descending=False, nulls_last=False):
+    """
+    Describe one column of an endpoint's sort order
+
+    The last sort key should be unique (normally the primary key) so
+    that the order, and therefore every cursor, is deterministic.
+    """
+    return SortKey(column, descending, nulls_last)
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a client sends a cursor that cannot be decoded"""
+
+
+class Page:
+    """
+    A single page of results
+
+    Attributes:
+        items: Rows on this page
+        page: Page number (OFFSET mode only)
+        per_page: Requested page size
+        total: Total matching rows, or None when not computed
+        pages: Total page count, or None when not computed
+        next_cursor: Opaque cursor for the following page (keyset mode only)
+    """
+
+    def __init__(self, items, per_page, page=None, total=None, next_cursor=None, keyset=False):
+        self.items = items
+        self.per_page = per_page
+        self.page = page
+        self.total = total
+        self.next_cursor = next_cursor
+        self.keyset = keyset
+
+    @property
+    def pages(self):
+        if self.total is None:
+            return None
+        return -(-self.total // self.per_page) if self.per_page else 0
+
+    def meta(self):
+        """Pagination fields to merge into the endpoint response"""
+        data = {
+            'total': self.total,
+            'pages': self.pages
+        }
+        if self.keyset:
+            data['next_cursor'] = self.next_cursor
+            data['has_more'] = self.next_cursor is not None
+        return data
+
+
+def _expand(keys):
+    """
+    Expand sort keys into (expression, descending, attribute) triples
+
+    A nulls-last column is preceded by an "is null" flag so the order and
+    the keyset comparison behave the same on PostgreSQL and SQLite.
+    """
+    expanded = []
+    for key in keys:
+        if key.nulls_last:
+            flag = db.case((key.column.is_(None), 1), else_=0)
+            expanded.append((flag, False, None))
+        expanded.append((key.column, key.descending, key.column.key))
+    return expanded
+
+
+def _row_values(item, expanded):
+    """Extract the keyset values of a result row"""
+    values = []
+    for expression, _, attribute in expanded:
+        if attribute is None:
+            # "is null" flag for the column that follows
+            continue
+        values.append(getattr(item, attribute))
+    return values
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(column, value):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(values):
+    """Encode keyset values as an opaque URL-safe cursor"""
+    raw = json.dumps([_encode_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, keys):
+    """Decode a cursor produced by encode_cursor for the given sort keys"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError('cursor does not match sort order')
+        return [_decode_value(k.column, v) for k, v in zip(keys, values)]
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursorError('Invalid cursor') from exc
+
+
+def _seek_condition(expanded, values):
+    """
+    Build the "row comes after the cursor" predicate
+
+    Equivalent to a row-value comparison (a, b, c) > (x, y, z) with a
+    per-column direction, written as the usual OR-of-ANDs expansion so it
+    works on every backend and can use the composite sort index.
+    """
+    # Pair every expression with its cursor value, deriving null flags
+    pairs = []
+    value_iter = iter(values)
+    pending_flag = None
+    for expression, descending, attribute in expanded:
+        if attribute is None:
+            pending_flag = expression
+            continue
+        value = next(value_iter)
+        if pending_flag is not None:
+            pairs.append((pending_flag, False, 1 if value is None else 0))
+            pending_flag = None
+        pairs.append((expression, descending, value))
+
+    clauses = []
+    for index, (expression, descending, value) in enumerate(pairs):
+        equal_prefix = [e.is_(None) if v is None else e == v for e, _, v in pairs[:index]]
+        if value is None:
+            # Nothing sorts strictly after NULL within a nulls-last column
+            continue
+        step = expression < value if descending else expression > value
+        clauses.append(db.and_(*equal_prefix, step))
+
+    return db.or_(*clauses) if clauses else db.false()
+
+
+def paginate(query, keys, cursor_supported=True):
+    """
+    Paginate a query according to the current request's arguments
+
+    Query parameters:
+        - page: Page number for OFFSET mode (default: 1)
+        - per_page: Items per page (default: DEFAULT_PAGE_SIZE, clamped
+          to 1..MAX_PAGE_SIZE of the app config)
+        - cursor: Switches to keyset mode; pass an empty value for the
+          first page and the returned next_cursor afterwards
+        - include_total: In keyset mode, also compute the total row count
+
+    Args:
+        query: Filtered query, optionally already ordered (e.g. by search
+            rank) in which case the sort keys only break ties
+        keys: List of sort_key() entries defining the order
+        cursor_supported: False when the query's own ordering is not
+            covered by the keys, which rules out keyset mode
+
+    Returns:
+        Page
+    """
+    per_page = request.args.get('per_page', current_app.config['DEFAULT_PAGE_SIZE'], type=int)
+    per_page = max(1, min(per_page, current_app.config['MAX_PAGE_SIZE']))
+    cursor = request.args.get('cursor')
+    expanded = _expand(keys)
+    ordered = query.order_by(*[e.desc() if d else e.asc() for e, d, _ in expanded])
+
+    if cursor is not None and not cursor_supported:
+        raise InvalidCursorError('Cursor pagination is not available for this ordering')
+
+    if cursor is None:
+        page = request.args.get('page', 1, type=int)
+        pagination = ordered.paginate(page=page, per_page=per_page, error_out=False)
+        return Page(pagination.items, per_page, page=page, total=pagination.total)
+
+    total = None
+    if request.args.get('include_total', 'false').lower() in ('1', 'true', 'yes'):
+        total = query.order_by(None).count()
+
+    if cursor:
+        ordered = ordered.filter(_seek_condition(expanded, decode_cursor(cursor, keys)))
+
+    rows = ordered.limit(per_page + 1).all()
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(_row_values(rows[-1], expanded))
+
+    return Page(rows, per_page, total=total, next_cursor=next_cursor, keyset=True)
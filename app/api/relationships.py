@@ -5,19 +5,33 @@ Stakeholder connections and network mapping
 from flask import request, jsonify
 from flask_jwt_extended import jwt_required
 from app.api import relationships_bp
+from app.api.conditional import namespace_version, not_modified, row_version, with_version
+from app.api.fieldsets import request_fields, select_fields
+from app.api.pagination import paginate, sort_key
+from app.api.tagging import filter_by_request_tags, tag_facets_response
 from app.models.relationship import Relationship
+from app.models.stakeholder import Stakeholder
+from app.services.influence_graph_service import InfluenceGraphService
 from app import db
 
 @relationships_bp.route('', methods=['GET'])
 @jwt_required()
 def list_relationships():
-    """List relationships"""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 50, type=int)
+    """
+    List relationships
+    
+    Supports conditional requests (ETag / If-None-Match).
+    """
+    fields = request_fields(Relationship)
+    version = namespace_version('relationships', 'stakeholders')
+    unchanged = not_modified(version)
+    if unchanged:
+        return unchanged
+    
     stakeholder_id = request.args.get('stakeholder_id', type=int)
     relationship_type = request.args.get('type')
     
-    query = Relationship.query
+    query = select_fields(Relationship.query, Relationship, fields)
     
     if stakeholder_id:
         query = query.filter(
@@ -29,20 +43,45 @@ def list_relationships():
     if relationship_type:
         query = query.filter_by(relationship_type=relationship_type)
     
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    query = filter_by_request_tags(query, Relationship)
     
-    return jsonify({
-        'relationships': [r.to_dict(include_stakeholders=True) for r in pagination.items],
-        'total': pagination.total,
-        'pages': pagination.pages
-    }), 200
+    page = paginate(query, [sort_key(Relationship.id)])
+    
+    return with_version(jsonify({
+        'relationships': Relationship.to_dict_many(page.items, include_stakeholders=True, fields=fields),
+        **page.meta()
+    }), version), 200
+
+@relationships_bp.route('/tags', methods=['GET'])
+@jwt_required()
+def relationship_tag_facets():
+    """Get relationship counts per tag"""
+    return tag_facets_response(Relationship)
 
 @relationships_bp.route('/<int:id>', methods=['GET'])
 @jwt_required()
 def get_relationship(id):
-    """Get relationship by ID"""
-    relationship = Relationship.query.get_or_404(id)
-    return jsonify({'relationship': relationship.to_dict(include_stakeholders=True)}), 200
+    """
+    Get relationship by ID
+    
+    Supports conditional requests (ETag / If-None-Match, Last-Modified /
+    If-Modified-Since).
+    """
+    fields = request_fields(Relationship)
+    version = row_version(
+        Relationship.updated_at,
+        *(db.select(Stakeholder.updated_at).where(Stakeholder.id == side).scalar_subquery()
+          for side in (Relationship.stakeholder_id, Relationship.related_stakeholder_id)),
+        where=Relationship.id == id
+    )
+    unchanged = not_modified(version)
+    if unchanged:
+        return unchanged
+    
+    relationship = select_fields(Relationship.query, Relationship, fields).get_or_404(id)
+    return with_version(jsonify({
+        'relationship': relationship.to_dict(include_stakeholders=True, fields=fields)
+    }), version), 200
 
 @relationships_bp.route('', methods=['POST'])
 @jwt_required()
@@ -104,16 +143,99 @@ def delete_relationship(id):
 @relationships_bp.route('/network/<int:stakeholder_id>', methods=['GET'])
 @jwt_required()
 def get_stakeholder_network(stakeholder_id):
-    """Get complete network for a stakeholder"""
-    relationships = Relationship.query.filter(
+    """
+    Get complete network for a stakeholder
+    
+    Supports conditional requests (ETag / If-None-Match).
+    """
+    fields = request_fields(Relationship)
+    version = namespace_version('relationships', 'stakeholders')
+    unchanged = not_modified(version)
+    if unchanged:
+        return unchanged
+    
+    relationships = select_fields(Relationship.query, Relationship, fields).filter(
         db.or_(
             Relationship.stakeholder_id == stakeholder_id,
             Relationship.related_stakeholder_id == stakeholder_id
         )
     ).all()
     
-    return jsonify({
+    return with_version(jsonify({
         'stakeholder_id': stakeholder_id,
-        'relationships': [r.to_dict(include_stakeholders=True) for r in relationships],
+        'relationships': Relationship.to_dict_many(relationships, include_stakeholders=True, fields=fields),
         'count': len(relationships)
+    }), version), 200
+
+def _stakeholder_names(ids):
+    """Resolve stakeholder names for a set of ids in one query"""
+    if not ids:
+        return {}
+    return dict(
+        db.session.query(Stakeholder.id, Stakeholder.name)
+        .filter(Stakeholder.id.in_(ids))
+        .all()
+    )
+
+@relationships_bp.route('/network/<int:stakeholder_id>/influence', methods=['GET'])
+@jwt_required()
+def get_influence_neighborhood(stakeholder_id):
+    """
+    Get stakeholders within N hops of a stakeholder
+    
+    Query parameters:
+        - depth: Maximum number of hops (default: 2, max: 6)
+    """
+    depth = max(1, min(request.args.get('depth', 2, type=int), 6))
+    hops = InfluenceGraphService.get_neighborhood(stakeholder_id, depth)
+    names = _stakeholder_names(hops.keys())
+    
+    return jsonify({
+        'stakeholder_id': stakeholder_id,
+        'depth': depth,
+        'stakeholders': [
+            {'id': sid, 'name': names.get(sid), 'hops': h}
+            for sid, h in sorted(hops.items(), key=lambda item: item[1])
+            if sid != stakeholder_id
+        ],
+        'count': max(len(hops) - 1, 0)
+    }), 200
+
+@relationships_bp.route('/path/<int:source_id>/<int:target_id>', methods=['GET'])
+@jwt_required()
+def get_influence_path(source_id, target_id):
+    """Get the strongest relationship path between two stakeholders"""
+    path, cost = InfluenceGraphService.get_influence_path(source_id, target_id)
+    
+    if path is None:
+        return jsonify({'error': 'No path between stakeholders'}), 404
+    
+    names = _stakeholder_names(path)
+    
+    return jsonify({
+        'source_id': source_id,
+        'target_id': target_id,
+        'path': [{'id': sid, 'name': names.get(sid)} for sid in path],
+        'hops': len(path) - 1,
+        'cost': cost
+    }), 200
+
+@relationships_bp.route('/centrality', methods=['GET'])
+@jwt_required()
+def get_influence_centrality():
+    """
+    Get the most central stakeholders in the relationship network
+    
+    Query parameters:
+        - limit: Number of stakeholders (default: 20)
+    """
+    limit = max(1, request.args.get('limit', 20, type=int))
+    ranking = InfluenceGraphService.get_centrality(limit)
+    names = _stakeholder_names([sid for sid, _ in ranking])
+    
+    return jsonify({
+        'stakeholders': [
+            {'id': sid, 'name': names.get(sid), 'score': round(score, 6)}
+            for sid, score in ranking
+        ]
     }), 200
@@ -2,11 +2,26 @@
 Stakeholders API Endpoints
 CRUD operations for stakeholder management
 """
-from flask import request, jsonify
+import json
+from sqlalchemy.exc import IntegrityError
+from flask import request, jsonify, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.api import stakeholders_bp
+from app.api.conditional import namespace_version, not_modified, row_version, with_version
+from app.api.fieldsets import request_fields, select_fields
+from app.api.pagination import paginate, sort_key
+from app.api.tagging import filter_by_request_tags, tag_facets_response
+from app.api.imports import request_records
+from app.api.exports import export_response
+from app.models.interaction import Interaction
 from app.models.stakeholder import Stakeholder
 from app.models.user import User
+from app.services.analytics_service import AnalyticsService
+from app.services.stakeholder_service import StakeholderService
+from app.services.import_service import ImportService
+from app.services.search_service import SearchService
+from app.services.tag_service import TagService
+from app.caching import cached_response
 from app import db
 
 @stakeholders_bp.route('', methods=['GET'])
@@ -16,49 +31,106 @@ def list_stakeholders():
     List all stakeholders with optional filtering
     
     Query parameters:
-        - page: Page number (default: 1)
+        - per_page: Items per page (default: 50, at most 100)
         - per_page: Items per page (default: 50)
-        - search: Search by name or organization
-        - tag: Filter by tag
+        - cursor: Keyset pagination cursor (empty for the first page)
+        - include_total: Compute the total count in cursor mode
+        - search: Ranked, prefix-matched search over name, organization,
+          title, notes and tags (page-based pagination only)
+        - tag: Filter by a single tag
+        - tags: Filter by comma-separated tags
+        - tag_match: 'all' (default) or 'any' of the given tags
         - sentiment: Filter by relationship sentiment
+        - fields: Comma-separated fields to return (default: all)
+    
+    Supports conditional requests (ETag / If-None-Match).
     """
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 50, type=int)
+    fields = request_fields(Stakeholder)
+    # Interactions maintain the stakeholder counters
+    version = namespace_version('stakeholders', 'interactions')
+    unchanged = not_modified(version)
+    if unchanged:
+        return unchanged
+    
     search = request.args.get('search')
     tag = request.args.get('tag')
     sentiment = request.args.get('sentiment')
     
-    query = Stakeholder.query
+    query = select_fields(Stakeholder.query, Stakeholder, fields)
     
     if search:
-        query = query.filter(
-            db.or_(
-                Stakeholder.name.ilike(f'%{search}%'),
-                Stakeholder.organization.ilike(f'%{search}%')
-            )
-        )
+        query = SearchService.search_stakeholders(query, search)
     
     if sentiment:
         query = query.filter_by(sentiment=sentiment)
     
     if tag:
-        query = query.filter(Stakeholder.tags.contains([tag]))
+        query = TagService.filter_by_tags(query, Stakeholder, [tag])
     
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    query = filter_by_request_tags(query, Stakeholder)
     
-    return jsonify({
-        'stakeholders': [s.to_dict() for s in pagination.items],
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': page
-    }), 200
+    page = paginate(query, [sort_key(Stakeholder.id)], cursor_supported=not search)
+    
+    return with_version(jsonify({
+        'stakeholders': [s.to_dict(fields=fields) for s in page.items],
+        **page.meta(),
+        'current_page': page.page
+    }), version), 200
+
+@stakeholders_bp.route('/tags', methods=['GET'])
+@jwt_required()
+def stakeholder_tag_facets():
+    """Get stakeholder counts per tag"""
+    return tag_facets_response(Stakeholder)
 
 @stakeholders_bp.route('/<int:id>', methods=['GET'])
 @jwt_required()
 def get_stakeholder(id):
-    """Get stakeholder by ID with full details"""
-    stakeholder = Stakeholder.query.get_or_404(id)
-    return jsonify({'stakeholder': stakeholder.to_dict(include_interactions=True)}), 200
+    """
+    Get stakeholder by ID with full details
+    
+    Supports conditional requests (ETag / If-None-Match, Last-Modified /
+    If-Modified-Since).
+    """
+    fields = request_fields(Stakeholder)
+    columns = [Stakeholder.updated_at]
+    if Stakeholder.wants(fields, 'interactions'):
+        of_stakeholder = Interaction.stakeholder_id == Stakeholder.id
+        columns += [
+            db.select(db.func.max(Interaction.updated_at)).where(of_stakeholder).scalar_subquery(),
+            db.select(db.func.count(Interaction.id)).where(of_stakeholder).scalar_subquery()
+        ]
+    version = row_version(*columns, where=Stakeholder.id == id)
+    unchanged = not_modified(version)
+    if unchanged:
+        return unchanged
+    
+    stakeholder = select_fields(Stakeholder.query, Stakeholder, fields).get_or_404(id)
+    return with_version(jsonify({
+        'stakeholder': stakeholder.to_dict(include_interactions=True, fields=fields)
+    }), version), 200
+
+def _commit_unless_duplicate(stakeholder):
+    """
+    Commit a created or updated stakeholder unless it duplicates another
+    
+    Returns:
+        409 response naming the existing stakeholder, or None once committed
+    """
+    try:
+        db.session.flush()
+        duplicate_of = stakeholder.duplicate_of
+        if duplicate_of is None:
+            db.session.commit()
+            return None
+    except IntegrityError:
+        # A concurrent write took the dedup key between lookup and insert
+        duplicate_of = None
+    db.session.rollback()
+    return jsonify({
+        'error': 'A stakeholder with the same email, or name and organization, already exists',
+        'duplicate_of': duplicate_of
+    }), 409
 
 @stakeholders_bp.route('', methods=['POST'])
 @jwt_required()
@@ -77,6 +149,9 @@ def create_stakeholder():
             "interest_score": 5.0,
             "tags": ["government", "supporter"]
         }
+    
+    Answers 409 when a stakeholder with the same email (or, without one,
+    the same name and organization) exists.
     """
     data = request.get_json()
     
@@ -104,7 +179,9 @@ def create_stakeholder():
     stakeholder.sentiment = stakeholder.calculate_relationship_status()
     
     db.session.add(stakeholder)
-    db.session.commit()
+    duplicate = _commit_unless_duplicate(stakeholder)
+    if duplicate:
+        return duplicate
     
     return jsonify({
         'message': 'Stakeholder created successfully',
@@ -114,7 +191,7 @@ def create_stakeholder():
 @stakeholders_bp.route('/<int:id>', methods=['PUT'])
 @jwt_required()
 def update_stakeholder(id):
-    """Update stakeholder"""
+    """Update stakeholder (409 when the new identity duplicates another)"""
     stakeholder = Stakeholder.query.get_or_404(id)
     data = request.get_json()
     
@@ -130,7 +207,9 @@ def update_stakeholder(id):
     if 'influence_score' in data or 'interest_score' in data:
         stakeholder.sentiment = stakeholder.calculate_relationship_status()
     
-    db.session.commit()
+    duplicate = _commit_unless_duplicate(stakeholder)
+    if duplicate:
+        return duplicate
     
     return jsonify({
         'message': 'Stakeholder updated successfully',
@@ -153,27 +232,138 @@ def delete_stakeholder(id):
     
     return jsonify({'message': 'Stakeholder deleted successfully'}), 200
 
+@stakeholders_bp.route('/bulk/tags', methods=['POST'])
+@jwt_required()
+def bulk_update_stakeholder_tags():
+    """
+    Add and remove tags on many stakeholders at once
+    
+    Request body:
+        {
+            "stakeholder_ids": [1, 2, 3],
+            "add": ["government"],
+            "remove": ["prospect"]
+        }
+    """
+    data = request.get_json() or {}
+    stakeholder_ids = data.get('stakeholder_ids')
+    
+    if not isinstance(stakeholder_ids, list) or not all(isinstance(i, int) for i in stakeholder_ids):
+        return jsonify({'error': 'stakeholder_ids must be a list of ids'}), 400
+    if not data.get('add') and not data.get('remove'):
+        return jsonify({'error': 'Provide tags to add or remove'}), 400
+    if not all(isinstance(data.get(key, []), list) for key in ('add', 'remove')):
+        return jsonify({'error': 'add and remove must be lists of tags'}), 400
+    
+    result = StakeholderService.bulk_update_tags(
+        stakeholder_ids,
+        tags_to_add=data.get('add'),
+        tags_to_remove=data.get('remove')
+    )
+    
+    return jsonify({
+        'message': 'Tags updated successfully',
+        **result
+    }), 200
+
+@stakeholders_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_stakeholders():
+    """Download every stakeholder as CSV, JSON Lines or Parquet"""
+    return export_response('stakeholders')
+
+@stakeholders_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_stakeholders():
+    """
+    Import stakeholders with deduplication
+    
+    Accepts a JSON body {"stakeholders": [{"name": ..., "email": ...}, ...]}
+    or a streamed CSV (text/csv) / JSON Lines (application/x-ndjson) body.
+    Records matching an existing contact by email, or by name and
+    organization, update it instead of creating a duplicate. The unique
+    dedup_key index keeps concurrent or retried imports from creating the
+    same contact twice.
+    
+    Query parameters:
+        - on_duplicate: 'update' (default) or 'skip'
+        - dry_run: Report what would change without writing
+    """
+    on_duplicate = request.args.get('on_duplicate', 'update')
+    dry_run = request.args.get('dry_run', 'false').lower() in ('1', 'true', 'yes')
+    
+    if on_duplicate not in ('update', 'skip'):
+        return jsonify({'error': "on_duplicate must be 'update' or 'skip'"}), 400
+    
+    records, error = request_records('stakeholders')
+    if error:
+        return error
+    
+    report = ImportService.import_stakeholders(records, on_duplicate=on_duplicate, dry_run=dry_run)
+    
+    status = 200 if dry_run else 201 if report.imported else 400 if report.error_count else 200
+    return jsonify({
+        'message': f'{report.inserted} created, {report.updated} updated' + (' (dry run)' if dry_run else ''),
+        **report.to_dict()
+    }), status
+
 @stakeholders_bp.route('/map', methods=['GET'])
 @jwt_required()
+@cached_response('stakeholders')
 def stakeholder_map():
     """
     Get stakeholder map data for visualization
     Returns all stakeholders with influence and interest scores
+    
+    Query parameters:
+        - format: 'json' (default), 'ndjson' for one stakeholder per line,
+          or 'stream' for the default document sent as a chunked stream
     """
-    stakeholders = Stakeholder.query.all()
-    
-    map_data = {
-        'stakeholders': [
-            {
-                'id': s.id,
-                'name': s.name,
-                'organization': s.organization,
-                'influence_score': s.influence_score,
-                'interest_score': s.interest_score,
-                'sentiment': s.sentiment or s.calculate_relationship_status(),
-                'tags': s.tags
-            } for s in stakeholders
-        ]
-    }
+    output = request.args.get('format', 'json')
+    
+    if output not in ('json', 'ndjson', 'stream'):
+        return jsonify({'error': 'format must be json, ndjson or stream'}), 400
     
-    return jsonify(map_data), 200
+    points = (
+        {
+            'id': p['id'],
+            'name': p['name'],
+            'organization': p['organization'],
+            'influence_score': p['influence'],
+            'interest_score': p['interest'],
+            'sentiment': p['sentiment'],
+            'tags': p['tags']
+        } for p in AnalyticsService.iter_stakeholder_map_points()
+    )
+    
+    if output == 'json':
+        return jsonify({'stakeholders': list(points)}), 200
+    
+    return Response(
+        stream_with_context(_stream_map(points, output)),
+        mimetype='application/x-ndjson' if output == 'ndjson' else 'application/json'
+    )
+
+def _stream_map(points, output, batch_size=AnalyticsService.MAP_BATCH_SIZE):
+    """Encode map points incrementally, flushing one batch at a time"""
+    if output == 'stream':
+        yield '{"stakeholders":['
+    
+    batch = []
+    first = True
+    for point in points:
+        batch.append(json.dumps(point, separators=(',', ':')))
+        if len(batch) >= batch_size:
+            yield _encode_batch(batch, output, first)
+            first = False
+            batch = []
+    if batch:
+        yield _encode_batch(batch, output, first)
+    
+    if output == 'stream':
+        yield ']}'
+
+def _encode_batch(batch, output, first):
+    if output == 'ndjson':
+        return '\n'.join(batch) + '\n'
+    return ('' if first else ',') + ','.join(batch)
@@ -0,0 +1,27 @@
+"""
+Tag filter and facet helpers shared by the list endpoints
+"""
+from flask import request, jsonify
+from app.services.tag_service import TagService
+
+def filter_by_request_tags(query, model):
+    """
+    Apply the request's tag filter to a query
+    
+    Query parameters:
+        - tags: Comma-separated tag names
+        - tag_match: 'all' (default) or 'any'
+    """
+    tags = [t.strip() for t in request.args.get('tags', '').split(',') if t.strip()]
+    match = request.args.get('tag_match', 'all')
+    return TagService.filter_by_tags(query, model, tags, match=match)
+
+def tag_facets_response(model, query=None):
+    """
+    Tag facet counts for a model as a JSON response
+    
+    Query parameters:
+        - limit: Maximum number of tags (default: 50)
+    """
+    limit = max(1, request.args.get('limit', 50, type=int))
+    return jsonify({'tags': TagService.facet_counts(model, query=query, limit=limit)}), 200
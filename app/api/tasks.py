@@ -5,21 +5,44 @@ Todoist-style task management
 from flask import request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.api import tasks_bp
+from app.api.conditional import namespace_version, not_modified, row_version, with_version
+from app.api.fieldsets import request_fields, select_fields
+from app.api.pagination import paginate, sort_key
+from app.api.tagging import filter_by_request_tags, tag_facets_response
+from app.api.exports import export_response
+from app.models.stakeholder import Stakeholder
 from app.models.task import Task
+from app.models.user import User
+from app.services.task_service import TaskService
 from app import db
 
+# Largest number of tasks accepted by a single bulk request
+BULK_MAX_ITEMS = 10000
+
 @tasks_bp.route('', methods=['GET'])
 @jwt_required()
 def list_tasks():
-    """List tasks with filtering"""
+    """
+    List tasks with filtering
+    
+    Supports conditional requests (ETag / If-None-Match).
+    """
+    fields = request_fields(Task)
+    # is_overdue also changes when a task falls due, without any write
+    version = namespace_version('tasks', 'users', 'stakeholders',
+                                extra=[TaskService.latest_passed_due_date])
+    unchanged = not_modified(version)
+    if unchanged:
+        return unchanged
+    
     current_user_id = get_jwt_identity()
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 50, type=int)
     status = request.args.get('status')
     priority = request.args.get('priority')
     assigned_to_me = request.args.get('assigned_to_me', type=bool)
     
-    query = Task.query
+    query = select_fields(Task.query, Task, fields, Task.due_date, Task.priority).options(
+        *Task.eager_load_options(include_relationships=True, fields=fields)
+    )
     
     if status:
         query = query.filter_by(status=status)
@@ -28,21 +51,59 @@ def list_tasks():
     if assigned_to_me:
         query = query.filter_by(assigned_to=current_user_id)
     
-    query = query.order_by(Task.due_date.asc().nullslast(), Task.priority.desc())
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    query = filter_by_request_tags(query, Task)
     
-    return jsonify({
-        'tasks': [t.to_dict(include_relationships=True) for t in pagination.items],
-        'total': pagination.total,
-        'pages': pagination.pages
-    }), 200
+    page = paginate(query, [
+        sort_key(Task.due_date, nulls_last=True),
+        sort_key(Task.priority, descending=True),
+        sort_key(Task.id)
+    ])
+    
+    return with_version(jsonify({
+        'tasks': [t.to_dict(include_relationships=True, fields=fields) for t in page.items],
+        **page.meta()
+    }), version), 200
+
+@tasks_bp.route('/tags', methods=['GET'])
+@jwt_required()
+def task_tag_facets():
+    """Get task counts per tag"""
+    return tag_facets_response(Task)
+
+@tasks_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_tasks():
+    """Download every task as CSV, JSON Lines or Parquet"""
+    return export_response('tasks')
 
 @tasks_bp.route('/<int:id>', methods=['GET'])
 @jwt_required()
 def get_task(id):
-    """Get task by ID"""
-    task = Task.query.get_or_404(id)
-    return jsonify({'task': task.to_dict(include_relationships=True)}), 200
+    """
+    Get task by ID
+    
+    Supports conditional requests (ETag / If-None-Match, Last-Modified /
+    If-Modified-Since).
+    """
+    fields = request_fields(Task)
+    version = row_version(
+        Task.updated_at,
+        Task.overdue_since(),
+        db.select(User.updated_at).where(User.id == Task.assigned_to).scalar_subquery(),
+        db.select(User.updated_at).where(User.id == Task.created_by).scalar_subquery(),
+        db.select(Stakeholder.updated_at).where(Stakeholder.id == Task.stakeholder_id).scalar_subquery(),
+        where=Task.id == id
+    )
+    unchanged = not_modified(version)
+    if unchanged:
+        return unchanged
+    
+    task = select_fields(Task.query, Task, fields).options(
+        *Task.eager_load_options(include_relationships=True, fields=fields)
+    ).get_or_404(id)
+    return with_version(jsonify({
+        'task': task.to_dict(include_relationships=True, fields=fields)
+    }), version), 200
 
 @tasks_bp.route('', methods=['POST'])
 @jwt_required()
@@ -114,3 +175,117 @@ def delete_task(id):
     db.session.commit()
     
     return jsonify({'message': 'Task deleted successfully'}), 200
+
+def _bulk_task_ids(data):
+    """Validate the task_ids list of a bulk request, returning an error response or the ids"""
+    task_ids = data.get('task_ids')
+    if not isinstance(task_ids, list) or not task_ids or \
+            not all(isinstance(i, int) for i in task_ids):
+        return None, (jsonify({'error': 'task_ids must be a non-empty list of ids'}), 400)
+    if len(task_ids) > BULK_MAX_ITEMS:
+        return None, (jsonify({'error': f'At most {BULK_MAX_ITEMS} tasks per request'}), 400)
+    return task_ids, None
+
+@tasks_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_create_tasks():
+    """
+    Create many tasks in one request
+    
+    Request body:
+        {
+            "tasks": [
+                {"title": "Call Jane", "priority": "high", "due_date": "2024-05-01T09:00:00"},
+                ...
+            ]
+        }
+    
+    Invalid items are reported per index and do not block the others.
+    """
+    current_user_id = get_jwt_identity()
+    data = request.get_json() or {}
+    items = data.get('tasks')
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'tasks must be a non-empty list'}), 400
+    if len(items) > BULK_MAX_ITEMS:
+        return jsonify({'error': f'At most {BULK_MAX_ITEMS} tasks per request'}), 400
+    
+    result = TaskService.bulk_create_tasks(items, created_by=current_user_id)
+    
+    return jsonify({
+        'message': f"{result['created']} task(s) created",
+        **result
+    }), 201 if result['created'] else 400
+
+@tasks_bp.route('/bulk/assign', methods=['POST'])
+@jwt_required()
+def bulk_assign_tasks():
+    """
+    Assign many tasks to a user
+    
+    Request body:
+        {"task_ids": [1, 2, 3], "assigned_to": 7}
+    """
+    data = request.get_json() or {}
+    task_ids, error = _bulk_task_ids(data)
+    if error:
+        return error
+    
+    if not isinstance(data.get('assigned_to'), int):
+        return jsonify({'error': 'assigned_to is required'}), 400
+    
+    try:
+        result = TaskService.bulk_assign_tasks(task_ids, data['assigned_to'])
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    
+    return jsonify({
+        'message': f"{result['updated']} task(s) assigned",
+        **result
+    }), 200
+
+@tasks_bp.route('/bulk/complete', methods=['POST'])
+@jwt_required()
+def bulk_complete_tasks():
+    """
+    Mark many tasks as completed
+    
+    Request body:
+        {"task_ids": [1, 2, 3]}
+    """
+    data = request.get_json() or {}
+    task_ids, error = _bulk_task_ids(data)
+    if error:
+        return error
+    
+    result = TaskService.bulk_complete_tasks(task_ids)
+    
+    return jsonify({
+        'message': f"{result['updated']} task(s) completed",
+        **result
+    }), 200
+
+@tasks_bp.route('/bulk/status', methods=['POST'])
+@jwt_required()
+def bulk_update_task_status():
+    """
+    Change the status of many tasks
+    
+    Request body:
+        {"task_ids": [1, 2, 3], "status": "cancelled"}
+    """
+    data = request.get_json() or {}
+    task_ids, error = _bulk_task_ids(data)
+    if error:
+        return error
+    
+    if data.get('status') not in Task.STATUSES:
+        return jsonify({'error': f'status must be one of {Task.STATUSES}'}), 400
+    
+    result = TaskService.bulk_update_status(task_ids, data['status'])
+    
+    return jsonify({
+        'message': f"{result['updated']} task(s) updated",
+        **result
+    }), 200
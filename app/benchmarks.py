@@ -0,0 +1,259 @@
+"""
+Microbenchmarks - Serialization throughput and database query paths
+
+Run with `flask bench serialization`, `flask bench dashboard` or
+`flask bench engagement`. Serialization rows are built in memory (never
+flushed), so those figures cover serializing and encoding only. The
+database benchmarks seed a scratch in-memory SQLite database (the
+testing configuration) and never touch the configured one; compare
+their steps with each other rather than with production timings.
+"""
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.models.interaction import Interaction
+from app.models.stakeholder import Stakeholder
+from app.models.task import Task
+from app.models.user import User
+
+
+def _loaded(obj):
+    """Give every unset column a value, as on a row loaded from the database"""
+    for column in obj.__table__.columns:
+        if column.key not in obj.__dict__:
+            setattr(obj, column.key, None)
+    return obj
+
+
+def _stakeholders(rows, now):
+    items = []
+    for i in range(rows):
+        s = Stakeholder(f'Stakeholder {i}', f'person{i}@example.com', f'Organization {i % 100}')
+        s.id = i + 1
+        s.title = 'Director'
+        s.influence_score = float(i % 10)
+        s.interest_score = float(i % 7)
+        s.sentiment = None
+        s.engagement_score = 4.5
+        s.tags = ['policy', 'media']
+        s.priority = 'High'
+        s.notes = 'Met at the annual summit. ' * 20
+        s.interaction_count = i % 40
+        s.open_follow_up_count = i % 3
+        s.last_interaction_at = now - timedelta(days=i % 90)
+        s.last_sentiment = 'positive'
+        s.created_at = s.updated_at = now
+        items.append(_loaded(s))
+    return items
+
+
+def _interactions(rows, now):
+    items = []
+    for i in range(rows):
+        interaction = Interaction(i % 500 + 1, 1, 'meeting', f'Quarterly review {i}')
+        interaction.id = i + 1
+        interaction.description = 'Discussed the roadmap and open questions. ' * 10
+        interaction.outcome = 'Agreed on next steps.'
+        interaction.sentiment = 'neutral'
+        interaction.impact_on_relationship = 0.5
+        interaction.date = now - timedelta(hours=i)
+        interaction.duration_minutes = 45
+        interaction.follow_up_required = i % 4 == 0
+        interaction.follow_up_date = now + timedelta(days=7) if i % 4 == 0 else None
+        interaction.follow_up_completed = False
+        interaction.tags = ['q3']
+        interaction.attachments = []
+        interaction.created_at = interaction.updated_at = now
+        items.append(_loaded(interaction))
+    return items
+
+
+def _tasks(rows, now):
+    items = []
+    for i in range(rows):
+        task = Task(f'Send briefing pack {i}', 1, priority='high')
+        task.id = i + 1
+        task.description = 'Include the latest position paper.'
+        task.status = 'open'
+        task.assigned_to = 1
+        task.stakeholder_id = i % 500 + 1
+        task.due_date = now + timedelta(days=i % 30 - 10)
+        task.tags = []
+        task.created_at = task.updated_at = now
+        items.append(_loaded(task))
+    return items
+
+
+BENCHMARK_MODELS = {
+    'stakeholders': _stakeholders,
+    'interactions': _interactions,
+    'tasks': _tasks
+}
+
+
+def _best(func, repeat):
+    """Fastest of repeat runs, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def serialization_benchmark(app, rows=10000, repeat=5):
+    """
+    Time serializing and encoding a page of each benchmarked model
+
+    Compares the per-field getter loop with the compiled serializer,
+    and json.dumps with the application's JSON provider.
+
+    Returns:
+        List of dicts with model, step and seconds (best of repeat)
+    """
+    now = datetime.utcnow()
+    results = []
+
+    for name, build in BENCHMARK_MODELS.items():
+        items = build(rows, now)
+        model = type(items[0])
+        getters = list(model.SERIALIZED_FIELDS.items())
+        compiled = model.serializer()
+
+        def getter_loop():
+            return [{field: get(obj) for field, get in getters} for obj in items]
+
+        def compiled_serializer():
+            return [compiled(obj) for obj in items]
+
+        payload = {name: compiled_serializer()}
+
+        results.append({'model': name, 'step': 'getter loop',
+                        'seconds': _best(getter_loop, repeat)})
+        results.append({'model': name, 'step': 'compiled serializer',
+                        'seconds': _best(compiled_serializer, repeat)})
+        results.append({'model': name, 'step': 'json.dumps',
+                        'seconds': _best(lambda: json.dumps(payload, sort_keys=True), repeat)})
+        results.append({'model': name, 'step': f'{type(app.json).__name__}.dumps',
+                        'seconds': _best(lambda: app.json.dumps(payload), repeat)})
+
+    return results
+
+
+@contextmanager
+def _scratch_database():
+    """App context on an empty in-memory database with every table created"""
+    from app import create_app, db
+    app = create_app('testing')
+    app.config['SQLALCHEMY_ECHO'] = False
+    with app.app_context():
+        db.create_all()
+        yield db
+        db.session.remove()
+
+
+def _seed_users(db, count):
+    """Insert users directly (no password hashing) and return their ids"""
+    now = datetime.utcnow()
+    db.session.execute(insert(User), [{
+        'email': f'user{i}@example.com', 'password_hash': '-',
+        'first_name': 'Bench', 'last_name': f'User {i}', 'role': 'member',
+        'is_active': True, 'created_at': now, 'updated_at': now
+    } for i in range(count)])
+    db.session.commit()
+    return [user_id for user_id, in db.session.query(User.id).order_by(User.id)]
+
+
+def _seed_stakeholders(db, count):
+    now = datetime.utcnow()
+    db.session.execute(insert(Stakeholder), [{
+        'name': f'Stakeholder {i}', 'organization': f'Organization {i % 100}',
+        'tags': [], 'created_at': now, 'updated_at': now
+    } for i in range(count)])
+    db.session.commit()
+    return [sid for sid, in db.session.query(Stakeholder.id).order_by(Stakeholder.id)]
+
+
+def dashboard_benchmark(rows=10000, users=20, repeat=5):
+    """
+    Time the task dashboard with and without ix_tasks_assigned_status_due
+
+    Seeds rows tasks spread over users assignees, all four statuses and
+    due dates from 60 days ago to 60 days ahead, then times
+    TaskService.get_user_task_dashboard for one assignee.
+
+    Returns:
+        List of dicts with step and seconds (best of repeat)
+    """
+    from app.services.task_service import TaskService
+
+    with _scratch_database() as db:
+        user_ids = _seed_users(db, users)
+        now = datetime.utcnow()
+        db.session.execute(insert(Task), [{
+            'title': f'Task {i}', 'created_by': user_ids[0],
+            'assigned_to': user_ids[i % users],
+            'status': Task.STATUSES[i // users % len(Task.STATUSES)],
+            'priority': Task.PRIORITIES[i // users % len(Task.PRIORITIES)],
+            'due_date': now + timedelta(hours=i * 7 % 2880 - 1440),
+            'tags': [], 'created_at': now, 'updated_at': now
+        } for i in range(rows)])
+        db.session.commit()
+
+        def dashboard():
+            TaskService.get_user_task_dashboard(user_ids[1])
+            db.session.expunge_all()
+
+        index = next(i for i in Task.__table__.indexes if i.name == 'ix_tasks_assigned_status_due')
+        results = [{'step': 'with index', 'seconds': _best(dashboard, repeat)}]
+        index.drop(db.engine)
+        results.append({'step': 'without index', 'seconds': _best(dashboard, repeat)})
+        return results
+
+
+def engagement_benchmark(stakeholders=1000, interactions=20000, repeat=3):
+    """
+    Time scoring every stakeholder's engagement
+
+    Compares the per-stakeholder calculate_engagement_score loop (one
+    query per stakeholder, scores written through the ORM) with the
+    grouped recalculate_engagement_scores. Interactions fall in the
+    scoring window with a mix of types, sentiments and follow-ups.
+
+    Returns:
+        List of dicts with step and seconds (best of repeat)
+    """
+    from app.services.stakeholder_service import StakeholderService
+
+    with _scratch_database() as db:
+        user_id, = _seed_users(db, 1)
+        stakeholder_ids = _seed_stakeholders(db, stakeholders)
+        now = datetime.utcnow()
+        window = StakeholderService.ENGAGEMENT_WINDOW_DAYS * 24
+        db.session.execute(insert(Interaction), [{
+            'stakeholder_id': stakeholder_ids[i % stakeholders], 'user_id': user_id,
+            'interaction_type': ('meeting', 'email', 'call', 'event')[i % 4],
+            'subject': f'Interaction {i}',
+            'sentiment': ('positive', 'neutral', 'negative')[i % 3],
+            'date': now - timedelta(hours=i % window),
+            'follow_up_required': i % 5 == 0, 'follow_up_completed': i % 10 == 0,
+            'tags': [], 'attachments': [], 'created_at': now, 'updated_at': now
+        } for i in range(interactions)])
+        db.session.commit()
+
+        def per_stakeholder_loop():
+            for stakeholder in Stakeholder.query.all():
+                stakeholder.engagement_score = StakeholderService.calculate_engagement_score(stakeholder.id)
+            db.session.commit()
+            db.session.expunge_all()
+
+        def bulk_recalculation():
+            StakeholderService.recalculate_engagement_scores()
+            db.session.expunge_all()
+
+        return [
+            {'step': 'per-stakeholder loop', 'seconds': _best(per_stakeholder_loop, repeat)},
+            {'step': 'recalculate_engagement_scores', 'seconds': _best(bulk_recalculation, repeat)}
+        ]
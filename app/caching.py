@@ -0,0 +1,236 @@
+"""
+Response and Result Caching for Heavy Reads
+
+Cached entries are keyed by endpoint (or function) and arguments plus the
+current version of every data namespace they depend on. Committing a
+change to a model bumps its namespace version, which makes every
+dependent entry unreachable at once; stale entries simply expire.
+"""
+import functools
+import logging
+import threading
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from flask import request, current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import cache
+
+logger = logging.getLogger(__name__)
+
+# Model class name -> cache namespace invalidated by its writes
+MODEL_NAMESPACES = {
+    'Stakeholder': 'stakeholders',
+    'StakeholderHealthRollup': 'stakeholders',
+    'Interaction': 'interactions',
+    'Campaign': 'campaigns',
+    'Task': 'tasks',
+    'Relationship': 'relationships',
+    'User': 'users'
+}
+
+_VERSION_PREFIX = 'ns-version:'
+_PENDING_KEY = 'cache_namespaces'
+
+
+class CacheStats:
+    """Per-process hit/miss counters keyed by cache entry name"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(lambda: {'hits': 0, 'misses': 0})
+
+    def record(self, name, hit):
+        with self._lock:
+            self._counts[name]['hits' if hit else 'misses'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            entries = {name: dict(counts) for name, counts in self._counts.items()}
+        hits = sum(c['hits'] for c in entries.values())
+        misses = sum(c['misses'] for c in entries.values())
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            'entries': entries
+        }
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+stats = CacheStats()
+
+
+def _namespace_versions(namespaces):
+    """Current version token of each namespace, creating missing ones"""
+    keys = [_VERSION_PREFIX + ns for ns in namespaces]
+    versions = cache.get_many(*keys)
+    for index, version in enumerate(versions):
+        if version is None:
+            cache.add(keys[index], uuid.uuid4().hex, timeout=0)
+            versions[index] = cache.get(keys[index])
+    return versions
+
+
+def current_versions(*namespaces):
+    """
+    Version tokens of the given namespaces
+
+    Returns:
+        List of tokens, or None when caching is disabled or the cache
+        cannot be reached
+    """
+    if not current_app.config.get('CACHE_ENABLED', True):
+        return None
+    try:
+        versions = _namespace_versions(namespaces)
+    except Exception:
+        logger.exception('Cache version lookup failed for %s', namespaces)
+        return None
+    return None if None in versions else versions
+
+
+def invalidate(*namespaces):
+    """Make every entry that depends on the given namespaces unreachable"""
+    try:
+        for ns in namespaces:
+            cache.set(_VERSION_PREFIX + ns, uuid.uuid4().hex, timeout=0)
+    except Exception:
+        logger.exception('Cache invalidation failed for %s', namespaces)
+
+
+def _lookup(name, key_parts, namespaces, compute, timeout, fresh=None):
+    """
+    Return the cached value for key_parts, computing it on a miss
+
+    fresh, when given, is called with a cached value; a False result
+    counts as a miss and the value is recomputed.
+    """
+    if not current_app.config.get('CACHE_ENABLED', True):
+        return compute()
+
+    try:
+        versions = _namespace_versions(namespaces)
+        key = f'{name}:{":".join(versions)}:{key_parts}'
+        value = cache.get(key)
+    except Exception:
+        logger.exception('Cache lookup failed for %s', name)
+        return compute()
+
+    if value is not None and (fresh is None or fresh(value)):
+        stats.record(name, hit=True)
+        return value
+
+    stats.record(name, hit=False)
+    value = compute()
+    if value is not None:
+        try:
+            cache.set(key, value, timeout=timeout)
+        except Exception:
+            logger.exception('Cache store failed for %s', name)
+    return value
+
+
+def cached_response(*namespaces, timeout=None):
+    """
+    Cache a view's successful, non-streamed JSON response
+
+    The key covers the endpoint, view arguments and query string, so each
+    filter combination is cached separately.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            result = {}
+
+            def compute():
+                response = current_app.make_response(view(*args, **kwargs))
+                result['response'] = response
+                if response.status_code != 200 or response.is_streamed:
+                    return None
+                return (response.get_data(), response.status_code, response.mimetype)
+
+            key_parts = f'{sorted(kwargs.items())}:{sorted(request.args.items(multi=True))}'
+            cached = _lookup(request.endpoint, key_parts, namespaces, compute, timeout)
+
+            if 'response' in result:
+                return result['response']
+            body, status, mimetype = cached
+            return current_app.response_class(body, status=status, mimetype=mimetype)
+        return wrapper
+    return decorator
+
+
+def cached_result(*namespaces, timeout=None):
+    """Cache a function's return value per argument combination"""
+    def decorator(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key_parts = f'{args!r}:{sorted(kwargs.items())!r}'
+            return _lookup(name, key_parts, namespaces, lambda: func(*args, **kwargs), timeout)
+        return wrapper
+    return decorator
+
+
+def cached_until(*namespaces, timeout=None):
+    """
+    Cache a function's value until a time it returns along with it
+
+    For values that change as time passes as well as with writes. The
+    decorated function takes no arguments and returns (value,
+    valid_until), valid_until being a naive UTC datetime or None when
+    only writes change the value; callers get the value alone.
+    """
+    def decorator(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+
+        def fresh(cached):
+            return cached[1] is None or cached[1] > datetime.utcnow()
+
+        @functools.wraps(func)
+        def wrapper():
+            return _lookup(name, '', namespaces, lambda: tuple(func()), timeout, fresh)[0]
+        return wrapper
+    return decorator
+
+
+# Invalidate namespaces once the writing transaction commits
+
+def _mark(session, class_name):
+    namespace = MODEL_NAMESPACES.get(class_name)
+    if namespace:
+        session.info.setdefault(_PENDING_KEY, set()).add(namespace)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_flushed(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        _mark(session, type(obj).__name__)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_bulk(orm_execute_state):
+    # ORM-enabled bulk INSERT/UPDATE/DELETE statements skip the flush
+    if orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None:
+        _mark(orm_execute_state.session, mapper.class_.__name__)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    namespaces = session.info.pop(_PENDING_KEY, None)
+    if namespaces:
+        invalidate(*namespaces)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_pending(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
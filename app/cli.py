@@ -0,0 +1,349 @@
+"""
+Flask CLI Commands for Stakeholder Engagement Platform
+Maintenance tasks run with `flask <group> <command>`
+"""
+import os
+import click
+from flask.cli import AppGroup
+
+rollups_cli = AppGroup('rollups', help='Maintain precomputed summary tables')
+tags_cli = AppGroup('tags', help='Maintain the normalized tag index')
+interactions_cli = AppGroup('interactions', help='Bulk interaction tools')
+stakeholders_cli = AppGroup('stakeholders', help='Bulk stakeholder tools')
+jobs_cli = AppGroup('jobs', help='Run and inspect background jobs')
+follow_ups_cli = AppGroup('follow-ups', help='Interaction follow-up tools')
+bench_cli = AppGroup('bench', help='Performance microbenchmarks')
+indexes_cli = AppGroup('indexes', help='Maintain database indexes')
+
+# File extension -> import/export format
+FILE_FORMATS = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.parquet': 'parquet'
+}
+
+def _input_format(file, fmt):
+    """Explicit --format, else the file extension"""
+    if fmt:
+        return fmt
+    extension = os.path.splitext(getattr(file, 'name', ''))[1].lower()
+    if extension in FILE_FORMATS:
+        return FILE_FORMATS[extension]
+    raise click.UsageError('Cannot infer file format, pass --format')
+
+def _echo_report(report, noun):
+    click.echo(
+        f'{report.imported} of {report.processed} {noun} imported in {report.elapsed:.2f}s '
+        f'({report.rows_per_second} rows/s), {report.error_count} rejected'
+    )
+    if report.updated or report.skipped or report.duplicates:
+        click.echo(
+            f'  {report.inserted} created, {report.updated} updated, '
+            f'{report.skipped} existing skipped, {report.duplicates} repeated in input'
+        )
+    for error in report.errors:
+        click.echo(f"  line {error['line']}: {error['error']}", err=True)
+    if report.error_count > len(report.errors):
+        click.echo(f'  ... {report.error_count - len(report.errors)} more', err=True)
+
+@rollups_cli.command('rebuild')
+@click.option('--dry-run', is_flag=True, help='Report drift without rewriting the rollup')
+def rebuild_rollups(dry_run):
+    """Check the health rollup against the stakeholders table and rebuild it"""
+    from app.models.health_rollup import StakeholderHealthRollup
+    
+    drift = StakeholderHealthRollup.rebuild(dry_run=dry_run)
+    
+    for sentiment, values in sorted(drift.items()):
+        click.echo(f"{sentiment or '(none)'}: stored={values['stored']} actual={values['actual']}")
+    
+    if not drift:
+        click.echo('Health rollup is consistent')
+    elif dry_run:
+        click.echo(f'{len(drift)} sentiment row(s) drifted (dry run, nothing written)')
+    else:
+        click.echo(f'Rebuilt health rollup ({len(drift)} sentiment row(s) corrected)')
+
+@rollups_cli.command('rebuild-interactions')
+@click.option('--dry-run', is_flag=True, help='Report drift without rewriting the buckets')
+def rebuild_interaction_buckets(dry_run):
+    """Check the per-day interaction buckets against the interactions table and rebuild them"""
+    from app.models.interaction_stats import StakeholderInteractionDaily
+    
+    drifted = StakeholderInteractionDaily.rebuild(dry_run=dry_run)
+    
+    if not drifted:
+        click.echo('Interaction buckets are consistent')
+    elif dry_run:
+        click.echo(f'{drifted} bucket(s) drifted (dry run, nothing written)')
+    else:
+        click.echo(f'Rebuilt interaction buckets ({drifted} bucket(s) corrected)')
+
+@rollups_cli.command('rebuild-counters')
+@click.option('--dry-run', is_flag=True, help='Report drift without rewriting the counters')
+def rebuild_stakeholder_counters(dry_run):
+    """Check the stakeholder interaction counters against the interactions table and repair them"""
+    from app.models.interaction_stats import rebuild_counters
+    
+    drifted = rebuild_counters(dry_run=dry_run)
+    
+    if not drifted:
+        click.echo('Stakeholder counters are consistent')
+    elif dry_run:
+        click.echo(f'{drifted} stakeholder(s) drifted (dry run, nothing written)')
+    else:
+        click.echo(f'Repaired counters of {drifted} stakeholder(s)')
+
+@tags_cli.command('backfill')
+def backfill_tags():
+    """Rebuild tag link tables from the JSON tag columns"""
+    from app.models.tag import TAG_LINKS
+    from app.services.tag_service import TagService
+    
+    for model in TAG_LINKS:
+        count = TagService.backfill_links(model)
+        click.echo(f'{model.__tablename__}: {count} row(s) indexed')
+
+@indexes_cli.command('create')
+@click.option('--table', 'tables', multiple=True, help='Only indexes of this table (repeatable)')
+def create_indexes(tables):
+    """
+    Create model indexes missing from an existing database
+    
+    Indexes added to the models (e.g. ix_tasks_assigned_status_due) are
+    only created with new tables. Existing indexes are left alone; on
+    PostgreSQL each index is built with CREATE INDEX CONCURRENTLY so
+    writes are not blocked while it builds.
+    """
+    from sqlalchemy import inspect
+    from app import db
+    
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        concurrently = connection.dialect.name == 'postgresql'
+        for table in db.metadata.sorted_tables:
+            if tables and table.name not in tables:
+                continue
+            if not inspect(connection).has_table(table.name):
+                continue
+            existing = {index['name'] for index in inspect(connection).get_indexes(table.name)}
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                if index.name in existing:
+                    continue
+                options = index.dialect_options['postgresql']
+                options['concurrently'] = concurrently
+                try:
+                    # Indexes limited to another dialect (ddl_if) are skipped
+                    index.create(connection)
+                finally:
+                    options['concurrently'] = False
+            created = {index['name'] for index in inspect(connection).get_indexes(table.name)} - existing
+            for name in sorted(created):
+                click.echo(f'{table.name}: created {name}')
+
+@interactions_cli.command('import')
+@click.argument('file', type=click.File('r', encoding='utf-8'))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), help='Input format (default: from extension)')
+@click.option('--user-id', type=int, required=True, help='User recorded as logging rows without user_id')
+@click.option('--batch-size', type=int, default=None, help='Rows per transaction')
+def import_interactions(file, fmt, user_id, batch_size):
+    """Stream interactions from a CSV or JSON Lines FILE ('-' for stdin)"""
+    from app.services.import_service import ImportService, read_records
+    
+    report = ImportService.import_interactions(
+        read_records(file, _input_format(file, fmt)),
+        user_id=user_id,
+        batch_size=batch_size
+    )
+    _echo_report(report, 'interaction(s)')
+
+@stakeholders_cli.command('import')
+@click.argument('file', type=click.File('r', encoding='utf-8'))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), help='Input format (default: from extension)')
+@click.option('--on-duplicate', type=click.Choice(['update', 'skip']), default='update',
+              help='What to do with contacts that already exist')
+@click.option('--dry-run', is_flag=True, help='Report what would change without writing')
+@click.option('--batch-size', type=int, default=None, help='Rows per transaction')
+def import_stakeholders(file, fmt, on_duplicate, dry_run, batch_size):
+    """Import stakeholders from a CSV or JSON Lines FILE, deduplicating contacts"""
+    from app.services.import_service import ImportService, read_records
+    
+    report = ImportService.import_stakeholders(
+        read_records(file, _input_format(file, fmt)),
+        batch_size=batch_size,
+        on_duplicate=on_duplicate,
+        dry_run=dry_run
+    )
+    _echo_report(report, 'stakeholder(s)')
+    if dry_run:
+        click.echo('Dry run, nothing written')
+
+@stakeholders_cli.command('backfill-keys')
+def backfill_dedup_keys():
+    """Compute dedup keys for stakeholders created before they existed"""
+    from app.services.import_service import ImportService
+    
+    click.echo(f'{ImportService.backfill_dedup_keys()} stakeholder(s) keyed')
+
+@click.command('export')
+@click.argument('resource', type=click.Choice(['stakeholders', 'interactions', 'tasks']))
+@click.argument('output', type=click.File('wb'))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl', 'parquet']),
+              help='Output format (default: from extension)')
+@click.option('--batch-size', type=int, default=None, help='Rows fetched per cursor batch')
+def export_command(resource, output, fmt, batch_size):
+    """Stream a full RESOURCE table to OUTPUT ('-' for stdout)"""
+    import time
+    from app.services.export_service import ExportService, ExportDependencyError
+    
+    fmt = _input_format(output, fmt)
+    started = time.perf_counter()
+    try:
+        chunks = ExportService.iter_export(resource, fmt, batch_size=batch_size)
+    except ExportDependencyError as exc:
+        raise click.ClickException(str(exc))
+    
+    size = 0
+    for chunk in chunks:
+        data = chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+        output.write(data)
+        size += len(data)
+    
+    click.echo(f'Exported {resource} as {fmt}: {size} bytes in {time.perf_counter() - started:.2f}s', err=True)
+
+@jobs_cli.command('worker')
+@click.option('--burst', is_flag=True, help='Exit once no job is due')
+@click.option('--poll-interval', type=float, default=1.0, help='Seconds to sleep when the queue is empty')
+def run_worker(burst, poll_interval):
+    """Process queued jobs and enqueue scheduled ones"""
+    import signal
+    import time
+    from app import db
+    from app.jobs import jobs
+    
+    stopping = []
+    
+    def stop(signum, frame):
+        click.echo('Finishing current job, then stopping')
+        stopping.append(signum)
+    
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    
+    processed = 0
+    while not stopping:
+        jobs.enqueue_scheduled()
+        record = jobs.run_next()
+        db.session.remove()
+        
+        if record is None:
+            if burst:
+                break
+            time.sleep(poll_interval)
+            continue
+        
+        processed += 1
+        click.echo(f"{record['name']} {record['id']}: {record['status']} (attempt {record['attempts']})")
+    
+    click.echo(f'Worker stopped after {processed} job(s)')
+
+@jobs_cli.command('enqueue')
+@click.argument('name')
+@click.option('--args', 'args_json', default='{}', help='Handler arguments as a JSON object')
+def enqueue_job(name, args_json):
+    """Queue the job NAME"""
+    import json
+    from app.jobs import jobs, JOB_HANDLERS
+    
+    if name not in JOB_HANDLERS:
+        raise click.UsageError(f"Unknown job, expected one of: {', '.join(sorted(JOB_HANDLERS))}")
+    try:
+        args = json.loads(args_json)
+    except ValueError as exc:
+        raise click.UsageError(f'--args is not valid JSON: {exc}')
+    if not isinstance(args, dict):
+        raise click.UsageError('--args must be a JSON object')
+    
+    try:
+        record = jobs.enqueue(name, args)
+    except ValueError as exc:
+        raise click.UsageError(str(exc))
+    click.echo(f"Queued {name} as {record['id']}")
+
+@jobs_cli.command('status')
+@click.argument('job_id')
+def job_status(job_id):
+    """Show the status of a job"""
+    from app.jobs import jobs, public_job
+    
+    record = jobs.get(job_id)
+    if record is None:
+        raise click.ClickException('Job not found')
+    for field, value in public_job(record).items():
+        click.echo(f'{field}: {value}')
+
+@follow_ups_cli.command('scan')
+@click.option('--due-before', type=click.DateTime(), help='Cover follow-ups due up to this time (UTC)')
+@click.option('--dry-run', is_flag=True, help='Count due follow-ups without creating tasks')
+def scan_follow_ups(due_before, dry_run):
+    """Create tasks for open follow-ups falling due"""
+    from app.services.follow_up_service import FollowUpService
+    
+    result = FollowUpService.create_follow_up_tasks(due_before=due_before, dry_run=dry_run)
+    
+    if dry_run:
+        click.echo(f"{result['scanned']} follow-up(s) due without a task (dry run, nothing written)")
+    else:
+        click.echo(f"Created {result['created']} follow-up task(s) in {result['elapsed']:.2f}s")
+
+@bench_cli.command('serialization')
+@click.option('--rows', type=int, default=10000, show_default=True, help='Rows per model')
+@click.option('--repeat', type=int, default=5, show_default=True, help='Runs per step, best is reported')
+def bench_serialization(rows, repeat):
+    """Time model serialization and JSON encoding over in-memory rows"""
+    from flask import current_app
+    from app.benchmarks import serialization_benchmark
+    
+    for result in serialization_benchmark(current_app, rows=rows, repeat=repeat):
+        seconds = result['seconds']
+        click.echo(
+            f"{result['model']:<14} {result['step']:<26} {seconds * 1000:9.1f} ms "
+            f"{rows / seconds if seconds else 0:12,.0f} rows/s"
+        )
+
+@bench_cli.command('dashboard')
+@click.option('--rows', type=int, default=10000, show_default=True, help='Tasks to seed')
+@click.option('--repeat', type=int, default=5, show_default=True, help='Runs per step, best is reported')
+def bench_dashboard(rows, repeat):
+    """Time the task dashboard with and without its covering index"""
+    from app.benchmarks import dashboard_benchmark
+    
+    for result in dashboard_benchmark(rows=rows, repeat=repeat):
+        click.echo(f"dashboard ({rows} tasks) {result['step']:<16} {result['seconds'] * 1000:9.1f} ms")
+
+@bench_cli.command('engagement')
+@click.option('--stakeholders', type=int, default=1000, show_default=True, help='Stakeholders to seed')
+@click.option('--interactions', type=int, default=20000, show_default=True, help='Interactions to seed')
+@click.option('--repeat', type=int, default=3, show_default=True, help='Runs per step, best is reported')
+def bench_engagement(stakeholders, interactions, repeat):
+    """Time per-stakeholder engagement scoring against the bulk recalculation"""
+    from app.benchmarks import engagement_benchmark
+    
+    for result in engagement_benchmark(stakeholders=stakeholders, interactions=interactions, repeat=repeat):
+        seconds = result['seconds']
+        click.echo(
+            f"{result['step']:<30} {seconds * 1000:9.1f} ms "
+            f"{stakeholders / seconds if seconds else 0:12,.0f} stakeholders/s"
+        )
+
+def register_commands(app):
+    """Attach CLI command groups to the application"""
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(tags_cli)
+    app.cli.add_command(interactions_cli)
+    app.cli.add_command(stakeholders_cli)
+    app.cli.add_command(export_command)
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(follow_ups_cli)
+    app.cli.add_command(bench_cli)
+    app.cli.add_command(indexes_cli)
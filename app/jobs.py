@@ -0,0 +1,458 @@
+"""
+Background Jobs for Score Recomputation and Analytics Rollups
+
+Jobs are named handlers registered with @job and run by `flask jobs
+worker` processes outside the request thread. The queue lives in Redis
+(JOBS_BACKEND='redis') or, for tests and single-process development, in
+memory (JOBS_BACKEND='memory').
+
+- Deduplication: a job enqueued with a dedup_key while an identical one
+  is still waiting returns the waiting job instead of adding another.
+  The key is released when a worker picks the job up, so writes that
+  land during a run still get a fresh job.
+- Retry: a failing job is retried with exponential backoff up to
+  max_attempts times before it is marked failed.
+- Scheduling: JOBS_SCHEDULE entries are enqueued by whichever worker
+  claims each interval first.
+- Events: committed interaction writes and campaign membership changes
+  enqueue the matching recomputations.
+"""
+import heapq
+import json
+import logging
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime
+from inspect import signature
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Job name -> handler
+JOB_HANDLERS = {}
+
+STATUSES = ['queued', 'running', 'retrying', 'succeeded', 'failed']
+
+
+def job(name):
+    """Register a function as the handler of a named job"""
+    def decorator(func):
+        JOB_HANDLERS[name] = func
+        return func
+    return decorator
+
+
+def _timestamp(seconds):
+    return datetime.utcfromtimestamp(seconds).isoformat() if seconds else None
+
+
+def public_job(record):
+    """Job record as returned by the API"""
+    return {
+        'id': record['id'],
+        'name': record['name'],
+        'args': record['args'],
+        'status': record['status'],
+        'attempts': record['attempts'],
+        'max_attempts': record['max_attempts'],
+        'error': record.get('error'),
+        'result': record.get('result'),
+        'enqueued_at': _timestamp(record['enqueued_at']),
+        'run_at': _timestamp(record['run_at']),
+        'started_at': _timestamp(record.get('started_at')),
+        'finished_at': _timestamp(record.get('finished_at'))
+    }
+
+
+class MemoryJobBackend:
+    """Process-local queue for tests and single-process development"""
+
+    def __init__(self, config):
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._queue = []
+        self._dedup = {}
+        self._schedules = {}
+
+    def add(self, record):
+        with self._lock:
+            key = record.get('dedup_key')
+            if key and key in self._dedup:
+                return self._jobs[self._dedup[key]]
+            if key:
+                self._dedup[key] = record['id']
+            self._jobs[record['id']] = record
+            heapq.heappush(self._queue, (record['run_at'], record['id']))
+            return record
+
+    def claim(self, now):
+        with self._lock:
+            if not self._queue or self._queue[0][0] > now:
+                return None
+            _, job_id = heapq.heappop(self._queue)
+            record = self._jobs[job_id]
+            key = record.get('dedup_key')
+            if key and self._dedup.get(key) == job_id:
+                del self._dedup[key]
+            return record
+
+    def save(self, record, requeue=False):
+        with self._lock:
+            self._jobs[record['id']] = record
+            if requeue:
+                heapq.heappush(self._queue, (record['run_at'], record['id']))
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def recent(self, limit):
+        jobs = sorted(self._jobs.values(), key=lambda r: r['enqueued_at'], reverse=True)
+        return jobs[:limit]
+
+    def queued_count(self):
+        return len(self._queue)
+
+    def claim_schedule(self, name, interval, now):
+        with self._lock:
+            if self._schedules.get(name, 0) > now:
+                return False
+            self._schedules[name] = now + interval
+            return True
+
+
+class RedisJobBackend:
+    """
+    Redis queue shared by every web and worker process
+
+    Waiting jobs sit in a sorted set scored by run time; a worker owns a
+    job once it removes it from that set. Claimed jobs are tracked with a
+    deadline and handed back to the queue if their worker disappears.
+    """
+
+    def __init__(self, config):
+        import redis
+        self._redis = redis.Redis.from_url(config['JOBS_REDIS_URL'])
+        self._prefix = config['JOBS_KEY_PREFIX']
+        self._result_ttl = config['JOBS_RESULT_TTL']
+        self._visibility_timeout = config['JOBS_VISIBILITY_TIMEOUT']
+
+    def _key(self, *parts):
+        return self._prefix + ':'.join(str(p) for p in parts)
+
+    def add(self, record):
+        key = record.get('dedup_key')
+        if key:
+            dedup = self._key('dedup', key)
+            while not self._redis.set(dedup, record['id'], nx=True):
+                holder = self._redis.get(dedup)
+                if holder is None:
+                    continue  # Released by a worker since the SET: try again
+                existing = self.get(holder.decode())
+                if existing and existing['status'] in ('queued', 'retrying'):
+                    return existing
+                self._redis.set(dedup, record['id'])
+                break
+        self.save(record, requeue=True)
+        self._redis.lpush(self._key('recent'), record['id'])
+        self._redis.ltrim(self._key('recent'), 0, 999)
+        return record
+
+    def claim(self, now):
+        # Return abandoned jobs to the queue
+        running = self._key('running')
+        for job_id in self._redis.zrangebyscore(running, '-inf', now):
+            if self._redis.zrem(running, job_id):
+                self._redis.zadd(self._key('queue'), {job_id: now})
+
+        for job_id in self._redis.zrangebyscore(self._key('queue'), '-inf', now, start=0, num=10):
+            if not self._redis.zrem(self._key('queue'), job_id):
+                continue  # Claimed by another worker
+            self._redis.zadd(running, {job_id: now + self._visibility_timeout})
+            record = self.get(job_id.decode())
+            if record is None:
+                continue
+            key = record.get('dedup_key')
+            if key:
+                dedup = self._key('dedup', key)
+                if self._redis.get(dedup) == record['id'].encode():
+                    self._redis.delete(dedup)
+            return record
+        return None
+
+    def save(self, record, requeue=False):
+        finished = record['status'] in ('succeeded', 'failed')
+        self._redis.set(
+            self._key('job', record['id']), json.dumps(record),
+            ex=self._result_ttl if finished else None
+        )
+        if finished or requeue:
+            self._redis.zrem(self._key('running'), record['id'])
+        if requeue:
+            self._redis.zadd(self._key('queue'), {record['id']: record['run_at']})
+
+    def get(self, job_id):
+        raw = self._redis.get(self._key('job', job_id))
+        return json.loads(raw) if raw else None
+
+    def recent(self, limit):
+        ids = [i.decode() for i in self._redis.lrange(self._key('recent'), 0, limit - 1)]
+        return [r for r in (self.get(i) for i in ids) if r]
+
+    def queued_count(self):
+        return self._redis.zcard(self._key('queue'))
+
+    def claim_schedule(self, name, interval, now):
+        return bool(self._redis.set(self._key('schedule', name), now, nx=True, ex=max(1, int(interval))))
+
+
+BACKENDS = {
+    'memory': MemoryJobBackend,
+    'redis': RedisJobBackend
+}
+
+
+class JobQueue:
+    """Flask extension giving access to the configured job backend"""
+
+    def init_app(self, app):
+        app.config.setdefault('JOBS_ENABLED', True)
+        app.config.setdefault('JOBS_BACKEND', 'redis')
+        app.config.setdefault('JOBS_REDIS_URL', app.config.get('REDIS_URL', 'redis://localhost:6379/0'))
+        app.config.setdefault('JOBS_KEY_PREFIX', 'stakeholder:jobs:')
+        app.config.setdefault('JOBS_MAX_ATTEMPTS', 3)
+        app.config.setdefault('JOBS_RETRY_DELAY', 30)
+        app.config.setdefault('JOBS_RESULT_TTL', 86400)
+        app.config.setdefault('JOBS_VISIBILITY_TIMEOUT', 600)
+        app.config.setdefault('JOBS_SCHEDULE', [])
+        app.extensions['jobs'] = BACKENDS[app.config['JOBS_BACKEND']](app.config)
+
+    @property
+    def backend(self):
+        return current_app.extensions['jobs']
+
+    def enqueue(self, name, args=None, dedup_key=None, delay=0, max_attempts=None):
+        """
+        Queue a job
+
+        Args:
+            name: Registered job name
+            args: JSON-serializable keyword arguments for the handler
+            dedup_key: Collapse onto a waiting job with the same key
+            delay: Seconds before the job becomes runnable
+            max_attempts: Attempts before giving up (default JOBS_MAX_ATTEMPTS)
+
+        Returns:
+            Job record (the existing one when deduplicated)
+
+        Raises:
+            ValueError: For an unknown job or arguments its handler does
+                not accept
+        """
+        if name not in JOB_HANDLERS:
+            raise ValueError(f'Unknown job: {name}')
+        try:
+            signature(JOB_HANDLERS[name]).bind(**(args or {}))
+        except TypeError as exc:
+            raise ValueError(f'Invalid args for {name}: {exc}') from None
+        now = time.time()
+        record = {
+            'id': uuid.uuid4().hex,
+            'name': name,
+            'args': args or {},
+            'dedup_key': dedup_key,
+            'status': 'queued',
+            'attempts': 0,
+            'max_attempts': max_attempts or current_app.config['JOBS_MAX_ATTEMPTS'],
+            'enqueued_at': now,
+            'run_at': now + delay
+        }
+        return self.backend.add(record)
+
+    def get(self, job_id):
+        return self.backend.get(job_id)
+
+    def recent(self, limit=50):
+        return self.backend.recent(limit)
+
+    def run_next(self):
+        """
+        Run the next due job, if any
+
+        Returns:
+            The finished job record, or None when nothing was due
+        """
+        record = self.backend.claim(time.time())
+        if record is None:
+            return None
+
+        record['status'] = 'running'
+        record['attempts'] += 1
+        record['started_at'] = time.time()
+        self.backend.save(record)
+
+        from app import db
+        try:
+            result = JOB_HANDLERS[record['name']](**record['args'])
+        except Exception as exc:
+            db.session.rollback()
+            logger.warning('Job %s (%s) failed: %s', record['id'], record['name'], exc)
+            record['error'] = f'{exc.__class__.__name__}: {exc}'
+            record['traceback'] = traceback.format_exc(limit=5)
+            if record['attempts'] < record['max_attempts']:
+                record['status'] = 'retrying'
+                record['run_at'] = time.time() + current_app.config['JOBS_RETRY_DELAY'] * 2 ** (record['attempts'] - 1)
+                self.backend.save(record, requeue=True)
+                return record
+            record['status'] = 'failed'
+        else:
+            record['status'] = 'succeeded'
+            record['result'] = result
+            record['error'] = None
+
+        record['finished_at'] = time.time()
+        self.backend.save(record)
+        return record
+
+    def run_pending(self, limit=None):
+        """Run due jobs until none are left (or limit is reached)"""
+        count = 0
+        while limit is None or count < limit:
+            if self.run_next() is None:
+                break
+            count += 1
+        return count
+
+    def enqueue_scheduled(self):
+        """Enqueue every JOBS_SCHEDULE entry whose interval has come round"""
+        now = time.time()
+        for entry in current_app.config['JOBS_SCHEDULE']:
+            if self.backend.claim_schedule(entry['name'], entry['interval'], now):
+                self.enqueue(entry['name'], entry.get('args'), dedup_key=f"schedule:{entry['name']}")
+
+
+jobs = JobQueue()
+
+
+def enqueue_safely(name, args=None, dedup_key=None):
+    """Enqueue from request code without letting queue outages fail the request"""
+    if not current_app.config.get('JOBS_ENABLED', True):
+        return None
+    try:
+        return jobs.enqueue(name, args, dedup_key=dedup_key)
+    except Exception:
+        logger.exception('Could not enqueue job %s', name)
+        return None
+
+
+# Registered jobs
+
+@job('stakeholder.engagement')
+def recalculate_stakeholder_engagement(stakeholder_ids=None):
+    """Recompute engagement scores, then the scores of the campaigns they belong to"""
+    from app.models.campaign import campaign_stakeholders
+    from app.services.campaign_service import CampaignService
+    from app.services.stakeholder_service import StakeholderService
+    from app import db
+
+    scores = StakeholderService.recalculate_engagement_scores(stakeholder_ids)
+
+    campaigns = db.select(campaign_stakeholders.c.campaign_id).distinct()
+    if stakeholder_ids is not None:
+        campaigns = campaigns.where(campaign_stakeholders.c.stakeholder_id.in_(stakeholder_ids))
+    campaign_ids = list(db.session.scalars(campaigns))
+    if campaign_ids:
+        CampaignService.recalculate_engagement_scores(campaign_ids)
+
+    return {'stakeholders_scored': len(scores), 'campaigns_updated': len(campaign_ids)}
+
+
+@job('stakeholder.relationship_health')
+def update_stakeholder_relationship_health(stakeholder_id):
+    """Apply the relationship health adjustment for one stakeholder"""
+    from app.services.stakeholder_service import StakeholderService
+
+    stakeholder = StakeholderService.update_relationship_health(stakeholder_id)
+    return {'sentiment': stakeholder.sentiment if stakeholder else None}
+
+
+@job('campaign.engagement')
+def recalculate_campaign_engagement(campaign_ids=None):
+    """Recompute campaign engagement scores from their stakeholders"""
+    from app.services.campaign_service import CampaignService
+
+    return {'campaigns_updated': len(CampaignService.recalculate_engagement_scores(campaign_ids))}
+
+
+@job('analytics.warm')
+def warm_analytics():
+    """Precompute the cached analytics reports"""
+    from app.services.analytics_service import AnalyticsService
+
+    AnalyticsService.generate_stakeholder_map_data()
+    AnalyticsService.get_engagement_trends()
+    AnalyticsService.get_relationship_health_summary()
+    AnalyticsService.get_campaign_performance_metrics()
+    return {'warmed': 4}
+
+
+@job('follow_ups.scan')
+def scan_follow_ups():
+    """Create tasks for open follow-ups falling due"""
+    from app.services.follow_up_service import FollowUpService
+
+    return FollowUpService.create_follow_up_tasks()
+
+
+def enqueue_engagement(stakeholder_ids):
+    """Queue per-stakeholder engagement recomputation, one waiting job per stakeholder"""
+    for stakeholder_id in stakeholder_ids:
+        enqueue_safely(
+            'stakeholder.engagement', {'stakeholder_ids': [stakeholder_id]},
+            dedup_key=f'stakeholder.engagement:{stakeholder_id}'
+        )
+
+
+# Event triggers: collect affected ids per transaction, enqueue on commit
+
+_PENDING_KEY = 'pending_jobs'
+
+
+def _pending(session):
+    return session.info.setdefault(_PENDING_KEY, {'stakeholders': set(), 'campaigns': set()})
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_job_triggers(session, flush_context):
+    from app.models.campaign import Campaign
+    from app.models.interaction import Interaction
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Interaction):
+            stakeholders = _pending(session)['stakeholders']
+            stakeholders.add(obj.stakeholder_id)
+            stakeholders.update(inspect(obj).attrs.stakeholder_id.history.deleted)
+        elif isinstance(obj, Campaign) and obj not in session.deleted and \
+                inspect(obj).attrs.stakeholders.history.has_changes():
+            _pending(session)['campaigns'].add(obj.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _enqueue_committed(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    enqueue_engagement(sorted(i for i in pending['stakeholders'] if i is not None))
+    for campaign_id in sorted(pending['campaigns']):
+        enqueue_safely(
+            'campaign.engagement', {'campaign_ids': [campaign_id]},
+            dedup_key=f'campaign.engagement:{campaign_id}'
+        )
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_job_triggers(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
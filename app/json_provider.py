@@ -0,0 +1,59 @@
+"""
+JSON Provider - orjson-backed Flask JSON encoding
+
+Selected with the JSON_BACKEND setting: 'orjson', 'stdlib', or 'auto'
+(orjson when installed, otherwise Flask's stdlib provider).
+"""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider encoding with orjson
+
+    Keeps the stdlib provider's output apart from whitespace and
+    non-ASCII escaping: keys stay sorted, and datetimes and other
+    non-native types still go through Flask's default() (so datetimes
+    remain HTTP dates). Calls with json.dumps-specific keyword arguments
+    fall back to the stdlib encoder.
+    """
+
+    def _options(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._options(indent)) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_app(app):
+    """Install the JSON provider chosen by JSON_BACKEND"""
+    backend = app.config.setdefault('JSON_BACKEND', 'auto')
+    if backend not in ('auto', 'orjson', 'stdlib'):
+        raise ValueError(f'Unknown JSON_BACKEND: {backend}')
+    if backend == 'orjson' and orjson is None:
+        raise RuntimeError('JSON_BACKEND=orjson requires the orjson package')
+    if backend != 'stdlib' and orjson is not None:
+        app.json = OrjsonProvider(app)
@@ -7,6 +7,9 @@ from app.models.interaction import Interaction
 from app.models.task import Task
 from app.models.campaign import Campaign
 from app.models.relationship import Relationship
+from app.models.health_rollup import StakeholderHealthRollup
+from app.models.tag import Tag
+from app.models.interaction_stats import StakeholderInteractionDaily
 
 __all__ = [
     'User',
@@ -14,5 +17,8 @@ __all__ = [
     'Interaction',
     'Task',
     'Campaign',
-    'Relationship'
+    'Relationship',
+    'StakeholderHealthRollup',
+    'Tag',
+    'StakeholderInteractionDaily'
 ]
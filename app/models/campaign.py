@@ -3,6 +3,7 @@ Campaign Model - Stakeholder Engagement Campaigns
 """
 from datetime import datetime
 from app import db
+from app.models.serialization import SerializerMixin, column, iso, listed
 
 # Association table for many-to-many relationship between campaigns and stakeholders
 campaign_stakeholders = db.Table('campaign_stakeholders',
@@ -11,7 +12,7 @@ campaign_stakeholders = db.Table('campaign_stakeholders',
     db.Column('added_at', db.DateTime, default=datetime.utcnow)
 )
 
-class Campaign(db.Model):
+class Campaign(SerializerMixin, db.Model):
     """
     Campaign model for managing stakeholder engagement initiatives
     
@@ -128,35 +129,51 @@ class Campaign(db.Model):
         """Pause campaign"""
         self.status = 'paused'
     
-    def to_dict(self, include_stakeholders=False):
-        """Serialize campaign to dictionary"""
-        data = {
-            'id': self.id,
-            'name': self.name,
-            'description': self.description,
-            'phase': self.phase,
-            'status': self.status,
-            'owner_id': self.owner_id,
-            'start_date': self.start_date.isoformat() if self.start_date else None,
-            'end_date': self.end_date.isoformat() if self.end_date else None,
-            'goals': self.goals or [],
-            'target_audience': self.target_audience,
-            'key_messages': self.key_messages or [],
-            'engagement_score': self.engagement_score,
-            'shared_value_realized': self.shared_value_realized,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
-        }
+    # to_dict() fields in output order
+    SERIALIZED_FIELDS = {
+        'id': column('id'),
+        'name': column('name'),
+        'description': column('description'),
+        'phase': column('phase'),
+        'status': column('status'),
+        'owner_id': column('owner_id'),
+        'start_date': iso('start_date'),
+        'end_date': iso('end_date'),
+        'goals': listed('goals'),
+        'target_audience': column('target_audience'),
+        'key_messages': listed('key_messages'),
+        'engagement_score': column('engagement_score'),
+        'shared_value_realized': column('shared_value_realized'),
+        'created_at': iso('created_at'),
+        'updated_at': iso('updated_at')
+    }
+    FIELD_COLUMNS = {
+        'stakeholders': (),
+        'stakeholder_count': ()
+    }
+    EMBEDDED_FIELDS = ('stakeholders', 'stakeholder_count')
+    
+    def to_dict(self, include_stakeholders=False, fields=None):
+        """
+        Serialize campaign to dictionary
+        
+        Args:
+            include_stakeholders: Embed member stakeholders and their count
+            fields: Optional fieldset (see SerializerMixin.parse_fields)
+        """
+        data = self.serialize_fields(fields)
         
         if include_stakeholders:
-            data['stakeholders'] = [
-                {
-                    'id': s.id,
-                    'name': s.name,
-                    'organization': s.organization
-                } for s in self.stakeholders
-            ]
-            data['stakeholder_count'] = len(self.stakeholders)
+            if self.wants(fields, 'stakeholders'):
+                data['stakeholders'] = [
+                    {
+                        'id': s.id,
+                        'name': s.name,
+                        'organization': s.organization
+                    } for s in self.stakeholders
+                ]
+            if self.wants(fields, 'stakeholder_count'):
+                data['stakeholder_count'] = len(self.stakeholders)
         
         return data
     
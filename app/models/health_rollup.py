@@ -0,0 +1,196 @@
+"""
+Stakeholder Health Rollup Model - Incrementally maintained summary counters
+"""
+from datetime import datetime
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+from app import db
+from app.models.stakeholder import Stakeholder
+
+class StakeholderHealthRollup(db.Model):
+    """
+    Running totals over the stakeholders table, one row per sentiment
+
+    Kept in step with stakeholder inserts, updates and deletes by a flush
+    hook, so the relationship health summary is a read of a handful of
+    rows instead of five scans of the stakeholders table. Bulk SQL writes
+    bypass the hook; run `flask rollups rebuild` after those.
+
+    Attributes:
+        id: Primary key
+        sentiment: Stakeholder sentiment ('' for stakeholders without one)
+        stakeholder_count: Number of stakeholders with this sentiment
+        influence_total: Sum of their influence scores
+        interest_total: Sum of their interest scores
+        high_priority_count: Stakeholders with influence >= 7 and interest >= 5
+        updated_at: Last update timestamp
+    """
+    __tablename__ = 'stakeholder_health_rollups'
+
+    id = db.Column(db.Integer, primary_key=True)
+    sentiment = db.Column(db.String(50), unique=True, nullable=False)
+    stakeholder_count = db.Column(db.Integer, default=0, nullable=False)
+    influence_total = db.Column(db.Float, default=0.0, nullable=False)
+    interest_total = db.Column(db.Float, default=0.0, nullable=False)
+    high_priority_count = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    # Thresholds for the high priority segment
+    HIGH_PRIORITY_INFLUENCE = 7.0
+    HIGH_PRIORITY_INTEREST = 5.0
+
+    @classmethod
+    def is_high_priority(cls, influence_score, interest_score):
+        """Whether scores fall in the high priority segment"""
+        return (influence_score or 0.0) >= cls.HIGH_PRIORITY_INFLUENCE and \
+            (interest_score or 0.0) >= cls.HIGH_PRIORITY_INTEREST
+
+    @classmethod
+    def apply_deltas(cls, connection, deltas):
+        """
+        Add per-sentiment deltas to the rollup rows
+
+        Args:
+            connection: Connection inside the writing transaction
+            deltas: Dict of sentiment -> [count, influence, interest, high_priority]
+        """
+        table = cls.__table__
+        now = datetime.utcnow()
+        for sentiment, (count, influence, interest, high_priority) in deltas.items():
+            if not (count or influence or interest or high_priority):
+                continue
+            key = sentiment or ''
+            result = connection.execute(
+                table.update().where(table.c.sentiment == key).values(
+                    stakeholder_count=table.c.stakeholder_count + count,
+                    influence_total=table.c.influence_total + influence,
+                    interest_total=table.c.interest_total + interest,
+                    high_priority_count=table.c.high_priority_count + high_priority,
+                    updated_at=now
+                )
+            )
+            if result.rowcount == 0:
+                connection.execute(table.insert().values(
+                    sentiment=key,
+                    stakeholder_count=count,
+                    influence_total=influence,
+                    interest_total=interest,
+                    high_priority_count=high_priority,
+                    updated_at=now
+                ))
+
+    @classmethod
+    def compute_from_source(cls):
+        """
+        Aggregate the stakeholders table from scratch
+
+        Returns:
+            Dict of sentiment -> [count, influence, interest, high_priority]
+        """
+        high_priority = db.case((db.and_(
+            Stakeholder.influence_score >= cls.HIGH_PRIORITY_INFLUENCE,
+            Stakeholder.interest_score >= cls.HIGH_PRIORITY_INTEREST
+        ), 1), else_=0)
+
+        rows = db.session.query(
+            Stakeholder.sentiment,
+            func.count(Stakeholder.id),
+            func.coalesce(func.sum(Stakeholder.influence_score), 0.0),
+            func.coalesce(func.sum(Stakeholder.interest_score), 0.0),
+            func.coalesce(func.sum(high_priority), 0)
+        ).group_by(Stakeholder.sentiment).all()
+
+        totals = {}
+        for sentiment, count, influence, interest, high in rows:
+            entry = totals.setdefault(sentiment or '', [0, 0.0, 0.0, 0])
+            entry[0] += count
+            entry[1] += influence
+            entry[2] += interest
+            entry[3] += high
+        return totals
+
+    @classmethod
+    def rebuild(cls, dry_run=False):
+        """
+        Recompute the rollup from the stakeholders table
+
+        Args:
+            dry_run: Only report drift, leave the stored rows untouched
+
+        Returns:
+            Dict of sentiment -> {'stored': [...], 'actual': [...]} for rows that drifted
+        """
+        actual = cls.compute_from_source()
+        stored = {
+            r.sentiment: [r.stakeholder_count, r.influence_total, r.interest_total, r.high_priority_count]
+            for r in cls.query.all()
+        }
+
+        drift = {}
+        for sentiment in set(actual) | set(stored):
+            expected = actual.get(sentiment, [0, 0.0, 0.0, 0])
+            current = stored.get(sentiment, [0, 0.0, 0.0, 0])
+            if current[0] != expected[0] or current[3] != expected[3] or \
+                    abs(current[1] - expected[1]) > 1e-6 or abs(current[2] - expected[2]) > 1e-6:
+                drift[sentiment] = {'stored': current, 'actual': expected}
+
+        if not dry_run:
+            cls.query.delete()
+            db.session.add_all([
+                cls(sentiment=sentiment, stakeholder_count=count, influence_total=influence,
+                    interest_total=interest, high_priority_count=high)
+                for sentiment, (count, influence, interest, high) in actual.items()
+            ])
+            db.session.commit()
+
+        return drift
+
+    def __repr__(self):
+        return f'<StakeholderHealthRollup {self.sentiment!r} ({self.stakeholder_count})>'
+
+
+def _contribution(stakeholder, previous=False):
+    """(sentiment, influence, interest) of a stakeholder before or after the flush"""
+    state = inspect(stakeholder)
+    values = []
+    for name in ('sentiment', 'influence_score', 'interest_score'):
+        history = state.attrs[name].history
+        if previous and history.has_changes():
+            # Mapped with active_history, so no deleted value means it was None
+            values.append(history.deleted[0] if history.deleted else None)
+        else:
+            values.append(getattr(stakeholder, name))
+    return values
+
+
+def add_contribution(deltas, sentiment, influence, interest, sign):
+    """Add (sign=1) or subtract (sign=-1) one stakeholder's contribution to a deltas dict"""
+    entry = deltas.setdefault(sentiment or '', [0, 0.0, 0.0, 0])
+    entry[0] += sign
+    entry[1] += sign * (influence or 0.0)
+    entry[2] += sign * (interest or 0.0)
+    entry[3] += sign * int(StakeholderHealthRollup.is_high_priority(influence, interest))
+
+
+@event.listens_for(Session, 'after_flush')
+def _maintain_health_rollup(session, flush_context):
+    deltas = {}
+
+    for obj in session.new:
+        if isinstance(obj, Stakeholder):
+            add_contribution(deltas, *_contribution(obj), 1)
+
+    for obj in session.dirty:
+        if isinstance(obj, Stakeholder) and session.is_modified(obj, include_collections=False):
+            state = inspect(obj)
+            if any(state.attrs[name].history.has_changes()
+                   for name in ('sentiment', 'influence_score', 'interest_score')):
+                add_contribution(deltas, *_contribution(obj, previous=True), -1)
+                add_contribution(deltas, *_contribution(obj), 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Stakeholder):
+            add_contribution(deltas, *_contribution(obj, previous=True), -1)
+
+    if deltas:
+        StakeholderHealthRollup.apply_deltas(session.connection(), deltas)
@@ -2,9 +2,12 @@
 Interaction Model - Track all stakeholder engagements
 """
 from datetime import datetime
+from sqlalchemy.orm import joinedload
+from sqlalchemy.ext.mutable import MutableList
 from app import db
+from app.models.serialization import SerializerMixin, column, iso, listed
 
-class Interaction(db.Model):
+class Interaction(SerializerMixin, db.Model):
     """
     Interaction model for logging stakeholder engagements
     
@@ -24,13 +27,36 @@ class Interaction(db.Model):
         duration_minutes: Length of interaction
         follow_up_required: Whether follow-up is needed
         follow_up_date: When to follow up
+        follow_up_task_created_at: When the follow-up scan created its task
         created_at: Record creation timestamp
         updated_at: Last update timestamp
     """
     __tablename__ = 'interactions'
-    
+    __table_args__ = (
+        # Partial indexes over open follow-ups only: the due-date scan and
+        # the per-user overdue list never touch completed or plain rows
+        db.Index('ix_interactions_open_follow_up_due', 'follow_up_date', 'id',
+                 postgresql_where=db.text('follow_up_required IS TRUE AND follow_up_completed IS NOT TRUE'),
+                 sqlite_where=db.text('follow_up_required IS 1 AND follow_up_completed IS NOT 1')),
+        db.Index('ix_interactions_open_follow_up_user', 'user_id', 'follow_up_date', 'id',
+                 postgresql_where=db.text('follow_up_required IS TRUE AND follow_up_completed IS NOT TRUE'),
+                 sqlite_where=db.text('follow_up_required IS 1 AND follow_up_completed IS NOT 1')),
+        # Open follow-ups the scan has not created a task for yet
+        db.Index('ix_interactions_follow_up_task_pending', 'follow_up_date', 'id',
+                 postgresql_where=db.text('follow_up_required IS TRUE AND follow_up_completed IS NOT TRUE '
+                                          'AND follow_up_task_created_at IS NULL'),
+                 sqlite_where=db.text('follow_up_required IS 1 AND follow_up_completed IS NOT 1 '
+                                      'AND follow_up_task_created_at IS NULL')),
+    )
+    
+    # Columns read by the interaction_stats flush hooks load the replaced
+    # value on assignment (active_history), so the hooks can subtract it
+    # even when the attribute had expired, e.g. after commit
     id = db.Column(db.Integer, primary_key=True)
-    stakeholder_id = db.Column(db.Integer, db.ForeignKey('stakeholders.id'), nullable=False, index=True)
+    stakeholder_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey('stakeholders.id'), nullable=False, index=True),
+        active_history=True
+    )
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     
     # Interaction details
@@ -40,20 +66,22 @@ class Interaction(db.Model):
     outcome = db.Column(db.Text)
     
     # Sentiment and scoring
-    sentiment = db.Column(db.String(20), default='neutral')
-    impact_on_relationship = db.Column(db.Float, default=0.0)
+    sentiment = db.column_property(db.Column(db.String(20), default='neutral'), active_history=True)
+    impact_on_relationship = db.column_property(db.Column(db.Float, default=0.0), active_history=True)
     
     # Timing
-    date = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    date = db.column_property(db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True),
+                              active_history=True)
     duration_minutes = db.Column(db.Integer)
     
     # Follow-up tracking
-    follow_up_required = db.Column(db.Boolean, default=False)
+    follow_up_required = db.column_property(db.Column(db.Boolean, default=False), active_history=True)
     follow_up_date = db.Column(db.DateTime)
-    follow_up_completed = db.Column(db.Boolean, default=False)
+    follow_up_completed = db.column_property(db.Column(db.Boolean, default=False), active_history=True)
+    follow_up_task_created_at = db.Column(db.DateTime)
     
     # Metadata
-    tags = db.Column(db.JSON, default=list)
+    tags = db.Column(MutableList.as_mutable(db.JSON), default=list)
     attachments = db.Column(db.JSON, default=list)
     
     # Timestamps
@@ -81,6 +109,25 @@ class Interaction(db.Model):
         self.interaction_type = interaction_type
         self.subject = subject
     
+    @classmethod
+    def open_follow_up(cls):
+        """Filter matching the predicate of the open follow-up partial indexes"""
+        return db.and_(cls.follow_up_required.is_(True), cls.follow_up_completed.isnot(True))
+    
+    @classmethod
+    def complete_follow_ups(cls, session, ids):
+        """
+        Mark the open follow-ups of interactions completed
+        
+        Goes through the ORM so the follow-up counters are kept in step.
+        
+        Args:
+            session: Session to load and change the interactions in
+            ids: Interaction ids, or a select of them
+        """
+        for interaction in session.scalars(db.select(cls).where(cls.id.in_(ids), cls.open_follow_up())):
+            interaction.follow_up_completed = True
+    
     def add_tag(self, tag):
         """Add a tag to interaction"""
         if not self.tags:
@@ -98,37 +145,67 @@ class Interaction(db.Model):
             'uploaded_at': datetime.utcnow().isoformat()
         })
     
-    def to_dict(self, include_stakeholder=False, include_user=False):
-        """Serialize interaction to dictionary"""
-        data = {
-            'id': self.id,
-            'stakeholder_id': self.stakeholder_id,
-            'user_id': self.user_id,
-            'interaction_type': self.interaction_type,
-            'subject': self.subject,
-            'description': self.description,
-            'outcome': self.outcome,
-            'sentiment': self.sentiment,
-            'impact_on_relationship': self.impact_on_relationship,
-            'date': self.date.isoformat(),
-            'duration_minutes': self.duration_minutes,
-            'follow_up_required': self.follow_up_required,
-            'follow_up_date': self.follow_up_date.isoformat() if self.follow_up_date else None,
-            'follow_up_completed': self.follow_up_completed,
-            'tags': self.tags or [],
-            'attachments': self.attachments or [],
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
-        }
+    @classmethod
+    def eager_load_options(cls, include_stakeholder=False, include_user=False, fields=None):
+        """
+        Loader options matching to_dict() flags
+        
+        Apply with query.options(*Interaction.eager_load_options(...)) so a
+        page of interactions is serialized without per-row lazy loads
+        """
+        options = []
+        if include_stakeholder and cls.wants(fields, 'stakeholder'):
+            options.append(joinedload(cls.stakeholder))
+        if include_user and cls.wants(fields, 'user'):
+            options.append(joinedload(cls.user))
+        return options
+    
+    # to_dict() fields in output order
+    SERIALIZED_FIELDS = {
+        'id': column('id'),
+        'stakeholder_id': column('stakeholder_id'),
+        'user_id': column('user_id'),
+        'interaction_type': column('interaction_type'),
+        'subject': column('subject'),
+        'description': column('description'),
+        'outcome': column('outcome'),
+        'sentiment': column('sentiment'),
+        'impact_on_relationship': column('impact_on_relationship'),
+        'date': iso('date'),
+        'duration_minutes': column('duration_minutes'),
+        'follow_up_required': column('follow_up_required'),
+        'follow_up_date': iso('follow_up_date'),
+        'follow_up_completed': column('follow_up_completed'),
+        'tags': listed('tags'),
+        'attachments': listed('attachments'),
+        'created_at': iso('created_at'),
+        'updated_at': iso('updated_at')
+    }
+    FIELD_COLUMNS = {
+        'stakeholder': ('stakeholder_id',),
+        'user': ('user_id',)
+    }
+    EMBEDDED_FIELDS = ('stakeholder', 'user')
+    
+    def to_dict(self, include_stakeholder=False, include_user=False, fields=None):
+        """
+        Serialize interaction to dictionary
+        
+        Args:
+            include_stakeholder: Embed stakeholder id, name and organization
+            include_user: Embed the logging user's id and name
+            fields: Optional fieldset (see SerializerMixin.parse_fields)
+        """
+        data = self.serialize_fields(fields)
         
-        if include_stakeholder and self.stakeholder:
+        if include_stakeholder and self.wants(fields, 'stakeholder') and self.stakeholder:
             data['stakeholder'] = {
                 'id': self.stakeholder.id,
                 'name': self.stakeholder.name,
                 'organization': self.stakeholder.organization
             }
         
-        if include_user and self.user:
+        if include_user and self.wants(fields, 'user') and self.user:
             data['user'] = {
                 'id': self.user.id,
                 'full_name': self.user.full_name
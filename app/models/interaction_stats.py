@@ -0,0 +1,444 @@
+"""
+Stakeholder Interaction Daily Model - Incrementally maintained interaction aggregates
+
+Also maintains the interaction counters stored on each stakeholder row
+(interaction_count, open_follow_up_count, last_interaction_at and
+last_sentiment).
+"""
+from datetime import date, datetime
+from dateutil.parser import isoparse
+from sqlalchemy import bindparam, event, func, inspect
+from sqlalchemy.orm import Session
+from app import db
+from app.models.interaction import Interaction
+from app.models.stakeholder import Stakeholder
+
+class StakeholderInteractionDaily(db.Model):
+    """
+    Per-stakeholder, per-day interaction totals
+
+    Kept in step with interaction inserts, updates and deletes by a flush
+    hook, so rolling-window figures (e.g. the 90-day relationship health
+    inputs) are a sum over at most one row per day instead of a rescan
+    of the interactions. Bulk SQL writes must call apply_deltas()
+    themselves; `flask rollups rebuild-interactions` repairs drift.
+
+    Attributes:
+        stakeholder_id: Foreign key to Stakeholder
+        day: Calendar day of the interactions
+        interaction_count: Interactions on that day
+        positive_count: Of which with positive sentiment
+        impact_total: Sum of impact_on_relationship
+        updated_at: Last update timestamp
+    """
+    __tablename__ = 'stakeholder_interaction_daily'
+
+    stakeholder_id = db.Column(db.Integer, db.ForeignKey('stakeholders.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    interaction_count = db.Column(db.Integer, default=0, nullable=False)
+    positive_count = db.Column(db.Integer, default=0, nullable=False)
+    impact_total = db.Column(db.Float, default=0.0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    @classmethod
+    def apply_deltas(cls, connection, deltas):
+        """
+        Add per-day deltas to the bucket rows
+
+        Args:
+            connection: Connection inside the writing transaction
+            deltas: Dict of (stakeholder_id, day) -> [count, positive, impact]
+        """
+        table = cls.__table__
+        now = datetime.utcnow()
+        for (stakeholder_id, day), (count, positive, impact) in deltas.items():
+            if not (count or positive or impact):
+                continue
+            result = connection.execute(
+                table.update().where(
+                    table.c.stakeholder_id == stakeholder_id,
+                    table.c.day == day
+                ).values(
+                    interaction_count=table.c.interaction_count + count,
+                    positive_count=table.c.positive_count + positive,
+                    impact_total=table.c.impact_total + impact,
+                    updated_at=now
+                )
+            )
+            if result.rowcount == 0:
+                connection.execute(table.insert().values(
+                    stakeholder_id=stakeholder_id,
+                    day=day,
+                    interaction_count=count,
+                    positive_count=positive,
+                    impact_total=impact,
+                    updated_at=now
+                ))
+
+    @classmethod
+    def window_totals(cls, stakeholder_id, since):
+        """
+        Totals from the given day onwards
+
+        Returns:
+            (interaction_count, positive_count, impact_total)
+        """
+        return db.session.query(
+            func.coalesce(func.sum(cls.interaction_count), 0),
+            func.coalesce(func.sum(cls.positive_count), 0),
+            func.coalesce(func.sum(cls.impact_total), 0.0)
+        ).filter(
+            cls.stakeholder_id == stakeholder_id,
+            cls.day >= since
+        ).one()
+
+    @classmethod
+    def compute_from_source(cls):
+        """
+        Aggregate the interactions table from scratch
+
+        Returns:
+            Dict of (stakeholder_id, day) -> [count, positive, impact]
+        """
+        day = func.date(Interaction.date)
+        positive = db.case((Interaction.sentiment == 'positive', 1), else_=0)
+        rows = db.session.query(
+            Interaction.stakeholder_id,
+            day,
+            func.count(Interaction.id),
+            func.coalesce(func.sum(positive), 0),
+            func.coalesce(func.sum(Interaction.impact_on_relationship), 0.0)
+        ).group_by(Interaction.stakeholder_id, day).all()
+
+        return {
+            (stakeholder_id, _as_day(bucket)): [count, positive_count, impact]
+            for stakeholder_id, bucket, count, positive_count, impact in rows
+        }
+
+    @classmethod
+    def rebuild(cls, dry_run=False):
+        """
+        Recompute every bucket from the interactions table
+
+        Args:
+            dry_run: Only report drift, leave the stored rows untouched
+
+        Returns:
+            Number of buckets that drifted
+        """
+        actual = cls.compute_from_source()
+        stored = {
+            (r.stakeholder_id, r.day): [r.interaction_count, r.positive_count, r.impact_total]
+            for r in db.session.query(
+                cls.stakeholder_id, cls.day, cls.interaction_count, cls.positive_count, cls.impact_total
+            ).filter(cls.interaction_count != 0)
+        }
+
+        drifted = 0
+        for key in set(actual) | set(stored):
+            expected = actual.get(key, [0, 0, 0.0])
+            current = stored.get(key, [0, 0, 0.0])
+            if current[:2] != expected[:2] or abs(current[2] - expected[2]) > 1e-6:
+                drifted += 1
+
+        if not dry_run:
+            now = datetime.utcnow()
+            cls.query.delete()
+            if actual:
+                db.session.execute(cls.__table__.insert(), [
+                    {'stakeholder_id': stakeholder_id, 'day': day, 'interaction_count': count,
+                     'positive_count': positive, 'impact_total': impact, 'updated_at': now}
+                    for (stakeholder_id, day), (count, positive, impact) in actual.items()
+                ])
+            db.session.commit()
+
+        return drifted
+
+    def __repr__(self):
+        return f'<StakeholderInteractionDaily {self.stakeholder_id} {self.day}>'
+
+
+def _as_day(value):
+    """Calendar day of a datetime, date or ISO string"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return isoparse(value).date()
+
+
+def add_interaction(deltas, stakeholder_id, when, sentiment, impact, sign):
+    """Add (sign=1) or subtract (sign=-1) one interaction to a deltas dict"""
+    if stakeholder_id is None or when is None:
+        return
+    entry = deltas.setdefault((stakeholder_id, _as_day(when)), [0, 0, 0.0])
+    entry[0] += sign
+    entry[1] += sign * int(sentiment == 'positive')
+    entry[2] += sign * (impact or 0.0)
+
+
+# Stakeholder columns derived from its interactions
+COUNTER_FIELDS = ('interaction_count', 'open_follow_up_count', 'last_interaction_at', 'last_sentiment')
+
+
+def is_open_follow_up(follow_up_required, follow_up_completed):
+    """Whether an interaction counts towards open_follow_up_count"""
+    return bool(follow_up_required) and not follow_up_completed
+
+
+def add_counters(counters, stakeholder_id, open_follow_up, sign):
+    """Add (sign=1) or subtract (sign=-1) one interaction to a counter deltas dict"""
+    if stakeholder_id is None:
+        return
+    entry = counters.setdefault(stakeholder_id, [0, 0])
+    entry[0] += sign
+    entry[1] += sign * int(open_follow_up)
+
+
+def add_latest(latest, stakeholder_id, when, sentiment):
+    """Keep the newest (date, sentiment) per stakeholder among inserted interactions"""
+    if stakeholder_id is None or when is None:
+        return
+    if isinstance(when, str):
+        when = isoparse(when)
+    current = latest.get(stakeholder_id)
+    if current is None or when >= current[0]:
+        latest[stakeholder_id] = (when, sentiment)
+
+
+def apply_counter_deltas(connection, counters, latest=None, stale=()):
+    """
+    Update the interaction counters on stakeholder rows
+
+    Args:
+        connection: Connection inside the writing transaction
+        counters: Dict of stakeholder_id -> [interaction delta, open follow-up delta]
+        latest: Dict of stakeholder_id -> (date, sentiment) of inserted
+            interactions; applied only where newer than the stored value
+        stale: Stakeholder ids whose latest interaction may have changed
+            or gone, re-read from the interactions table
+    """
+    table = Stakeholder.__table__
+    rows = [
+        {'b_id': stakeholder_id, 'count': count, 'open': open_count}
+        for stakeholder_id, (count, open_count) in counters.items()
+        if count or open_count
+    ]
+    if rows:
+        connection.execute(
+            table.update().where(table.c.id == bindparam('b_id')).values(
+                interaction_count=table.c.interaction_count + bindparam('count'),
+                open_follow_up_count=table.c.open_follow_up_count + bindparam('open')
+            ),
+            rows
+        )
+
+    stale = set(stale)
+    rows = [
+        {'b_id': stakeholder_id, 'b_when': when, 'b_sentiment': sentiment}
+        for stakeholder_id, (when, sentiment) in (latest or {}).items()
+        if stakeholder_id not in stale
+    ]
+    if rows:
+        connection.execute(
+            table.update().where(
+                table.c.id == bindparam('b_id'),
+                db.or_(table.c.last_interaction_at.is_(None),
+                       table.c.last_interaction_at <= bindparam('b_when'))
+            ).values(last_interaction_at=bindparam('b_when'), last_sentiment=bindparam('b_sentiment')),
+            rows
+        )
+
+    if stale:
+        refresh_latest(connection, stale)
+
+
+def refresh_latest(connection, stakeholder_ids):
+    """Re-read last_interaction_at and last_sentiment from the interactions table"""
+    table = Stakeholder.__table__
+    interactions = Interaction.__table__
+    rows = []
+    for stakeholder_id in stakeholder_ids:
+        newest = connection.execute(
+            db.select(interactions.c.date, interactions.c.sentiment).where(
+                interactions.c.stakeholder_id == stakeholder_id
+            ).order_by(interactions.c.date.desc(), interactions.c.id.desc()).limit(1)
+        ).first()
+        when, sentiment = newest if newest else (None, None)
+        rows.append({'b_id': stakeholder_id, 'b_when': when, 'b_sentiment': sentiment})
+    connection.execute(
+        table.update().where(table.c.id == bindparam('b_id')).values(
+            last_interaction_at=bindparam('b_when'), last_sentiment=bindparam('b_sentiment')
+        ),
+        rows
+    )
+
+
+def compute_counters():
+    """
+    Interaction counters of every stakeholder with interactions
+
+    Returns:
+        Dict of stakeholder_id -> (interaction_count, open_follow_up_count,
+        last_interaction_at, last_sentiment)
+    """
+    open_follow_up = db.case(
+        (db.and_(Interaction.follow_up_required.is_(True),
+                 Interaction.follow_up_completed.isnot(True)), 1),
+        else_=0
+    )
+    totals = db.session.query(
+        Interaction.stakeholder_id,
+        func.count(Interaction.id),
+        func.coalesce(func.sum(open_follow_up), 0)
+    ).group_by(Interaction.stakeholder_id).all()
+
+    # Newest interaction per stakeholder, highest id on equal dates
+    ranked = db.session.query(
+        Interaction.stakeholder_id,
+        Interaction.date,
+        Interaction.sentiment,
+        func.row_number().over(
+            partition_by=Interaction.stakeholder_id,
+            order_by=(Interaction.date.desc(), Interaction.id.desc())
+        ).label('rank')
+    ).subquery()
+    newest = {
+        stakeholder_id: (when, sentiment)
+        for stakeholder_id, when, sentiment in db.session.query(
+            ranked.c.stakeholder_id, ranked.c.date, ranked.c.sentiment
+        ).filter(ranked.c.rank == 1)
+    }
+
+    return {
+        stakeholder_id: (count, open_count) + newest[stakeholder_id]
+        for stakeholder_id, count, open_count in totals
+    }
+
+
+def rebuild_counters(dry_run=False):
+    """
+    Recompute every stakeholder's interaction counters
+
+    Args:
+        dry_run: Only report drift, leave the stored values untouched
+
+    Returns:
+        Number of stakeholders whose counters drifted
+    """
+    actual = compute_counters()
+    empty = (0, 0, None, None)
+    drifted = []
+    for row in db.session.query(Stakeholder.id, *(getattr(Stakeholder, f) for f in COUNTER_FIELDS)):
+        expected = actual.get(row[0], empty)
+        if tuple(row[1:]) != tuple(expected):
+            drifted.append({'b_id': row[0], **{f'b_{f}': v for f, v in zip(COUNTER_FIELDS, expected)}})
+
+    if drifted and not dry_run:
+        table = Stakeholder.__table__
+        db.session.execute(
+            table.update().where(table.c.id == bindparam('b_id')).values(
+                **{field: bindparam(f'b_{field}') for field in COUNTER_FIELDS}
+            ),
+            drifted
+        )
+        db.session.commit()
+
+    return len(drifted)
+
+
+_TRACKED = ('stakeholder_id', 'date', 'sentiment', 'impact_on_relationship')
+_COUNTED = ('stakeholder_id', 'date', 'sentiment', 'follow_up_required', 'follow_up_completed')
+
+
+def _values(interaction, previous=False, names=_TRACKED):
+    """Tracked attribute values before or after the flush"""
+    state = inspect(interaction)
+    values = []
+    for name in names:
+        history = state.attrs[name].history
+        if previous and history.has_changes():
+            # Mapped with active_history, so no deleted value means it was None
+            values.append(history.deleted[0] if history.deleted else None)
+        else:
+            values.append(getattr(interaction, name))
+    return values
+
+
+@event.listens_for(Session, 'after_flush')
+def _maintain_interaction_daily(session, flush_context):
+    deltas = {}
+    # Buckets of deleted stakeholders go with them
+    removed = {obj.id for obj in session.deleted if isinstance(obj, Stakeholder)}
+
+    for obj in session.new:
+        if isinstance(obj, Interaction):
+            add_interaction(deltas, *_values(obj), 1)
+
+    for obj in session.dirty:
+        if isinstance(obj, Interaction) and session.is_modified(obj, include_collections=False):
+            state = inspect(obj)
+            if any(state.attrs[name].history.has_changes() for name in _TRACKED):
+                add_interaction(deltas, *_values(obj, previous=True), -1)
+                add_interaction(deltas, *_values(obj), 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Interaction):
+            add_interaction(deltas, *_values(obj, previous=True), -1)
+
+    if removed:
+        table = StakeholderInteractionDaily.__table__
+        session.connection().execute(table.delete().where(table.c.stakeholder_id.in_(removed)))
+        deltas = {key: value for key, value in deltas.items() if key[0] not in removed}
+
+    if deltas:
+        StakeholderInteractionDaily.apply_deltas(session.connection(), deltas)
+
+
+def _count(counters, latest, interaction, sign, previous=False):
+    stakeholder_id, when, sentiment, required, completed = _values(interaction, previous, _COUNTED)
+    add_counters(counters, stakeholder_id, is_open_follow_up(required, completed), sign)
+    if sign > 0:
+        add_latest(latest, stakeholder_id, when, sentiment)
+
+
+@event.listens_for(Session, 'after_flush')
+def _maintain_stakeholder_counters(session, flush_context):
+    counters, latest, stale = {}, {}, set()
+    removed = {obj.id for obj in session.deleted if isinstance(obj, Stakeholder)}
+
+    for obj in session.new:
+        if isinstance(obj, Interaction):
+            _count(counters, latest, obj, 1)
+
+    for obj in session.dirty:
+        if isinstance(obj, Interaction) and session.is_modified(obj, include_collections=False):
+            state = inspect(obj)
+            changed = {name for name in _COUNTED if state.attrs[name].history.has_changes()}
+            if changed:
+                _count(counters, latest, obj, -1, previous=True)
+                _count(counters, latest, obj, 1)
+            if changed & {'stakeholder_id', 'date', 'sentiment'}:
+                # The edited row may have been, or may no longer be, the newest
+                stale.update({_values(obj, True, _COUNTED)[0], obj.stakeholder_id})
+
+    for obj in session.deleted:
+        if isinstance(obj, Interaction):
+            stakeholder_id = _values(obj, True, _COUNTED)[0]
+            _count(counters, latest, obj, -1, previous=True)
+            stale.add(stakeholder_id)
+
+    counters = {sid: delta for sid, delta in counters.items() if sid not in removed}
+    latest = {sid: value for sid, value in latest.items() if sid not in removed}
+    stale -= removed | {None}
+    if not (counters or latest or stale):
+        return
+
+    apply_counter_deltas(session.connection(), counters, latest, stale)
+
+    # Loaded stakeholders re-read the counters on next access
+    mapper = inspect(Stakeholder)
+    for stakeholder_id in set(counters) | set(latest) | stale:
+        obj = session.identity_map.get(mapper.identity_key_from_primary_key([stakeholder_id]))
+        if obj is not None:
+            session.expire(obj, COUNTER_FIELDS)
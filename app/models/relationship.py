@@ -2,9 +2,11 @@
 Relationship Model - Stakeholder Connections and History
 """
 from datetime import datetime
+from sqlalchemy.ext.mutable import MutableList
 from app import db
+from app.models.serialization import SerializerMixin, column, iso, listed
 
-class Relationship(db.Model):
+class Relationship(SerializerMixin, db.Model):
     """
     Relationship model for tracking connections between stakeholders
     
@@ -33,7 +35,7 @@ class Relationship(db.Model):
     
     # Context and notes
     notes = db.Column(db.Text)
-    tags = db.Column(db.JSON, default=list)
+    tags = db.Column(MutableList.as_mutable(db.JSON), default=list)
     
     # Status tracking
     is_active = db.Column(db.Boolean, default=True)
@@ -42,6 +44,9 @@ class Relationship(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
+    # Relationships (the primary stakeholder is the 'stakeholder' backref)
+    related_stakeholder = db.relationship('Stakeholder', foreign_keys=[related_stakeholder_id])
+    
     # Valid relationship types
     RELATIONSHIP_TYPES = [
         'colleague',
@@ -71,35 +76,79 @@ class Relationship(db.Model):
         if tag not in self.tags:
             self.tags.append(tag)
     
-    def to_dict(self, include_stakeholders=False):
-        """Serialize relationship to dictionary"""
-        data = {
-            'id': self.id,
-            'stakeholder_id': self.stakeholder_id,
-            'related_stakeholder_id': self.related_stakeholder_id,
-            'relationship_type': self.relationship_type,
-            'strength': self.strength,
-            'notes': self.notes,
-            'tags': self.tags or [],
-            'is_active': self.is_active,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
-        }
+    @staticmethod
+    def to_dict_many(relationships, include_stakeholders=False, fields=None):
+        """
+        Serialize a result set of relationships
+        
+        Resolves the names of every stakeholder on either side of the
+        relationships with a single IN query instead of two loads per row
+        """
+        names = None
+        if include_stakeholders and (Relationship.wants(fields, 'stakeholder')
+                                     or Relationship.wants(fields, 'related_stakeholder')):
+            from app.models.stakeholder import Stakeholder
+            ids = set()
+            for r in relationships:
+                ids.add(r.stakeholder_id)
+                ids.add(r.related_stakeholder_id)
+            names = dict(
+                db.session.query(Stakeholder.id, Stakeholder.name)
+                .filter(Stakeholder.id.in_(ids))
+                .all()
+            ) if ids else {}
+        
+        return [r.to_dict(include_stakeholders=include_stakeholders, stakeholder_names=names, fields=fields)
+                for r in relationships]
+    
+    # to_dict() fields in output order
+    SERIALIZED_FIELDS = {
+        'id': column('id'),
+        'stakeholder_id': column('stakeholder_id'),
+        'related_stakeholder_id': column('related_stakeholder_id'),
+        'relationship_type': column('relationship_type'),
+        'strength': column('strength'),
+        'notes': column('notes'),
+        'tags': listed('tags'),
+        'is_active': column('is_active'),
+        'created_at': iso('created_at'),
+        'updated_at': iso('updated_at')
+    }
+    FIELD_COLUMNS = {
+        'stakeholder': ('stakeholder_id',),
+        'related_stakeholder': ('related_stakeholder_id',)
+    }
+    EMBEDDED_FIELDS = ('stakeholder', 'related_stakeholder')
+    
+    def to_dict(self, include_stakeholders=False, stakeholder_names=None, fields=None):
+        """
+        Serialize relationship to dictionary
+        
+        Args:
+            include_stakeholders: Embed id and name of both stakeholders
+            stakeholder_names: Optional preloaded {id: name} lookup (see to_dict_many)
+            fields: Optional fieldset (see SerializerMixin.parse_fields)
+        """
+        data = self.serialize_fields(fields)
         
         if include_stakeholders:
-            if self.stakeholder:
+            if stakeholder_names is None:
+                stakeholder_names = {}
+                for name, s in (('stakeholder', self.stakeholder),
+                                ('related_stakeholder', self.related_stakeholder)):
+                    if s and self.wants(fields, name):
+                        stakeholder_names[s.id] = s.name
+            
+            if self.wants(fields, 'stakeholder') and self.stakeholder_id in stakeholder_names:
                 data['stakeholder'] = {
-                    'id': self.stakeholder.id,
-                    'name': self.stakeholder.name
+                    'id': self.stakeholder_id,
+                    'name': stakeholder_names[self.stakeholder_id]
                 }
             
-            # Get related stakeholder using query
-            from app.models.stakeholder import Stakeholder
-            related = Stakeholder.query.get(self.related_stakeholder_id)
-            if related:
+            if self.wants(fields, 'related_stakeholder') and self.related_stakeholder_id in stakeholder_names:
                 data['related_stakeholder'] = {
-                    'id': related.id,
-                    'name': related.name
+                    'id': self.related_stakeholder_id,
+                    'name': stakeholder_names[self.related_stakeholder_id]
                 }
         
         return data
@@ -0,0 +1,182 @@
+"""
+Serialization helpers - Sparse fieldsets and compiled serializers for model to_dict()
+"""
+from sqlalchemy.orm import load_only
+
+# Compiled serializers kept per (model, fieldset); fieldsets come from
+# clients, so the cache is bounded and further ones are compiled per call
+MAX_COMPILED_SERIALIZERS = 512
+
+_serializers = {}
+
+
+class InvalidFieldsError(ValueError):
+    """Raised when a fieldset names fields a model does not serialize"""
+
+
+# Getter factories. Each getter also records the attribute it reads and
+# an inline Python `expression` for compile_serializer(), where {value}
+# stands for the attribute value and {var} for a free temporary name.
+
+def iso(name):
+    """Getter returning a date/datetime attribute in ISO 8601, or None"""
+    def get(obj):
+        value = getattr(obj, name)
+        return value.isoformat() if value else None
+    get.attribute = name
+    get.expression = '({var}.isoformat() if ({var} := {value}) else None)'
+    return get
+
+
+def listed(name):
+    """Getter returning a JSON list attribute, [] when unset"""
+    def get(obj):
+        return getattr(obj, name) or []
+    get.attribute = name
+    get.expression = '({value} or [])'
+    return get
+
+
+def column(name):
+    """Getter returning an attribute unchanged"""
+    def get(obj):
+        return getattr(obj, name)
+    get.attribute = name
+    get.expression = '{value}'
+    return get
+
+
+def compile_serializer(model, fields=None):
+    """
+    Build a function serializing model instances to a fieldset's dict
+
+    Getters from the factories above are inlined into a single dict
+    display that reads the loaded values straight from the instance
+    __dict__, skipping the instrumented attribute descriptors; any other
+    getter (e.g. a lambda for a computed field) is called. When a value
+    is not loaded (expired or deferred), the same dict is built through
+    normal attribute access, which loads it. The result equals calling
+    every getter in turn.
+    """
+    namespace = {}
+    fast_items, items = [], []
+    for index, (name, get) in enumerate(model.SERIALIZED_FIELDS.items()):
+        if fields is not None and name not in fields:
+            continue
+        expression = getattr(get, 'expression', None)
+        if expression is None:
+            namespace[f'_get{index}'] = get
+            fast = slow = f'_get{index}(obj)'
+        else:
+            fast = expression.format(value=f'state[{get.attribute!r}]', var=f'_v{index}')
+            slow = expression.format(value=f'obj.{get.attribute}', var=f'_v{index}')
+        fast_items.append(f'{name!r}: {fast}')
+        items.append(f'{name!r}: {slow}')
+
+    source = (
+        'def serialize(obj):\n'
+        '    state = obj.__dict__\n'
+        '    try:\n'
+        f"        return {{{', '.join(fast_items)}}}\n"
+        '    except KeyError:\n'
+        f"        return {{{', '.join(items)}}}\n"
+    )
+    exec(compile(source, f'<serializer {model.__name__}>', 'exec'), namespace)
+    return namespace['serialize']
+
+
+def compile_serializers():
+    """Compile the full-fieldset serializer of every SerializerMixin model"""
+    def models(cls):
+        for subclass in cls.__subclasses__():
+            yield subclass
+            yield from models(subclass)
+
+    for model in models(SerializerMixin):
+        if model.SERIALIZED_FIELDS:
+            model.serializer()
+
+
+class SerializerMixin:
+    """
+    Sparse fieldset support for models with a to_dict()
+
+    SERIALIZED_FIELDS lists the flat to_dict() fields in output order
+    (name -> getter). A field computed from other columns declares them
+    in FIELD_COLUMNS; any other field reads the column of the same name.
+    EMBEDDED_FIELDS names the nested objects to_dict() can add, which a
+    fieldset may select as well.
+
+    With a fieldset, to_dict() only evaluates the requested fields and
+    load_only_options() restricts the SELECT to the columns they read,
+    so unrequested Text/JSON columns are never fetched. The flat fields
+    are built by a serializer compiled once per model and fieldset.
+    """
+
+    SERIALIZED_FIELDS = {}
+    FIELD_COLUMNS = {}
+    EMBEDDED_FIELDS = ()
+
+    @classmethod
+    def parse_fields(cls, value):
+        """
+        Fieldset from a comma-separated list of field names
+
+        Returns:
+            Frozenset of names (always including id), or None for all fields
+
+        Raises:
+            InvalidFieldsError: A name is not a field of this model
+        """
+        names = {name.strip() for name in (value or '').split(',') if name.strip()}
+        if not names:
+            return None
+        unknown = names - cls.SERIALIZED_FIELDS.keys() - set(cls.EMBEDDED_FIELDS)
+        if unknown:
+            raise InvalidFieldsError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+        return frozenset(names | {'id'})
+
+    @classmethod
+    def field_columns(cls, fields):
+        """Column attribute names read when serializing a fieldset"""
+        names = {'id'}
+        for name in fields:
+            if name in cls.FIELD_COLUMNS:
+                names.update(cls.FIELD_COLUMNS[name])
+            elif name in cls.SERIALIZED_FIELDS:
+                names.add(name)
+        return sorted(names)
+
+    @classmethod
+    def load_only_options(cls, fields, *extra_columns):
+        """
+        Loader options selecting only the columns a fieldset needs
+
+        Args:
+            fields: Fieldset from parse_fields(), None loads every column
+            extra_columns: Further columns the caller reads, e.g. the
+                keyset pagination sort keys
+        """
+        if fields is None:
+            return []
+        return [load_only(*(getattr(cls, name) for name in cls.field_columns(fields)), *extra_columns)]
+
+    @staticmethod
+    def wants(fields, name):
+        """Whether a fieldset (None meaning all fields) includes a field"""
+        return fields is None or name in fields
+
+    @classmethod
+    def serializer(cls, fields=None):
+        """Compiled serializer for a fieldset, built on first use"""
+        key = (cls, fields)
+        serialize = _serializers.get(key)
+        if serialize is None:
+            serialize = compile_serializer(cls, fields)
+            if len(_serializers) < MAX_COMPILED_SERIALIZERS:
+                _serializers[key] = serialize
+        return serialize
+
+    def serialize_fields(self, fields=None):
+        """The flat to_dict() fields, limited to a fieldset"""
+        return self.serializer(fields)(self)
@@ -1,10 +1,24 @@
 """
 Stakeholder Model - Profile Management and Relationship Mapping
 """
+import re
 from datetime import datetime
+from sqlalchemy import event, inspect, literal_column
+from sqlalchemy.ext.mutable import MutableList
+from sqlalchemy.orm import Session
 from app import db
+from app.models.serialization import SerializerMixin, column, iso, listed
 
-class Stakeholder(db.Model):
+# Document indexed for PostgreSQL full-text search; queries must use the
+# identical expression for the planner to pick ix_stakeholders_search
+SEARCH_VECTOR_SQL = (
+    "to_tsvector('simple'::regconfig, "
+    "coalesce(name, '') || ' ' || coalesce(organization, '') || ' ' || "
+    "coalesce(title, '') || ' ' || coalesce(notes, '') || ' ' || "
+    "coalesce(CAST(tags AS TEXT), ''))"
+)
+
+class Stakeholder(SerializerMixin, db.Model):
     """
     Stakeholder model for managing external relationships
     
@@ -20,13 +34,31 @@ class Stakeholder(db.Model):
         phone: Contact phone
         influence_score: Influence level (-10 to 10)
         interest_score: Interest level (-10 to 10)
+        interest_adjustment: Part of interest_score added from recent
+            interactions by StakeholderService.update_relationship_health
         sentiment: Current sentiment (Proactively Defend, Defend, Protect, etc.)
+        engagement_score: Last computed engagement score (0-10)
         tags: JSON array of categorization tags
         notes: Additional context and notes
+        dedup_key: Normalized email, or name + organization, used to match
+            imports; unique, so later duplicates of a contact keep NULL
+        interaction_count: Number of logged interactions
+        open_follow_up_count: Interactions with a follow-up not yet completed
+        last_interaction_at: Date of the most recent interaction
+        last_sentiment: Sentiment of the most recent interaction
         created_at: Record creation timestamp
         updated_at: Last update timestamp
     """
     __tablename__ = 'stakeholders'
+    __table_args__ = (
+        # Full-text and trigram indexes backing stakeholder search
+        db.Index('ix_stakeholders_search', db.text(SEARCH_VECTOR_SQL),
+                 postgresql_using='gin').ddl_if(dialect='postgresql'),
+        db.Index('ix_stakeholders_name_trgm', 'name', postgresql_using='gin',
+                 postgresql_ops={'name': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        db.Index('ix_stakeholders_organization_trgm', 'organization', postgresql_using='gin',
+                 postgresql_ops={'organization': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False, index=True)
@@ -37,15 +69,21 @@ class Stakeholder(db.Model):
     linkedin_url = db.Column(db.String(500))
     twitter_handle = db.Column(db.String(100))
     
-    # Stakeholder mapping scores
-    influence_score = db.Column(db.Float, default=0.0, nullable=False)
-    interest_score = db.Column(db.Float, default=0.0, nullable=False)
+    # Stakeholder mapping scores. These and sentiment load the replaced
+    # value on assignment (active_history) so the health rollup hook can
+    # subtract it even when the attribute had expired, e.g. after commit
+    influence_score = db.column_property(db.Column(db.Float, default=0.0, nullable=False),
+                                         active_history=True)
+    interest_score = db.column_property(db.Column(db.Float, default=0.0, nullable=False),
+                                        active_history=True)
+    interest_adjustment = db.Column(db.Float, default=0.0, nullable=False)
     
     # Relationship status based on HP 10-step framework
-    sentiment = db.Column(db.String(50), default='Identify')
+    sentiment = db.column_property(db.Column(db.String(50), default='Identify'), active_history=True)
+    engagement_score = db.Column(db.Float, default=0.0)
     
     # Categorization and context
-    tags = db.Column(db.JSON, default=list)
+    tags = db.Column(MutableList.as_mutable(db.JSON), default=list)
     stakeholder_type = db.Column(db.String(100))
     priority = db.Column(db.String(20), default='Medium')
     
@@ -53,6 +91,19 @@ class Stakeholder(db.Model):
     notes = db.Column(db.Text)
     address = db.Column(db.Text)
     
+    # Import deduplication: the first row with a key holds it
+    dedup_key = db.Column(db.String(512), unique=True, index=True)
+    
+    # Not stored: id of the stakeholder already holding the key this one
+    # was given by its last flush, which then left it unkeyed
+    duplicate_of = None
+    
+    # Interaction counters, kept in step by the interaction flush hook
+    interaction_count = db.Column(db.Integer, default=0, nullable=False)
+    open_follow_up_count = db.Column(db.Integer, default=0, nullable=False)
+    last_interaction_at = db.Column(db.DateTime, index=True)
+    last_sentiment = db.Column(db.String(20))
+    
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -81,25 +132,56 @@ class Stakeholder(db.Model):
         - Low interest + High influence = Defend/Protect
         - Low interest + Low influence = Monitor
         """
-        if self.interest_score >= 5 and self.influence_score >= 5:
+        return Stakeholder.relationship_status_for(self.influence_score, self.interest_score)
+    
+    @staticmethod
+    def relationship_status_for(influence_score, interest_score):
+        """Relationship status for raw scores (used where no ORM object is loaded)"""
+        # Unset scores count as neutral (column defaults apply only at insert)
+        influence_score = influence_score or 0.0
+        interest_score = interest_score or 0.0
+        
+        if interest_score >= 5 and influence_score >= 5:
             return 'Strategic Partner'
-        elif self.interest_score >= 5 and self.influence_score >= 2:
+        elif interest_score >= 5 and influence_score >= 2:
             return 'High Value Relationship'
-        elif self.interest_score >= 2 and self.influence_score >= 5:
+        elif interest_score >= 2 and influence_score >= 5:
             return 'Collaborate'
-        elif self.interest_score >= 0 and self.influence_score >= 5:
+        elif interest_score >= 0 and influence_score >= 5:
             return 'Protect'
-        elif self.interest_score <= -5 and self.influence_score >= 5:
+        elif interest_score <= -5 and influence_score >= 5:
             return 'Proactively Defend'
-        elif self.interest_score <= -2 and self.influence_score >= 5:
+        elif interest_score <= -2 and influence_score >= 5:
             return 'Defend'
-        elif self.interest_score >= 2:
+        elif interest_score >= 2:
             return 'Commit'
-        elif self.interest_score >= 0:
+        elif interest_score >= 0:
             return 'Connect'
         else:
             return 'Monitor'
     
+    @staticmethod
+    def dedup_key_for(name, email=None, organization=None):
+        """
+        Normalized identity used to recognize the same contact across imports
+        
+        The email address when present, otherwise name and organization
+        lowercased with punctuation and repeated whitespace removed.
+        """
+        email = (email or '').strip().lower()
+        if email:
+            return f'email:{email}'[:512]
+        
+        def normalize(value):
+            return ' '.join(re.sub(r'[^\w]+', ' ', (value or '').lower()).split())
+        
+        return f'name:{normalize(name)}|{normalize(organization)}'[:512]
+    
+    @staticmethod
+    def search_vector():
+        """PostgreSQL tsvector over name, organization, title, notes and tags"""
+        return literal_column(SEARCH_VECTOR_SQL)
+    
     def add_tag(self, tag):
         """Add a tag to stakeholder"""
         if not self.tags:
@@ -112,33 +194,100 @@ class Stakeholder(db.Model):
         if self.tags and tag in self.tags:
             self.tags.remove(tag)
     
-    def to_dict(self, include_interactions=False):
-        """Serialize stakeholder to dictionary"""
-        data = {
-            'id': self.id,
-            'name': self.name,
-            'title': self.title,
-            'organization': self.organization,
-            'email': self.email,
-            'phone': self.phone,
-            'linkedin_url': self.linkedin_url,
-            'twitter_handle': self.twitter_handle,
-            'influence_score': self.influence_score,
-            'interest_score': self.interest_score,
-            'sentiment': self.sentiment or self.calculate_relationship_status(),
-            'tags': self.tags or [],
-            'stakeholder_type': self.stakeholder_type,
-            'priority': self.priority,
-            'notes': self.notes,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
-        }
+    # to_dict() fields in output order
+    SERIALIZED_FIELDS = {
+        'id': column('id'),
+        'name': column('name'),
+        'title': column('title'),
+        'organization': column('organization'),
+        'email': column('email'),
+        'phone': column('phone'),
+        'linkedin_url': column('linkedin_url'),
+        'twitter_handle': column('twitter_handle'),
+        'influence_score': column('influence_score'),
+        'interest_score': column('interest_score'),
+        'sentiment': lambda s: s.sentiment or s.calculate_relationship_status(),
+        'engagement_score': column('engagement_score'),
+        'tags': listed('tags'),
+        'stakeholder_type': column('stakeholder_type'),
+        'priority': column('priority'),
+        'notes': column('notes'),
+        'interaction_count': lambda s: s.interaction_count or 0,
+        'open_follow_up_count': lambda s: s.open_follow_up_count or 0,
+        'last_interaction_at': iso('last_interaction_at'),
+        'last_sentiment': column('last_sentiment'),
+        'created_at': iso('created_at'),
+        'updated_at': iso('updated_at')
+    }
+    FIELD_COLUMNS = {
+        'sentiment': ('sentiment', 'influence_score', 'interest_score'),
+        'interactions': ()
+    }
+    EMBEDDED_FIELDS = ('interactions',)
+    
+    def to_dict(self, include_interactions=False, fields=None):
+        """
+        Serialize stakeholder to dictionary
+        
+        Args:
+            include_interactions: Embed the latest interactions
+            fields: Optional fieldset (see SerializerMixin.parse_fields)
+        """
+        data = self.serialize_fields(fields)
         
-        if include_interactions:
+        if include_interactions and self.wants(fields, 'interactions'):
             data['interactions'] = [i.to_dict() for i in self.interactions.limit(10)]
-            data['interaction_count'] = self.interactions.count()
         
         return data
     
     def __repr__(self):
         return f'<Stakeholder {self.name}>'
+
+
+# Attributes the dedup key is derived from
+DEDUP_KEY_ATTRIBUTES = ('name', 'email', 'organization')
+
+
+@event.listens_for(Session, 'before_flush')
+def _set_dedup_keys(session, flush_context, instances):
+    """
+    Key new stakeholders and those whose identity changed
+
+    Keys already held are read with one query per flush. A stakeholder
+    whose key is held by another row, or by an earlier object of the
+    same flush, is left unkeyed and gets duplicate_of set.
+    """
+    keys = {}
+    for obj in session.new:
+        if isinstance(obj, Stakeholder):
+            keys[obj] = Stakeholder.dedup_key_for(obj.name, obj.email, obj.organization)
+    for obj in session.dirty:
+        if isinstance(obj, Stakeholder):
+            state = inspect(obj)
+            if any(state.attrs[name].history.has_changes() for name in DEDUP_KEY_ATTRIBUTES):
+                keys[obj] = Stakeholder.dedup_key_for(obj.name, obj.email, obj.organization)
+    keys = {obj: key for obj, key in keys.items() if key != obj.dedup_key}
+    if not keys:
+        return
+
+    holders = dict(session.execute(
+        db.select(Stakeholder.dedup_key, Stakeholder.id).where(Stakeholder.dedup_key.in_(set(keys.values())))
+    ).all())
+    pending = {}
+    for obj, key in keys.items():
+        obj.duplicate_of = None
+        if key in holders and holders[key] != obj.id:
+            obj.dedup_key, obj.duplicate_of = None, holders[key]
+        elif key in pending:
+            obj.dedup_key = None
+            session.info.setdefault('dedup_pending_holders', []).append((obj, pending[key]))
+        else:
+            obj.dedup_key = key
+            pending[key] = obj
+
+
+@event.listens_for(Session, 'after_flush')
+def _set_pending_duplicates(session, flush_context):
+    """Point duplicates of objects inserted in the same flush at their ids"""
+    for obj, holder in session.info.pop('dedup_pending_holders', ()):
+        obj.duplicate_of = holder.id
@@ -0,0 +1,157 @@
+"""
+Tag Model - Normalized, indexed tag storage
+"""
+from datetime import datetime
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app import db
+from app.models.stakeholder import Stakeholder
+from app.models.interaction import Interaction
+from app.models.task import Task
+from app.models.relationship import Relationship
+from app.models.upsert import insert_missing
+
+# Longest tag name a tag row can hold
+MAX_TAG_LENGTH = 100
+
+class Tag(db.Model):
+    """
+    Tag model backing tag filters and facet counts
+
+    The JSON `tags` list on each tagged model stays the serialized form;
+    the link tables below mirror it row by row so tag filters are index
+    lookups. Links are rewritten whenever an object's tags change in a
+    flush. Bulk SQL writes must call sync_tag_links() themselves.
+
+    Attributes:
+        id: Primary key
+        name: Unique tag text
+        created_at: Record creation timestamp
+    """
+    __tablename__ = 'tags'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(MAX_TAG_LENGTH), unique=True, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<Tag {self.name}>'
+
+
+def _link_table(name, entity_column, entity_table):
+    return db.Table(name,
+        db.Column('tag_id', db.Integer, db.ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True),
+        db.Column(entity_column, db.Integer, db.ForeignKey(f'{entity_table}.id', ondelete='CASCADE'),
+                  primary_key=True, index=True)
+    )
+
+# Association tables: the (tag_id, entity_id) primary key serves tag lookups
+stakeholder_tags = _link_table('stakeholder_tags', 'stakeholder_id', 'stakeholders')
+interaction_tags = _link_table('interaction_tags', 'interaction_id', 'interactions')
+task_tags = _link_table('task_tags', 'task_id', 'tasks')
+relationship_tags = _link_table('relationship_tags', 'relationship_id', 'relationships')
+
+# Tagged model -> (link table, entity id column)
+TAG_LINKS = {
+    Stakeholder: (stakeholder_tags, stakeholder_tags.c.stakeholder_id),
+    Interaction: (interaction_tags, interaction_tags.c.interaction_id),
+    Task: (task_tags, task_tags.c.task_id),
+    Relationship: (relationship_tags, relationship_tags.c.relationship_id)
+}
+
+
+class InvalidTagsError(ValueError):
+    """Raised for tags that cannot be stored"""
+
+
+def clean_tags(tags):
+    """
+    Distinct, non-empty tag names in their original order
+
+    Raises:
+        InvalidTagsError: When tags is not a list or a tag is longer
+            than MAX_TAG_LENGTH
+    """
+    if tags is not None and not isinstance(tags, list):
+        raise InvalidTagsError('tags must be a list')
+    seen = []
+    for tag in tags or []:
+        if isinstance(tag, str) and tag and tag not in seen:
+            if len(tag) > MAX_TAG_LENGTH:
+                raise InvalidTagsError(f'Tags are limited to {MAX_TAG_LENGTH} characters')
+            seen.append(tag)
+    return seen
+
+
+def ensure_tags(connection, names):
+    """
+    Get or create tag rows
+
+    Safe against concurrent writers creating the same tag: conflicting
+    inserts are skipped and the winner's row is read back.
+
+    Returns:
+        Dict of tag name -> tag id
+    """
+    names = set(names)
+    if not names:
+        return {}
+    table = Tag.__table__
+    ids = dict(connection.execute(
+        db.select(table.c.name, table.c.id).where(table.c.name.in_(names))
+    ).all())
+    missing = names - ids.keys()
+    if missing:
+        now = datetime.utcnow()
+        insert_missing(connection, table, [{'name': n, 'created_at': now} for n in sorted(missing)], ['name'])
+        ids.update(connection.execute(
+            db.select(table.c.name, table.c.id).where(table.c.name.in_(missing))
+        ).all())
+    return ids
+
+
+def sync_tag_links(connection, model, tags_by_id):
+    """
+    Rewrite the tag links of a batch of objects
+
+    Args:
+        connection: Connection inside the writing transaction
+        model: Tagged model class
+        tags_by_id: Dict of object id -> list of tags (None when deleted)
+    """
+    if not tags_by_id:
+        return
+    link, entity_column = TAG_LINKS[model]
+    ids = list(tags_by_id)
+
+    connection.execute(link.delete().where(entity_column.in_(ids)))
+
+    cleaned = {oid: clean_tags(tags) for oid, tags in tags_by_id.items() if tags}
+    tag_ids = ensure_tags(connection, {t for tags in cleaned.values() for t in tags})
+    rows = [
+        {'tag_id': tag_ids[tag], entity_column.key: oid}
+        for oid, tags in cleaned.items()
+        for tag in tags
+    ]
+    if rows:
+        connection.execute(link.insert(), rows)
+
+
+@event.listens_for(Session, 'after_flush')
+def _sync_flushed_tags(session, flush_context):
+    changes = {}
+
+    for obj in session.new:
+        if type(obj) in TAG_LINKS and obj.tags:
+            changes.setdefault(type(obj), {})[obj.id] = obj.tags
+
+    for obj in session.dirty:
+        if type(obj) in TAG_LINKS and inspect(obj).attrs.tags.history.has_changes():
+            changes.setdefault(type(obj), {})[obj.id] = obj.tags or []
+
+    for obj in session.deleted:
+        if type(obj) in TAG_LINKS:
+            changes.setdefault(type(obj), {})[obj.id] = None
+
+    for model, tags_by_id in changes.items():
+        sync_tag_links(session.connection(), model, tags_by_id)
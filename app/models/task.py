@@ -2,9 +2,14 @@
 Task Model - Todoist-style task management
 """
 from datetime import datetime
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.mutable import MutableList
 from app import db
+from app.models.interaction import Interaction
+from app.models.serialization import SerializerMixin, column, iso, listed
 
-class Task(db.Model):
+class Task(SerializerMixin, db.Model):
     """
     Task model for team task management and stakeholder follow-ups
     
@@ -21,12 +26,17 @@ class Task(db.Model):
         created_by: Foreign key to User (creator)
         stakeholder_id: Optional foreign key to Stakeholder
         campaign_id: Optional foreign key to Campaign
+        interaction_id: Interaction whose follow-up created the task (unique)
         due_date: When task is due
         completed_at: When task was completed
         created_at: Record creation timestamp
         updated_at: Last update timestamp
     """
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Serves per-user dashboards: my open tasks ordered by due date
+        db.Index('ix_tasks_assigned_status_due', 'assigned_to', 'status', 'due_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(500), nullable=False)
@@ -43,13 +53,15 @@ class Task(db.Model):
     # Relationships
     stakeholder_id = db.Column(db.Integer, db.ForeignKey('stakeholders.id'), index=True)
     campaign_id = db.Column(db.Integer, db.ForeignKey('campaigns.id'), index=True)
+    interaction_id = db.Column(db.Integer, db.ForeignKey('interactions.id', ondelete='SET NULL'),
+                               unique=True, index=True)
     
     # Timing
     due_date = db.Column(db.DateTime, index=True)
     completed_at = db.Column(db.DateTime)
     
     # Metadata
-    tags = db.Column(db.JSON, default=list)
+    tags = db.Column(MutableList.as_mutable(db.JSON), default=list)
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -90,6 +102,15 @@ class Task(db.Model):
             return datetime.utcnow() > self.due_date
         return False
     
+    @classmethod
+    def overdue_since(cls, now=None):
+        """SQL expression: the due date of a task overdue at now, else NULL"""
+        return db.case(
+            (db.and_(cls.due_date < (now or datetime.utcnow()),
+                     cls.status.notin_(['completed', 'cancelled'])), cls.due_date),
+            else_=None
+        )
+    
     def add_tag(self, tag):
         """Add a tag to task"""
         if not self.tags:
@@ -97,40 +118,76 @@ class Task(db.Model):
         if tag not in self.tags:
             self.tags.append(tag)
     
-    def to_dict(self, include_relationships=False):
-        """Serialize task to dictionary"""
-        data = {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'status': self.status,
-            'priority': self.priority,
-            'assigned_to': self.assigned_to,
-            'created_by': self.created_by,
-            'stakeholder_id': self.stakeholder_id,
-            'campaign_id': self.campaign_id,
-            'due_date': self.due_date.isoformat() if self.due_date else None,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
-            'is_overdue': self.is_overdue(),
-            'tags': self.tags or [],
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
-        }
+    @classmethod
+    def eager_load_options(cls, include_relationships=False, fields=None):
+        """
+        Loader options matching to_dict() flags
+        
+        Loads assignee, creator and stakeholder in the same query so a page
+        of tasks is serialized without per-row lazy loads; with a fieldset,
+        only the embedded objects it selects are joined
+        """
+        if not include_relationships:
+            return []
+        return [
+            joinedload(relationship)
+            for name, relationship in (('assignee', cls.assigned_user),
+                                       ('creator', cls.creator),
+                                       ('stakeholder', cls.stakeholder))
+            if cls.wants(fields, name)
+        ]
+    
+    # to_dict() fields in output order
+    SERIALIZED_FIELDS = {
+        'id': column('id'),
+        'title': column('title'),
+        'description': column('description'),
+        'status': column('status'),
+        'priority': column('priority'),
+        'assigned_to': column('assigned_to'),
+        'created_by': column('created_by'),
+        'stakeholder_id': column('stakeholder_id'),
+        'campaign_id': column('campaign_id'),
+        'interaction_id': column('interaction_id'),
+        'due_date': iso('due_date'),
+        'completed_at': iso('completed_at'),
+        'is_overdue': lambda t: t.is_overdue(),
+        'tags': listed('tags'),
+        'created_at': iso('created_at'),
+        'updated_at': iso('updated_at')
+    }
+    FIELD_COLUMNS = {
+        'is_overdue': ('due_date', 'status'),
+        'assignee': ('assigned_to',),
+        'creator': ('created_by',),
+        'stakeholder': ('stakeholder_id',)
+    }
+    EMBEDDED_FIELDS = ('assignee', 'creator', 'stakeholder')
+    
+    def to_dict(self, include_relationships=False, fields=None):
+        """
+        Serialize task to dictionary
+        
+        Args:
+            include_relationships: Embed assignee, creator and stakeholder
+            fields: Optional fieldset (see SerializerMixin.parse_fields)
+        """
+        data = self.serialize_fields(fields)
         
         if include_relationships:
-            if self.assigned_user:
+            if self.wants(fields, 'assignee') and self.assigned_user:
                 data['assignee'] = {
                     'id': self.assigned_user.id,
                     'full_name': self.assigned_user.full_name
                 }
             
-            if self.creator:
+            if self.wants(fields, 'creator') and self.creator:
                 data['creator'] = {
                     'id': self.creator.id,
                     'full_name': self.creator.full_name
                 }
             
-            if self.stakeholder:
+            if self.wants(fields, 'stakeholder') and self.stakeholder:
                 data['stakeholder'] = {
                     'id': self.stakeholder.id,
                     'name': self.stakeholder.name
@@ -140,3 +197,15 @@ class Task(db.Model):
     
     def __repr__(self):
         return f'<Task {self.title} ({self.status})>'
+
+
+@event.listens_for(Session, 'before_flush')
+def _complete_follow_ups(session, flush_context, instances):
+    """Complete the follow-up of an interaction when its task is completed"""
+    interaction_ids = {
+        obj.interaction_id for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, Task) and obj.interaction_id is not None and obj.status == 'completed'
+        and inspect(obj).attrs.status.history.has_changes()
+    }
+    if interaction_ids:
+        Interaction.complete_follow_ups(session, interaction_ids)
@@ -0,0 +1,60 @@
+"""
+Upsert helpers - Concurrency-safe inserts against unique indexes
+"""
+from sqlalchemy import insert as plain_insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+# Dialects with INSERT ... ON CONFLICT support
+_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert
+}
+
+
+def insert_missing(executor, target, rows, index_elements, index_where=None, returning=()):
+    """
+    Insert rows, skipping any that collide with an existing row
+
+    Uses INSERT ... ON CONFLICT DO NOTHING, so a concurrent writer
+    inserting the same key is not an error. On other databases each row
+    is inserted in its own savepoint and IntegrityErrors are ignored.
+
+    Args:
+        executor: Session (ORM-enabled insert of a model) or Connection
+        target: Mapped class or Table to insert into
+        rows: List of value dicts
+        index_elements: Column names of the unique index arbitrating conflicts
+        index_where: Predicate of a partial unique index
+        returning: Columns to return for the inserted rows
+
+    Returns:
+        List of returned rows for the rows actually inserted ([] without
+        returning columns)
+    """
+    if not rows:
+        return []
+    # Sessions (including scoped ones) know their bind, connections are one
+    bind = executor.get_bind() if hasattr(executor, 'get_bind') else executor
+    insert = _INSERTS.get(bind.dialect.name)
+
+    if insert is not None:
+        statement = insert(target).on_conflict_do_nothing(
+            index_elements=index_elements, index_where=index_where
+        )
+        if returning:
+            return executor.execute(statement.returning(*returning), rows).all()
+        executor.execute(statement, rows)
+        return []
+
+    inserted = []
+    statement = plain_insert(target).returning(*returning) if returning else plain_insert(target)
+    for row in rows:
+        try:
+            with executor.begin_nested():
+                result = executor.execute(statement, row)
+                if returning:
+                    inserted.extend(result.all())
+        except IntegrityError:
+            pass
+    return inserted
@@ -6,11 +6,21 @@ from app.services.campaign_service import CampaignService
 from app.services.analytics_service import AnalyticsService
 from app.services.task_service import TaskService
 from app.services.collaboration_service import CollaborationService
+from app.services.influence_graph_service import InfluenceGraphService
+from app.services.search_service import SearchService
+from app.services.tag_service import TagService
+from app.services.import_service import ImportService
+from app.services.export_service import ExportService
 
 __all__ = [
     'StakeholderService',
     'CampaignService',
     'AnalyticsService',
     'TaskService',
-    'CollaborationService'
+    'CollaborationService',
+    'InfluenceGraphService',
+    'SearchService',
+    'TagService',
+    'ImportService',
+    'ExportService'
 ]
@@ -4,7 +4,9 @@ Analytics Service - Influence/Interest Calculations and Reporting
 from app.models.stakeholder import Stakeholder
 from app.models.interaction import Interaction
 from app.models.campaign import Campaign
+from app.models.health_rollup import StakeholderHealthRollup
 from app import db
+from app.caching import cached_result
 from datetime import datetime, timedelta
 from sqlalchemy import func
 
@@ -14,13 +16,49 @@ class AnalyticsService:
     Provides insights on stakeholder engagement and relationship health
     """
     
+    # Rows fetched per round trip when streaming the stakeholder map
+    MAP_BATCH_SIZE = 1000
+    
+    @staticmethod
+    def iter_stakeholder_map_points():
+        """
+        Yield stakeholder map points one at a time
+        
+        Selects only the plotted columns and fetches them in batches with a
+        server-side cursor, so memory stays flat for large portfolios
+        """
+        rows = db.session.execute(
+            db.select(
+                Stakeholder.id,
+                Stakeholder.name,
+                Stakeholder.organization,
+                Stakeholder.influence_score,
+                Stakeholder.interest_score,
+                Stakeholder.sentiment,
+                Stakeholder.tags
+            ).order_by(
+                Stakeholder.id
+            ).execution_options(yield_per=AnalyticsService.MAP_BATCH_SIZE)
+        )
+        
+        for row in rows:
+            yield {
+                'id': row.id,
+                'name': row.name,
+                'organization': row.organization,
+                'influence': row.influence_score,
+                'interest': row.interest_score,
+                'sentiment': row.sentiment or Stakeholder.relationship_status_for(
+                    row.influence_score, row.interest_score),
+                'tags': row.tags
+            }
+    
     @staticmethod
+    @cached_result('stakeholders')
     def generate_stakeholder_map_data():
         """
         Generate data for stakeholder influence/interest matrix visualization
         """
-        stakeholders = Stakeholder.query.all()
-        
         map_data = {
             'quadrants': {
                 'strategic_partner': [],
@@ -36,27 +74,18 @@ class AnalyticsService:
             'all_stakeholders': []
         }
         
-        for s in stakeholders:
-            data_point = {
-                'id': s.id,
-                'name': s.name,
-                'organization': s.organization,
-                'influence': s.influence_score,
-                'interest': s.interest_score,
-                'sentiment': s.sentiment or s.calculate_relationship_status(),
-                'tags': s.tags
-            }
-            
+        for data_point in AnalyticsService.iter_stakeholder_map_points():
             map_data['all_stakeholders'].append(data_point)
             
             # Categorize into quadrants
-            sentiment = s.sentiment or s.calculate_relationship_status()
-            if sentiment in map_data['quadrants']:
-                map_data['quadrants'][sentiment.lower().replace(' ', '_')].append(data_point)
+            quadrant = data_point['sentiment'].lower().replace(' ', '_')
+            if quadrant in map_data['quadrants']:
+                map_data['quadrants'][quadrant].append(data_point)
         
         return map_data
     
     @staticmethod
+    @cached_result('interactions')
     def get_engagement_trends(days=90):
         """
         Get engagement trends over specified period
@@ -89,35 +118,29 @@ class AnalyticsService:
         }
     
     @staticmethod
+    @cached_result('stakeholders')
     def get_relationship_health_summary():
         """
         Get overall relationship health metrics
-        """
-        total_stakeholders = Stakeholder.query.count()
         
-        sentiment_distribution = db.session.query(
-            Stakeholder.sentiment,
-            func.count(Stakeholder.id).label('count')
-        ).group_by(
-            Stakeholder.sentiment
+        Reads the per-sentiment rollup rows maintained on stakeholder writes
+        instead of scanning the stakeholders table
+        """
+        rollups = StakeholderHealthRollup.query.filter(
+            StakeholderHealthRollup.stakeholder_count > 0
         ).all()
         
-        avg_influence = db.session.query(
-            func.avg(Stakeholder.influence_score)
-        ).scalar() or 0.0
-        
-        avg_interest = db.session.query(
-            func.avg(Stakeholder.interest_score)
-        ).scalar() or 0.0
+        total_stakeholders = sum(r.stakeholder_count for r in rollups)
+        high_priority_count = sum(r.high_priority_count for r in rollups)
         
-        high_priority_count = Stakeholder.query.filter(
-            Stakeholder.influence_score >= 7.0,
-            Stakeholder.interest_score >= 5.0
-        ).count()
+        avg_influence = avg_interest = 0.0
+        if total_stakeholders:
+            avg_influence = sum(r.influence_total for r in rollups) / total_stakeholders
+            avg_interest = sum(r.interest_total for r in rollups) / total_stakeholders
         
         return {
             'total_stakeholders': total_stakeholders,
-            'sentiment_distribution': {s: c for s, c in sentiment_distribution},
+            'sentiment_distribution': {r.sentiment or None: r.stakeholder_count for r in rollups},
             'average_influence': round(avg_influence, 2),
             'average_interest': round(avg_interest, 2),
             'high_priority_count': high_priority_count,
@@ -125,6 +148,7 @@ class AnalyticsService:
         }
     
     @staticmethod
+    @cached_result('campaigns')
     def get_campaign_performance_metrics():
         """
         Get performance metrics across all campaigns
@@ -1,10 +1,13 @@
 """
 Campaign Service - HP 10-Step Framework Business Logic
 """
-from app.models.campaign import Campaign
+from sqlalchemy import func, update
+from app.models.campaign import Campaign, campaign_stakeholders
 from app.models.stakeholder import Stakeholder
 from app.models.task import Task
+from app.services.tag_service import TagService
 from app import db
+from app.caching import cached_result
 
 class CampaignService:
     """
@@ -79,9 +82,10 @@ class CampaignService:
         campaign.advance_phase()
         
         # Update task priorities for current phase
-        current_phase_tasks = Task.query.filter(
-            Task.campaign_id == campaign_id,
-            Task.tags.contains([campaign.phase])
+        current_phase_tasks = TagService.filter_by_tags(
+            Task.query.filter(Task.campaign_id == campaign_id),
+            Task,
+            [campaign.phase]
         ).all()
         
         for task in current_phase_tasks:
@@ -93,6 +97,7 @@ class CampaignService:
         return campaign
     
     @staticmethod
+    @cached_result('campaigns', 'tasks')
     def get_campaign_progress(campaign_id):
         """
         Calculate campaign progress based on completed tasks
@@ -118,6 +123,50 @@ class CampaignService:
             'status': campaign.status
         }
     
+    @staticmethod
+    def recalculate_engagement_scores(campaign_ids=None):
+        """
+        Set campaign engagement scores to the average of their stakeholders'
+        
+        One grouped aggregate over the campaign membership table, written
+        back with a bulk UPDATE by primary key. Campaigns without
+        stakeholders score 0.
+        
+        Args:
+            campaign_ids: Optional iterable of ids to limit the update to
+        
+        Returns:
+            Dict mapping campaign id to its new score
+        """
+        campaigns = db.session.query(Campaign.id)
+        averages = db.session.query(
+            campaign_stakeholders.c.campaign_id,
+            func.avg(func.coalesce(Stakeholder.engagement_score, 0.0))
+        ).join(
+            Stakeholder, Stakeholder.id == campaign_stakeholders.c.stakeholder_id
+        ).group_by(campaign_stakeholders.c.campaign_id)
+        
+        if campaign_ids is not None:
+            campaign_ids = list(campaign_ids)
+            campaigns = campaigns.filter(Campaign.id.in_(campaign_ids))
+            averages = averages.filter(campaign_stakeholders.c.campaign_id.in_(campaign_ids))
+        
+        scores = {campaign_id: 0.0 for campaign_id, in campaigns}
+        scores.update({
+            campaign_id: round(average, 2)
+            for campaign_id, average in averages
+            if campaign_id in scores
+        })
+        
+        if scores:
+            db.session.execute(update(Campaign), [
+                {'id': campaign_id, 'engagement_score': score}
+                for campaign_id, score in scores.items()
+            ])
+        db.session.commit()
+        
+        return scores
+    
     @staticmethod
     def recommend_stakeholders_for_campaign(campaign_id, min_influence=5.0, min_interest=0.0):
         """
@@ -0,0 +1,190 @@
+"""
+Export Service - Streaming Table Exports
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from app.models.interaction import Interaction
+from app.models.stakeholder import Stakeholder
+from app.models.task import Task
+from app import db
+
+FORMATS = ('csv', 'jsonl', 'parquet')
+
+# Exportable resources
+EXPORT_MODELS = {
+    'stakeholders': Stakeholder,
+    'interactions': Interaction,
+    'tasks': Task
+}
+
+
+class ExportDependencyError(RuntimeError):
+    """Raised when an export format needs a package that is not installed"""
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _csv_value(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return _json_value(value)
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only file that hands out what was written since the last drain
+
+    Keeps tell() counting from the start of the file, which the Parquet
+    writer relies on for the offsets stored in the footer.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ExportService:
+    """
+    Business logic for bulk exports
+
+    Rows are read with a server-side cursor in EXPORT_BATCH_SIZE chunks
+    and encoded chunk by chunk, so memory use stays flat whatever the
+    table size.
+    """
+
+    # Rows fetched from the cursor and encoded at a time
+    EXPORT_BATCH_SIZE = 1000
+
+    @staticmethod
+    def columns(resource):
+        """Exported column names of a resource, in table order"""
+        return [column.key for column in EXPORT_MODELS[resource].__table__.columns]
+
+    @staticmethod
+    def iter_batches(resource, batch_size=None):
+        """
+        Stream a resource's table in primary key order
+
+        Yields:
+            Lists of row tuples ordered like columns(resource)
+        """
+        model = EXPORT_MODELS[resource]
+        batch_size = batch_size or ExportService.EXPORT_BATCH_SIZE
+        result = db.session.execute(
+            db.select(*model.__table__.columns).order_by(model.id).execution_options(
+                stream_results=True, yield_per=batch_size
+            )
+        )
+        for partition in result.partitions():
+            yield partition
+
+    @staticmethod
+    def iter_csv(resource, batch_size=None):
+        """Yield the export as CSV text, one chunk per batch"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(ExportService.columns(resource))
+
+        for batch in ExportService.iter_batches(resource, batch_size):
+            writer.writerows([_csv_value(v) for v in row] for row in batch)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    @staticmethod
+    def iter_jsonl(resource, batch_size=None):
+        """Yield the export as JSON Lines text, one chunk per batch"""
+        columns = ExportService.columns(resource)
+        for batch in ExportService.iter_batches(resource, batch_size):
+            yield ''.join(
+                json.dumps({c: _json_value(v) for c, v in zip(columns, row)}) + '\n'
+                for row in batch
+            )
+
+    @staticmethod
+    def iter_parquet(resource, batch_size=None):
+        """
+        Yield the export as Parquet bytes, one row group per batch
+
+        Requires pyarrow.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ExportDependencyError('Parquet export requires pyarrow') from exc
+
+        return ExportService._parquet_chunks(pa, pq, resource, batch_size)
+
+    @staticmethod
+    def _parquet_chunks(pa, pq, resource, batch_size):
+        columns = ExportService.columns(resource)
+        schema = pa.schema([
+            (column.key, ExportService._arrow_type(pa, column))
+            for column in EXPORT_MODELS[resource].__table__.columns
+        ])
+
+        sink = _ChunkSink()
+        with pq.ParquetWriter(sink, schema) as writer:
+            for batch in ExportService.iter_batches(resource, batch_size):
+                data = {
+                    c: [json.dumps(v) if isinstance(v, (list, dict)) else v for v in values]
+                    for c, values in zip(columns, zip(*batch))
+                }
+                writer.write_table(pa.Table.from_pydict(data, schema=schema))
+                yield sink.drain()
+        # Footer written when the writer closes
+        yield sink.drain()
+
+    @staticmethod
+    def _arrow_type(pa, column):
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            python_type = None
+        return {
+            int: pa.int64(),
+            float: pa.float64(),
+            bool: pa.bool_(),
+            datetime: pa.timestamp('us'),
+            date: pa.date32()
+        }.get(python_type, pa.string())
+
+    @staticmethod
+    def iter_export(resource, fmt, batch_size=None):
+        """Encoded chunks of a resource export in the given format"""
+        if resource not in EXPORT_MODELS:
+            raise ValueError(f'Unknown export resource: {resource}')
+        if fmt == 'csv':
+            return ExportService.iter_csv(resource, batch_size)
+        if fmt == 'jsonl':
+            return ExportService.iter_jsonl(resource, batch_size)
+        if fmt == 'parquet':
+            return ExportService.iter_parquet(resource, batch_size)
+        raise ValueError(f'Unsupported format: {fmt}')
@@ -0,0 +1,191 @@
+"""
+Follow-up Service - Due Follow-up Scanning and Task Creation
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import insert, update
+from app.models.interaction import Interaction
+from app.models.stakeholder import Stakeholder
+from app.models.task import Task
+from app import db
+from app.caching import cached_until
+
+class FollowUpService:
+    """
+    Business logic for interaction follow-ups
+
+    Open follow-ups (follow_up_required and not follow_up_completed) are
+    read through the partial indexes on Interaction, so the cost of a
+    scan depends on the number of open follow-ups, not on the size of
+    the interactions table. The scan only reads follow-ups it has not
+    created a task for (follow_up_task_created_at unset), so a task
+    deleted later is not created again; completing the task completes
+    the follow-up.
+    """
+
+    # Interactions read per keyset page during a scan
+    SCAN_BATCH_SIZE = 5000
+
+    # Tasks are created this long before the follow-up falls due
+    TASK_LEAD_TIME = timedelta(days=1)
+
+    @staticmethod
+    def iter_due_without_task(due_before, batch_size=None):
+        """
+        Page through open follow-ups due before a date that have no task yet
+
+        Walks ix_interactions_follow_up_task_pending in (follow_up_date,
+        id) order, seeking past the last row of the previous page instead
+        of using OFFSET.
+
+        Yields:
+            Lists of rows with id, stakeholder_id, user_id, subject,
+            interaction_type, follow_up_date, stakeholder_name and
+            has_task (a task linked before follow_up_task_created_at
+            existed)
+        """
+        batch_size = batch_size or FollowUpService.SCAN_BATCH_SIZE
+        has_task = db.select(Task.id).where(Task.interaction_id == Interaction.id).exists()
+        query = db.select(
+            Interaction.id,
+            Interaction.stakeholder_id,
+            Interaction.user_id,
+            Interaction.subject,
+            Interaction.interaction_type,
+            Interaction.follow_up_date,
+            Stakeholder.name.label('stakeholder_name'),
+            has_task.label('has_task')
+        ).join(
+            Stakeholder, Stakeholder.id == Interaction.stakeholder_id
+        ).where(
+            Interaction.open_follow_up(),
+            Interaction.follow_up_task_created_at.is_(None),
+            Interaction.follow_up_date <= due_before
+        ).order_by(Interaction.follow_up_date, Interaction.id).limit(batch_size)
+
+        last = None
+        while True:
+            page = query
+            if last is not None:
+                page = page.where(db.or_(
+                    Interaction.follow_up_date > last.follow_up_date,
+                    db.and_(Interaction.follow_up_date == last.follow_up_date, Interaction.id > last.id)
+                ))
+            rows = db.session.execute(page).all()
+            if not rows:
+                return
+            yield rows
+            if len(rows) < batch_size:
+                return
+            last = rows[-1]
+
+    @staticmethod
+    def follow_up_task_row(row, now):
+        """Task insert values for a due follow-up row"""
+        subject = row.subject or row.interaction_type.replace('_', ' ')
+        return {
+            'title': f'Follow up with {row.stakeholder_name}: {subject}'[:500],
+            'description': None,
+            'status': 'open',
+            'priority': 'high' if row.follow_up_date < now else 'medium',
+            'assigned_to': row.user_id,
+            'created_by': row.user_id,
+            'stakeholder_id': row.stakeholder_id,
+            'interaction_id': row.id,
+            'due_date': row.follow_up_date,
+            'tags': [],
+            'created_at': now,
+            'updated_at': now
+        }
+
+    @staticmethod
+    def create_follow_up_tasks(due_before=None, batch_size=None, dry_run=False):
+        """
+        Create a task for every open follow-up falling due
+
+        Idempotent: every scanned follow-up gets follow_up_task_created_at
+        set and is skipped from then on, even if its task is deleted. The
+        unique tasks.interaction_id index rejects a concurrent run creating
+        the same task twice (the whole run then rolls back and can simply
+        be repeated). All tasks of a run are written with one bulk INSERT.
+        Follow-ups linked to a task by a run predating the column are only
+        marked.
+
+        Args:
+            due_before: Follow-ups due up to this time (default: now
+                plus TASK_LEAD_TIME)
+            batch_size: Keyset page size (default: SCAN_BATCH_SIZE)
+            dry_run: Count the tasks without creating them
+
+        Returns:
+            Dict with scanned (due follow-ups without a task), created
+            and elapsed seconds
+        """
+        started = datetime.utcnow()
+        due_before = due_before or started + FollowUpService.TASK_LEAD_TIME
+
+        rows, marked = [], []
+        for page in FollowUpService.iter_due_without_task(due_before, batch_size):
+            rows.extend(FollowUpService.follow_up_task_row(row, started) for row in page if not row.has_task)
+            marked.extend({'id': row.id, 'follow_up_task_created_at': started} for row in page)
+
+        if marked and not dry_run:
+            if rows:
+                db.session.execute(insert(Task), rows)
+            db.session.execute(update(Interaction), marked)
+            db.session.commit()
+
+        return {
+            'scanned': len(rows),
+            'created': 0 if dry_run else len(rows),
+            'elapsed': round((datetime.utcnow() - started).total_seconds(), 3)
+        }
+
+    @staticmethod
+    def overdue_query(user_id=None, now=None):
+        """
+        Open follow-ups past their date, optionally for one user
+
+        Served by ix_interactions_open_follow_up_user when filtered by
+        user, else by ix_interactions_open_follow_up_due.
+        """
+        query = Interaction.query.filter(
+            Interaction.open_follow_up(),
+            Interaction.follow_up_date < (now or datetime.utcnow())
+        )
+        if user_id is not None:
+            query = query.filter(Interaction.user_id == user_id)
+        return query
+
+    @staticmethod
+    @cached_until('interactions')
+    def latest_overdue_date():
+        """
+        Most recent date an open follow-up fell overdue
+        
+        Changes whenever another follow-up becomes overdue. Cached until
+        the next open follow-up falls due or interactions change; both
+        reads are served by ix_interactions_open_follow_up_due.
+        """
+        now = datetime.utcnow()
+        dates = db.session.query(Interaction.follow_up_date).filter(Interaction.open_follow_up())
+        overdue = dates.filter(Interaction.follow_up_date < now).with_entities(
+            db.func.max(Interaction.follow_up_date)
+        ).scalar()
+        upcoming = dates.filter(Interaction.follow_up_date >= now).with_entities(
+            db.func.min(Interaction.follow_up_date)
+        ).scalar()
+        return overdue, upcoming
+
+    @staticmethod
+    def overdue_counts_by_user(now=None):
+        """
+        Number of overdue follow-ups per user
+
+        Returns:
+            Dict of user_id -> count
+        """
+        return dict(
+            FollowUpService.overdue_query(now=now).with_entities(
+                Interaction.user_id, db.func.count(Interaction.id)
+            ).group_by(Interaction.user_id).all()
+        )
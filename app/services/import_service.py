@@ -0,0 +1,638 @@
+"""
+Import Service - Streaming Bulk Ingestion
+"""
+import csv
+import json
+import time
+from datetime import datetime, timezone
+from dateutil.parser import isoparse
+from sqlalchemy import func, insert, update
+from sqlalchemy.exc import SQLAlchemyError
+from app.models.interaction import Interaction
+from app.models.stakeholder import Stakeholder
+from app.models.user import User
+from app.models.health_rollup import StakeholderHealthRollup, add_contribution
+from app.models.interaction_stats import (
+    StakeholderInteractionDaily, add_counters, add_interaction, add_latest, apply_counter_deltas,
+    is_open_follow_up
+)
+from app.models.tag import InvalidTagsError, clean_tags, sync_tag_links
+from app.models.upsert import insert_missing
+from app.jobs import enqueue_engagement
+from app import db
+
+FORMATS = ('csv', 'jsonl')
+
+
+class RecordError(ValueError):
+    """Raised for a record that cannot be imported"""
+
+
+class ImportReport:
+    """
+    Outcome of an import run
+
+    Attributes:
+        processed: Records read from the input
+        inserted: New rows written (or that would be, in a dry run)
+        updated: Existing rows updated by an upsert
+        skipped: Matches of existing rows left untouched
+        duplicates: Records repeating an earlier record of the same input
+        errors: List of {'line', 'error'} for rejected records (capped)
+        error_count: Total rejected records
+        matches: List of {'line', 'id'} for records matched to an existing row (capped)
+        dry_run: Whether nothing was written
+        elapsed: Wall time in seconds
+    """
+
+    # Per-row errors and matches kept in the report; the counts keep going
+    MAX_ERRORS = 1000
+
+    def __init__(self, dry_run=False):
+        self.processed = 0
+        self.inserted = 0
+        self.updated = 0
+        self.skipped = 0
+        self.duplicates = 0
+        self.errors = []
+        self.error_count = 0
+        self.matches = []
+        self.dry_run = dry_run
+        self._started = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def imported(self):
+        return self.inserted + self.updated
+
+    def error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+    def match(self, line, row_id):
+        if len(self.matches) < self.MAX_ERRORS:
+            self.matches.append({'line': line, 'id': row_id})
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self._started
+        return self
+
+    @property
+    def rows_per_second(self):
+        return round(self.processed / self.elapsed, 1) if self.elapsed else 0.0
+
+    def to_dict(self):
+        return {
+            'processed': self.processed,
+            'imported': self.imported,
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'skipped': self.skipped,
+            'duplicates': self.duplicates,
+            'failed': self.error_count,
+            'errors': self.errors,
+            'matches': self.matches,
+            'dry_run': self.dry_run,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'rows_per_second': self.rows_per_second
+        }
+
+
+def read_records(stream, fmt):
+    """
+    Yield (line number, record) pairs from a CSV or JSON Lines text stream
+
+    Records that cannot be parsed are yielded as (line, RecordError)
+    so the caller can report them without stopping the import.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, {k: v for k, v in record.items() if k and v not in (None, '')}
+    elif fmt == 'jsonl':
+        for line_num, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield line_num, RecordError(f'Invalid JSON: {exc}')
+                continue
+            if not isinstance(record, dict):
+                yield line_num, RecordError('Expected a JSON object')
+                continue
+            yield line_num, record
+    else:
+        raise ValueError(f'Unsupported format: {fmt}')
+
+
+def _batches(records, size):
+    batch = []
+    for item in records:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# Field coercion for text inputs (CSV cells arrive as strings)
+
+def _record(record):
+    """The record itself, rejecting list items that are not objects"""
+    if not isinstance(record, dict):
+        raise RecordError('Expected a JSON object')
+    return record
+
+
+def _int(record, field, default=None):
+    value = record.get(field, default)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise RecordError(f'{field} must be an integer')
+
+
+def _float(record, field, default=None):
+    value = record.get(field, default)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise RecordError(f'{field} must be a number')
+
+
+def _bool(record, field, default=False):
+    value = record.get(field, default)
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'y')
+    return bool(value)
+
+
+def _datetime(record, field, default=None):
+    value = record.get(field)
+    if value is None:
+        return default
+    if isinstance(value, datetime):
+        return value
+    try:
+        value = isoparse(str(value))
+    except (TypeError, ValueError):
+        raise RecordError(f'{field} must be an ISO 8601 date')
+    # Stored timestamps are naive UTC
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _text(record, field, max_length=None):
+    value = record.get(field)
+    if value is None:
+        return None
+    value = str(value).strip()
+    if max_length and len(value) > max_length:
+        raise RecordError(f'{field} is longer than {max_length} characters')
+    return value or None
+
+
+def _tags(record):
+    value = record.get('tags')
+    if isinstance(value, str):
+        value = value.replace(';', ',').split(',')
+    try:
+        return clean_tags([t.strip() for t in value or [] if isinstance(t, str)])
+    except InvalidTagsError as exc:
+        raise RecordError(str(exc)) from None
+
+
+class ImportService:
+    """
+    Business logic for bulk imports
+    Streams records, validates them and writes them in batched transactions
+    """
+
+    # Records written per INSERT statement / transaction
+    IMPORT_BATCH_SIZE = 1000
+
+    @staticmethod
+    def _insert_rows(model, rows):
+        """
+        Insert a batch of rows, indexing their tags
+
+        Ids are only fetched (in parameter order) when some row carries
+        tags; otherwise the batch goes out as plain multi-row INSERTs.
+
+        Returns:
+            New ids in row order, or None when they were not fetched
+        """
+        if not any(row.get('tags') for row in rows):
+            db.session.execute(insert(model), rows)
+            return None
+
+        ids = db.session.scalars(
+            insert(model).returning(model.id, sort_by_parameter_order=True), rows
+        ).all()
+        sync_tag_links(
+            db.session.connection(), model,
+            {i: row['tags'] for i, row in zip(ids, rows) if row['tags']}
+        )
+        return ids
+
+    @staticmethod
+    def _insert_stakeholders(rows):
+        """
+        Insert new stakeholders, skipping keys another writer inserted first
+
+        Relies on the unique dedup_key index (INSERT ... ON CONFLICT DO
+        NOTHING), so concurrent or retried imports cannot create the same
+        contact twice.
+
+        Returns:
+            Dict of dedup_key -> row for the rows that were not inserted
+        """
+        inserted = dict(insert_missing(
+            db.session, Stakeholder, rows, ['dedup_key'],
+            returning=(Stakeholder.dedup_key, Stakeholder.id)
+        ))
+        sync_tag_links(
+            db.session.connection(), Stakeholder,
+            {inserted[row['dedup_key']]: row['tags']
+             for row in rows if row['tags'] and row['dedup_key'] in inserted}
+        )
+        return {row['dedup_key']: row for row in rows if row['dedup_key'] not in inserted}
+
+    @staticmethod
+    def _stakeholder_update(current, values, now, deltas):
+        """UPDATE values merging a record into an existing stakeholder row"""
+        row = {**values, 'id': current.id, 'dedup_key': current.dedup_key, 'updated_at': now}
+        if 'tags' in values:
+            row['tags'] = clean_tags((current.tags or []) + values['tags'])
+        influence = values.get('influence_score', current.influence_score)
+        interest = values.get('interest_score', current.interest_score)
+        row['sentiment'] = Stakeholder.relationship_status_for(influence, interest)
+        add_contribution(deltas, current.sentiment, current.influence_score, current.interest_score, -1)
+        add_contribution(deltas, row['sentiment'], influence, interest, 1)
+        return row
+
+    @staticmethod
+    def interaction_row(record, user_id, now=None):
+        """
+        Validate an interaction record and convert it to column values
+
+        Raises:
+            RecordError: When the record is invalid
+        """
+        now = now or datetime.utcnow()
+        record = _record(record)
+
+        stakeholder_id = _int(record, 'stakeholder_id')
+        if stakeholder_id is None:
+            raise RecordError('stakeholder_id is required')
+
+        interaction_type = record.get('interaction_type')
+        if interaction_type not in Interaction.INTERACTION_TYPES:
+            raise RecordError(f'Invalid interaction_type: {interaction_type}')
+
+        sentiment = record.get('sentiment', 'neutral')
+        if sentiment not in Interaction.SENTIMENTS:
+            raise RecordError(f'Invalid sentiment: {sentiment}')
+
+        return {
+            'stakeholder_id': stakeholder_id,
+            'user_id': _int(record, 'user_id', user_id),
+            'interaction_type': interaction_type,
+            'subject': record.get('subject'),
+            'description': record.get('description'),
+            'outcome': record.get('outcome'),
+            'sentiment': sentiment,
+            'impact_on_relationship': _float(record, 'impact_on_relationship', 0.0),
+            'date': _datetime(record, 'date', now),
+            'duration_minutes': _int(record, 'duration_minutes'),
+            'follow_up_required': _bool(record, 'follow_up_required'),
+            'follow_up_date': _datetime(record, 'follow_up_date'),
+            'follow_up_completed': _bool(record, 'follow_up_completed'),
+            'tags': _tags(record),
+            'attachments': [],
+            'created_at': now,
+            'updated_at': now
+        }
+
+    @staticmethod
+    def import_interactions(records, user_id, batch_size=None):
+        """
+        Import interactions from an iterable of records
+
+        Each batch is validated, checked against existing stakeholders
+        and users (one query each) and written in its own transaction with one multi-row INSERT, so
+        a failing batch never discards the ones before it.
+
+        Args:
+            records: Iterable of (line, record dict) pairs, e.g. from read_records()
+            user_id: Default logging user for records without user_id
+            batch_size: Records per transaction (default IMPORT_BATCH_SIZE)
+
+        Returns:
+            ImportReport
+        """
+        report = ImportReport()
+        batch_size = batch_size or ImportService.IMPORT_BATCH_SIZE
+
+        for batch in _batches(records, batch_size):
+            now = datetime.utcnow()
+            rows = []
+            for line, record in batch:
+                report.processed += 1
+                try:
+                    if isinstance(record, Exception):
+                        raise record
+                    rows.append((line, ImportService.interaction_row(record, user_id, now)))
+                except RecordError as exc:
+                    report.error(line, str(exc))
+
+            if not rows:
+                continue
+
+            known = set(db.session.scalars(
+                db.select(Stakeholder.id).where(
+                    Stakeholder.id.in_({row['stakeholder_id'] for _, row in rows})
+                )
+            ))
+            known_users = set(db.session.scalars(
+                db.select(User.id).where(User.id.in_({row['user_id'] for _, row in rows}))
+            ))
+            valid = []
+            for line, row in rows:
+                if row['stakeholder_id'] not in known:
+                    report.error(line, f"Stakeholder {row['stakeholder_id']} not found")
+                elif row['user_id'] not in known_users:
+                    report.error(line, f"User {row['user_id']} not found")
+                else:
+                    valid.append((line, row))
+
+            if not valid:
+                continue
+
+            try:
+                ImportService._insert_rows(Interaction, [row for _, row in valid])
+                deltas, counters, latest = {}, {}, {}
+                for _, row in valid:
+                    add_interaction(deltas, row['stakeholder_id'], row['date'], row['sentiment'],
+                                    row['impact_on_relationship'], 1)
+                    add_counters(counters, row['stakeholder_id'],
+                                 is_open_follow_up(row['follow_up_required'], row['follow_up_completed']), 1)
+                    add_latest(latest, row['stakeholder_id'], row['date'], row['sentiment'])
+                StakeholderInteractionDaily.apply_deltas(db.session.connection(), deltas)
+                apply_counter_deltas(db.session.connection(), counters, latest)
+                db.session.commit()
+                report.inserted += len(valid)
+                enqueue_engagement(sorted({row['stakeholder_id'] for _, row in valid}))
+            except SQLAlchemyError as exc:
+                db.session.rollback()
+                message = f'Batch rejected: {exc.__class__.__name__}: {getattr(exc, "orig", exc)}'
+                for line, _ in valid:
+                    report.error(line, message)
+
+        return report.finish()
+
+    # Stakeholder columns accepted from import records, with their coercion
+    STAKEHOLDER_FIELDS = {
+        'name': lambda r: _text(r, 'name', 255),
+        'title': lambda r: _text(r, 'title', 255),
+        'organization': lambda r: _text(r, 'organization', 255),
+        'email': lambda r: _text(r, 'email', 255),
+        'phone': lambda r: _text(r, 'phone', 50),
+        'linkedin_url': lambda r: _text(r, 'linkedin_url', 500),
+        'twitter_handle': lambda r: _text(r, 'twitter_handle', 100),
+        'influence_score': lambda r: _float(r, 'influence_score'),
+        'interest_score': lambda r: _float(r, 'interest_score'),
+        'stakeholder_type': lambda r: _text(r, 'stakeholder_type', 100),
+        'priority': lambda r: _text(r, 'priority', 20),
+        'notes': lambda r: _text(r, 'notes'),
+        'address': lambda r: _text(r, 'address'),
+        'tags': _tags
+    }
+
+    @staticmethod
+    def _keyed_stakeholders(keys):
+        """Existing stakeholders holding the given dedup keys, by key"""
+        if not keys:
+            return {}
+        return {
+            row.dedup_key: row
+            for row in db.session.execute(
+                db.select(
+                    Stakeholder.id, Stakeholder.dedup_key, Stakeholder.influence_score,
+                    Stakeholder.interest_score, Stakeholder.sentiment, Stakeholder.tags
+                ).where(Stakeholder.dedup_key.in_(list(keys)))
+            )
+        }
+
+    @staticmethod
+    def stakeholder_values(record):
+        """
+        Validate a stakeholder record
+
+        Returns:
+            Dict of the columns present in the record
+
+        Raises:
+            RecordError: When the record is invalid
+        """
+        record = _record(record)
+        values = {
+            field: coerce(record)
+            for field, coerce in ImportService.STAKEHOLDER_FIELDS.items()
+            if field in record
+        }
+        if not values.get('name'):
+            raise RecordError('name is required')
+        for field in ('influence_score', 'interest_score'):
+            score = values.get(field)
+            if score is not None and not -10.0 <= score <= 10.0:
+                raise RecordError(f'{field} must be between -10 and 10')
+        return values
+
+    @staticmethod
+    def import_stakeholders(records, batch_size=None, on_duplicate='update', dry_run=False):
+        """
+        Import stakeholders, deduplicating against existing contacts
+
+        Records are matched on Stakeholder.dedup_key (normalized email, or
+        name + organization). Repeats within the input collapse onto the
+        first occurrence (merged into it on upsert); matches against
+        existing rows are updated with the record's fields (tags are
+        merged) or skipped, depending on on_duplicate. Relationship status is derived in bulk from the
+        resulting scores, and each batch is written in one transaction
+        with a multi-row INSERT and an UPDATE by primary key. The INSERT
+        skips keys that a concurrent import created after the lookup
+        (dedup_key is unique); those records are then handled as matches.
+
+        Args:
+            records: Iterable of (line, record dict) pairs
+            batch_size: Records per transaction (default IMPORT_BATCH_SIZE)
+            on_duplicate: 'update' (upsert) or 'skip'
+            dry_run: Report what would happen without writing anything
+
+        Returns:
+            ImportReport
+        """
+        if on_duplicate not in ('update', 'skip'):
+            raise ValueError(f'Invalid on_duplicate: {on_duplicate}')
+
+        report = ImportReport(dry_run=dry_run)
+        batch_size = batch_size or ImportService.IMPORT_BATCH_SIZE
+        # Keys planned for insert by earlier batches of a dry run, which
+        # later repeats cannot find in the table
+        seen = set()
+
+        for batch in _batches(records, batch_size):
+            now = datetime.utcnow()
+            pending = {}
+            for line, record in batch:
+                report.processed += 1
+                try:
+                    if isinstance(record, Exception):
+                        raise record
+                    values = ImportService.stakeholder_values(record)
+                except RecordError as exc:
+                    report.error(line, str(exc))
+                    continue
+
+                key = Stakeholder.dedup_key_for(values['name'], values.get('email'), values.get('organization'))
+                if key in pending:
+                    report.duplicates += 1
+                    if on_duplicate == 'update':
+                        merged = pending[key][1]
+                        tags = clean_tags(merged.get('tags', []) + values.get('tags', []))
+                        merged.update(values)
+                        if tags:
+                            merged['tags'] = tags
+                    continue
+                pending[key] = (line, values)
+
+            if not pending:
+                continue
+
+            existing = ImportService._keyed_stakeholders(pending)
+
+            inserts, updates, deltas = [], [], {}
+            for key, (line, values) in pending.items():
+                current = existing.get(key)
+                if current is None and key in seen:
+                    # Dry run repeat of a record planned for insert: a real
+                    # run would find and update the row inserted earlier
+                    if on_duplicate == 'skip':
+                        report.skipped += 1
+                    else:
+                        report.updated += 1
+                    continue
+
+                if current is None:
+                    row = {
+                        'influence_score': 0.0, 'interest_score': 0.0, 'priority': 'Medium',
+                        'engagement_score': 0.0, 'tags': [], **values,
+                        'dedup_key': key, 'created_at': now, 'updated_at': now
+                    }
+                    row['sentiment'] = Stakeholder.relationship_status_for(
+                        row['influence_score'], row['interest_score']
+                    )
+                    inserts.append(row)
+                    if dry_run:
+                        seen.add(key)
+                    add_contribution(deltas, row['sentiment'], row['influence_score'], row['interest_score'], 1)
+                    continue
+
+                report.match(line, current.id)
+                if on_duplicate == 'skip':
+                    report.skipped += 1
+                    continue
+
+                updates.append(ImportService._stakeholder_update(current, values, now, deltas))
+
+            if dry_run:
+                report.inserted += len(inserts)
+                report.updated += len(updates)
+                continue
+
+            try:
+                raced = ImportService._insert_stakeholders(inserts)
+                for key, current in ImportService._keyed_stakeholders(raced).items():
+                    planned = raced[key]
+                    add_contribution(deltas, planned['sentiment'], planned['influence_score'],
+                                     planned['interest_score'], -1)
+                    line, values = pending[key]
+                    report.match(line, current.id)
+                    if on_duplicate == 'skip':
+                        report.skipped += 1
+                    else:
+                        updates.append(ImportService._stakeholder_update(current, values, now, deltas))
+                if updates:
+                    db.session.execute(update(Stakeholder), updates)
+                    sync_tag_links(
+                        db.session.connection(), Stakeholder,
+                        {row['id']: row['tags'] for row in updates if 'tags' in row}
+                    )
+                StakeholderHealthRollup.apply_deltas(db.session.connection(), deltas)
+                db.session.commit()
+                report.inserted += len(inserts) - len(raced)
+                report.updated += len(updates)
+            except SQLAlchemyError as exc:
+                db.session.rollback()
+                message = f'Batch rejected: {exc.__class__.__name__}: {getattr(exc, "orig", exc)}'
+                for line, _ in pending.values():
+                    report.error(line, message)
+
+        return report.finish()
+
+    @staticmethod
+    def backfill_dedup_keys():
+        """
+        Compute dedup keys for stakeholders that predate them
+
+        A key goes to the first row found with it (lowest id); rows
+        duplicating a keyed contact stay unkeyed. Keys shared by several
+        rows, which older data may hold, are first cleared from all but
+        the lowest id, so this must run before the unique index on
+        dedup_key is created.
+
+        Returns:
+            Number of stakeholders keyed
+        """
+        first_holders = db.select(func.min(Stakeholder.id)).where(
+            Stakeholder.dedup_key.isnot(None)
+        ).group_by(Stakeholder.dedup_key)
+        db.session.execute(
+            update(Stakeholder).where(
+                Stakeholder.dedup_key.isnot(None), Stakeholder.id.notin_(first_holders)
+            ).values(dedup_key=None).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+        chunk_size = ImportService.IMPORT_BATCH_SIZE
+        updated, last_id = 0, 0
+        while True:
+            rows = db.session.execute(
+                db.select(Stakeholder.id, Stakeholder.name, Stakeholder.email, Stakeholder.organization)
+                .where(Stakeholder.dedup_key.is_(None), Stakeholder.id > last_id)
+                .order_by(Stakeholder.id).limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            keys = {}
+            for r in rows:
+                keys.setdefault(Stakeholder.dedup_key_for(r.name, r.email, r.organization), r.id)
+            held = set(db.session.scalars(
+                db.select(Stakeholder.dedup_key).where(Stakeholder.dedup_key.in_(list(keys)))
+            ))
+            values = [{'id': i, 'dedup_key': key} for key, i in keys.items() if key not in held]
+            if values:
+                db.session.execute(update(Stakeholder), values)
+            db.session.commit()
+            updated += len(values)
+        return updated
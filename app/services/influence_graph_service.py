@@ -0,0 +1,379 @@
+"""
+Influence Graph Service - In-memory Stakeholder Network Analysis
+"""
+import heapq
+import threading
+import time
+from array import array
+from collections import defaultdict, deque
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.models.relationship import Relationship
+from app import db
+
+
+class InfluenceGraph:
+    """
+    Compact undirected adjacency index over active relationships
+
+    Edges are stored in CSR form (indptr/indices/weights arrays) weighted
+    by Relationship.strength. Writes made after the index was built are
+    kept in a small overlay (added edges per node, removed edge ids) and
+    folded back into the arrays once the overlay grows.
+
+    Attributes:
+        node_ids: Stakeholder id for every node index
+        node_index: Stakeholder id -> node index
+        indptr: Offset of each node's neighbors in indices/weights
+        indices: Neighbor node indexes
+        weights: Edge strengths
+        edge_ids: Relationship id of every adjacency entry
+        built_at: Monotonic timestamp of the last load from the database
+    """
+
+    DEFAULT_STRENGTH = 5.0
+
+    def __init__(self, edges):
+        """
+        Args:
+            edges: Iterable of (relationship_id, stakeholder_id, related_stakeholder_id, strength)
+        """
+        self.node_ids = array('q')
+        self.node_index = {}
+        self._removed = set()
+        self._added = defaultdict(list)
+        self._added_edges = set()
+        self._edge_nodes = {}
+        self._centrality = None
+        self.built_at = time.monotonic()
+        self._build(edges)
+
+    def _node(self, stakeholder_id):
+        index = self.node_index.get(stakeholder_id)
+        if index is None:
+            index = len(self.node_ids)
+            self.node_index[stakeholder_id] = index
+            self.node_ids.append(stakeholder_id)
+        return index
+
+    def _build(self, edges):
+        entries = []
+        for edge_id, source, target, strength in edges:
+            if source == target:
+                continue
+            weight = self.DEFAULT_STRENGTH if strength is None else float(strength)
+            u, v = self._node(source), self._node(target)
+            entries.append((u, v, weight, edge_id))
+            entries.append((v, u, weight, edge_id))
+            self._edge_nodes[edge_id] = (u, v)
+
+        counts = [0] * (len(self.node_ids) + 1)
+        for u, _, _, _ in entries:
+            counts[u + 1] += 1
+        for i in range(1, len(counts)):
+            counts[i] += counts[i - 1]
+
+        self.indptr = array('q', counts)
+        self.indices = array('q', bytes(8 * len(entries)))
+        self.weights = array('d', bytes(8 * len(entries)))
+        self.edge_ids = array('q', bytes(8 * len(entries)))
+        cursor = list(counts[:-1])
+        for u, v, weight, edge_id in entries:
+            position = cursor[u]
+            self.indices[position] = v
+            self.weights[position] = weight
+            self.edge_ids[position] = edge_id
+            cursor[u] += 1
+
+    @property
+    def pending_changes(self):
+        """Number of writes held in the overlay"""
+        return len(self._removed) + len(self._added_edges)
+
+    def _entries(self, index):
+        """Yield (neighbor_index, strength, relationship_id) for a node"""
+        if index + 1 < len(self.indptr):
+            for position in range(self.indptr[index], self.indptr[index + 1]):
+                edge_id = self.edge_ids[position]
+                if edge_id not in self._removed:
+                    yield self.indices[position], self.weights[position], edge_id
+        yield from self._added.get(index, ())
+
+    def neighbors(self, index):
+        """Yield (neighbor_index, strength) for a node"""
+        for neighbor, weight, _ in self._entries(index):
+            yield neighbor, weight
+
+    def add_edge(self, edge_id, source, target, strength):
+        """Add (or re-add) a relationship to the overlay"""
+        self.remove_edge(edge_id)
+        if source == target:
+            return
+        weight = self.DEFAULT_STRENGTH if strength is None else float(strength)
+        u, v = self._node(source), self._node(target)
+        self._added[u].append((v, weight, edge_id))
+        self._added[v].append((u, weight, edge_id))
+        self._added_edges.add(edge_id)
+        self._edge_nodes[edge_id] = (u, v)
+        self._centrality = None
+
+    def remove_edge(self, edge_id):
+        """Drop a relationship from the index if present"""
+        nodes = self._edge_nodes.pop(edge_id, None)
+        if nodes is None:
+            return
+        self._removed.add(edge_id)
+        if edge_id in self._added_edges:
+            self._added_edges.discard(edge_id)
+            for node in nodes:
+                self._added[node] = [e for e in self._added[node] if e[2] != edge_id]
+        self._centrality = None
+
+    def compacted(self):
+        """New graph with the overlay folded back into the CSR arrays"""
+        edges = {}
+        for u in range(len(self.node_ids)):
+            for v, weight, edge_id in self._entries(u):
+                if edge_id not in edges:
+                    edges[edge_id] = (edge_id, self.node_ids[u], self.node_ids[v], weight)
+        graph = InfluenceGraph(edges.values())
+        graph.built_at = self.built_at
+        return graph
+
+    def neighborhood(self, stakeholder_id, depth):
+        """
+        Breadth-first N-hop neighborhood
+
+        Returns:
+            Dict of stakeholder id -> hop count (the origin has 0 hops)
+        """
+        origin = self.node_index.get(stakeholder_id)
+        if origin is None:
+            return {}
+        hops = {origin: 0}
+        queue = deque([origin])
+        while queue:
+            node = queue.popleft()
+            if hops[node] >= depth:
+                continue
+            for neighbor, _ in self.neighbors(node):
+                if neighbor not in hops:
+                    hops[neighbor] = hops[node] + 1
+                    queue.append(neighbor)
+        return {self.node_ids[n]: h for n, h in hops.items()}
+
+    def shortest_path(self, source_id, target_id):
+        """
+        Strongest influence path between two stakeholders
+
+        Dijkstra over edge cost 1 / strength, so a chain of strong
+        relationships beats a shorter chain of weak ones. Relationships
+        with zero or negative strength are not traversed.
+
+        Returns:
+            (list of stakeholder ids, total cost) or (None, None)
+        """
+        source = self.node_index.get(source_id)
+        target = self.node_index.get(target_id)
+        if source is None or target is None:
+            return None, None
+
+        distances = {source: 0.0}
+        previous = {}
+        heap = [(0.0, source)]
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if node == target:
+                break
+            if distance > distances[node]:
+                continue
+            for neighbor, weight in self.neighbors(node):
+                if weight <= 0:
+                    continue
+                candidate = distance + 1.0 / weight
+                if candidate < distances.get(neighbor, float('inf')):
+                    distances[neighbor] = candidate
+                    previous[neighbor] = node
+                    heapq.heappush(heap, (candidate, neighbor))
+
+        if target not in distances:
+            return None, None
+
+        path = [target]
+        while path[-1] != source:
+            path.append(previous[path[-1]])
+        return [self.node_ids[n] for n in reversed(path)], round(distances[target], 4)
+
+    def centrality(self, damping=0.85, iterations=100, tolerance=1e-6):
+        """
+        Weighted PageRank over the relationship network
+
+        Returns:
+            Dict of stakeholder id -> score (scores sum to 1)
+        """
+        if self._centrality is not None:
+            return self._centrality
+
+        size = len(self.node_ids)
+        if size == 0:
+            return {}
+
+        adjacency = [[(n, w) for n, w in self.neighbors(i) if w > 0] for i in range(size)]
+        strength_totals = [sum(w for _, w in edges) for edges in adjacency]
+        ranks = [1.0 / size] * size
+
+        for _ in range(iterations):
+            dangling = sum(ranks[i] for i in range(size) if strength_totals[i] == 0)
+            base = (1.0 - damping) / size + damping * dangling / size
+            updated = [base] * size
+            for i in range(size):
+                if strength_totals[i] == 0:
+                    continue
+                share = damping * ranks[i] / strength_totals[i]
+                for neighbor, weight in adjacency[i]:
+                    updated[neighbor] += share * weight
+            delta = sum(abs(a - b) for a, b in zip(updated, ranks))
+            ranks = updated
+            if delta < tolerance:
+                break
+
+        self._centrality = {self.node_ids[i]: ranks[i] for i in range(size)}
+        return self._centrality
+
+
+class InfluenceGraphService:
+    """
+    Business logic for multi-hop influence analysis
+    Keeps one InfluenceGraph per process, updated as relationships change
+    
+    The graph is only read or written while holding _lock, so a query
+    never sees an overlay update half applied; compaction builds a new
+    graph and swaps it in.
+    """
+
+    _graph = None
+    _lock = threading.RLock()
+
+    # Fold the overlay into the arrays after this many changes
+    COMPACT_THRESHOLD = 1000
+
+    @staticmethod
+    def load_graph():
+        """Build the adjacency index from active relationships"""
+        rows = db.session.query(
+            Relationship.id,
+            Relationship.stakeholder_id,
+            Relationship.related_stakeholder_id,
+            Relationship.strength
+        ).filter(
+            Relationship.is_active.isnot(False)
+        ).execution_options(yield_per=10000)
+        return InfluenceGraph(rows)
+
+    @classmethod
+    def get_graph(cls):
+        """
+        Return the process-wide graph, rebuilding it when missing or older
+        than INFLUENCE_GRAPH_MAX_AGE seconds (writes from other processes
+        are only visible after a rebuild)
+        
+        Callers hold _lock while using the graph.
+        """
+        max_age = current_app.config.get('INFLUENCE_GRAPH_MAX_AGE', 300)
+        with cls._lock:
+            graph = cls._graph
+            if graph is None or time.monotonic() - graph.built_at > max_age:
+                graph = cls._graph = cls.load_graph()
+            elif graph.pending_changes > cls.COMPACT_THRESHOLD:
+                graph = cls._graph = graph.compacted()
+            return graph
+
+    @classmethod
+    def invalidate(cls):
+        """Drop the graph so the next call rebuilds it"""
+        with cls._lock:
+            cls._graph = None
+
+    @classmethod
+    def apply_changes(cls, changes):
+        """
+        Apply committed relationship writes to the in-memory graph
+
+        Args:
+            changes: List of (relationship_id, stakeholder_id, related_stakeholder_id,
+                     strength, is_active) tuples; deleted rows have is_active=None
+        """
+        with cls._lock:
+            graph = cls._graph
+            if graph is None:
+                return
+            for edge_id, source, target, strength, is_active in changes:
+                if is_active is False or is_active is None:
+                    graph.remove_edge(edge_id)
+                else:
+                    graph.add_edge(edge_id, source, target, strength)
+
+    @classmethod
+    def get_neighborhood(cls, stakeholder_id, depth=2):
+        """Stakeholders within depth hops, as {stakeholder_id: hops}"""
+        with cls._lock:
+            return cls.get_graph().neighborhood(stakeholder_id, depth)
+
+    @classmethod
+    def get_influence_path(cls, source_id, target_id):
+        """Strongest path between two stakeholders"""
+        with cls._lock:
+            return cls.get_graph().shortest_path(source_id, target_id)
+
+    @classmethod
+    def get_centrality(cls, limit=20):
+        """Top stakeholders by weighted PageRank, as [(stakeholder_id, score)]"""
+        with cls._lock:
+            scores = cls.get_graph().centrality()
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+
+# Track relationship writes per session and apply them once committed
+
+_CHANGES_KEY = 'influence_graph_changes'
+
+
+def _record_change(mapper, connection, target, deleted=False):
+    session = Session.object_session(target)
+    if session is None:
+        return
+    session.info.setdefault(_CHANGES_KEY, []).append((
+        target.id,
+        target.stakeholder_id,
+        target.related_stakeholder_id,
+        target.strength,
+        None if deleted else target.is_active is not False
+    ))
+
+
+@event.listens_for(Relationship, 'after_insert')
+def _relationship_inserted(mapper, connection, target):
+    _record_change(mapper, connection, target)
+
+
+@event.listens_for(Relationship, 'after_update')
+def _relationship_updated(mapper, connection, target):
+    _record_change(mapper, connection, target)
+
+
+@event.listens_for(Relationship, 'after_delete')
+def _relationship_deleted(mapper, connection, target):
+    _record_change(mapper, connection, target, deleted=True)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_committed_changes(session):
+    changes = session.info.pop(_CHANGES_KEY, None)
+    if changes:
+        InfluenceGraphService.apply_changes(changes)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_changes(session, previous_transaction):
+    session.info.pop(_CHANGES_KEY, None)
@@ -0,0 +1,111 @@
+"""
+Search Service - Ranked Full-Text Stakeholder Search
+"""
+import re
+from sqlalchemy import DDL, column, event, func, literal_column, table
+from app.models.stakeholder import Stakeholder
+from app import db
+
+# SQLite: FTS5 index kept in sync with stakeholders by triggers
+_FTS_COLUMNS = 'name, organization, title, notes, tags'
+
+_SQLITE_FTS_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS stakeholders_fts USING fts5("
+    f"{_FTS_COLUMNS}, content='stakeholders', content_rowid='id')",
+    f"CREATE TRIGGER IF NOT EXISTS stakeholders_fts_ai AFTER INSERT ON stakeholders BEGIN "
+    f"INSERT INTO stakeholders_fts(rowid, {_FTS_COLUMNS}) "
+    f"VALUES (new.id, new.name, new.organization, new.title, new.notes, new.tags); END",
+    f"CREATE TRIGGER IF NOT EXISTS stakeholders_fts_ad AFTER DELETE ON stakeholders BEGIN "
+    f"INSERT INTO stakeholders_fts(stakeholders_fts, rowid, {_FTS_COLUMNS}) "
+    f"VALUES ('delete', old.id, old.name, old.organization, old.title, old.notes, old.tags); END",
+    f"CREATE TRIGGER IF NOT EXISTS stakeholders_fts_au AFTER UPDATE ON stakeholders BEGIN "
+    f"INSERT INTO stakeholders_fts(stakeholders_fts, rowid, {_FTS_COLUMNS}) "
+    f"VALUES ('delete', old.id, old.name, old.organization, old.title, old.notes, old.tags); "
+    f"INSERT INTO stakeholders_fts(rowid, {_FTS_COLUMNS}) "
+    f"VALUES (new.id, new.name, new.organization, new.title, new.notes, new.tags); END"
+]
+
+for statement in _SQLITE_FTS_DDL:
+    event.listen(Stakeholder.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+
+# PostgreSQL: trigram operators for the substring fallback indexes
+event.listen(
+    Stakeholder.__table__, 'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
+
+_fts_table = table('stakeholders_fts', column('rowid'), column('rank'))
+
+
+class SearchService:
+    """
+    Business logic for stakeholder search
+
+    PostgreSQL matches the GIN-indexed tsvector over name, organization,
+    title, notes and tags (falling back to trigram-indexed substring
+    matches on name and organization); SQLite uses the FTS5 index.
+    Every search term is prefix matched and results are ranked.
+    """
+
+    @staticmethod
+    def tokenize(term):
+        """Split a search box value into plain word tokens"""
+        return re.findall(r'\w+', term or '', re.UNICODE)
+
+    @staticmethod
+    def _dialect():
+        return db.session.get_bind(mapper=Stakeholder.__mapper__).dialect.name
+
+    @staticmethod
+    def search_stakeholders(query, term):
+        """
+        Restrict and rank a stakeholder query by a search term
+
+        Args:
+            query: Stakeholder query to filter
+            term: Raw search text
+
+        Returns:
+            Filtered query ordered by relevance
+        """
+        tokens = SearchService.tokenize(term)
+        if not tokens:
+            return query
+
+        dialect = SearchService._dialect()
+
+        if dialect == 'postgresql':
+            tsquery = func.to_tsquery(
+                literal_column("'simple'::regconfig"),
+                ' & '.join(f'{t}:*' for t in tokens)
+            )
+            document = Stakeholder.search_vector()
+            return query.filter(
+                db.or_(
+                    document.op('@@')(tsquery),
+                    Stakeholder.name.ilike(f'%{term}%'),
+                    Stakeholder.organization.ilike(f'%{term}%')
+                )
+            ).order_by(func.ts_rank(document, tsquery).desc())
+
+        if dialect == 'sqlite':
+            match = ' '.join(f'"{t}"*' for t in tokens)
+            return query.join(
+                _fts_table, _fts_table.c.rowid == Stakeholder.id
+            ).filter(
+                literal_column('stakeholders_fts').op('MATCH')(match)
+            ).order_by(_fts_table.c.rank)
+
+        return query.filter(
+            db.or_(
+                Stakeholder.name.ilike(f'%{term}%'),
+                Stakeholder.organization.ilike(f'%{term}%')
+            )
+        )
+
+    @staticmethod
+    def rebuild_index():
+        """Repopulate the SQLite FTS index from the stakeholders table"""
+        if SearchService._dialect() == 'sqlite':
+            db.session.execute(db.text("INSERT INTO stakeholders_fts(stakeholders_fts) VALUES ('rebuild')"))
+            db.session.commit()
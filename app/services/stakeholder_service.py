@@ -3,8 +3,12 @@ Stakeholder Service - Profile Management Business Logic
 """
 from app.models.stakeholder import Stakeholder
 from app.models.interaction import Interaction
+from app.models.task import Task
+from app.models.tag import clean_tags, sync_tag_links
+from app.models.interaction_stats import StakeholderInteractionDaily
 from app import db
 from datetime import datetime, timedelta
+from sqlalchemy import and_, case, distinct, func, update
 
 class StakeholderService:
     """
@@ -12,6 +16,45 @@ class StakeholderService:
     Handles profile updates, sentiment tracking, and relationship health
     """
     
+    # Window and batch size for engagement scoring
+    ENGAGEMENT_WINDOW_DAYS = 30
+    SCORING_CHUNK_SIZE = 1000
+    
+    # Window of interactions feeding relationship health
+    HEALTH_WINDOW_DAYS = 90
+    
+    # Stakeholders read and written per bulk tagging statement
+    TAGGING_CHUNK_SIZE = 1000
+    
+    @staticmethod
+    def score_engagement(interaction_count, positive_count, type_count,
+                         follow_up_count, completed_follow_up_count):
+        """
+        Combine interaction statistics into an engagement score
+        
+        Returns:
+            Float score between 0-10
+        """
+        if not interaction_count:
+            return 0.0
+        
+        # Base score from frequency (0-4 points)
+        frequency_score = min(interaction_count * 0.5, 4.0)
+        
+        # Sentiment score (0-3 points)
+        sentiment_score = (positive_count / interaction_count) * 3.0
+        
+        # Variety score (0-2 points)
+        variety_score = min(type_count * 0.5, 2.0)
+        
+        # Follow-up score (0-1 point)
+        follow_up_score = 0.0
+        if follow_up_count:
+            follow_up_score = (completed_follow_up_count / follow_up_count) * 1.0
+        
+        total_score = frequency_score + sentiment_score + variety_score + follow_up_score
+        return round(total_score, 2)
+    
     @staticmethod
     def calculate_engagement_score(stakeholder_id):
         """
@@ -26,69 +69,134 @@ class StakeholderService:
         Returns:
             Float score between 0-10
         """
-        cutoff_date = datetime.utcnow() - timedelta(days=30)
+        cutoff_date = datetime.utcnow() - timedelta(days=StakeholderService.ENGAGEMENT_WINDOW_DAYS)
         
         interactions = Interaction.query.filter(
             Interaction.stakeholder_id == stakeholder_id,
             Interaction.date >= cutoff_date
         ).all()
         
-        if not interactions:
-            return 0.0
+        follow_ups = [i for i in interactions if i.follow_up_required]
         
-        # Base score from frequency (0-4 points)
-        frequency_score = min(len(interactions) * 0.5, 4.0)
+        return StakeholderService.score_engagement(
+            len(interactions),
+            sum(1 for i in interactions if i.sentiment == 'positive'),
+            len(set(i.interaction_type for i in interactions)),
+            len(follow_ups),
+            sum(1 for i in follow_ups if i.follow_up_completed)
+        )
+    
+    @staticmethod
+    def recalculate_engagement_scores(stakeholder_ids=None):
+        """
+        Recompute and persist engagement scores in bulk
         
-        # Sentiment score (0-3 points)
-        positive_count = sum(1 for i in interactions if i.sentiment == 'positive')
-        sentiment_score = (positive_count / len(interactions)) * 3.0
+        Gathers the same statistics as calculate_engagement_score with one
+        grouped aggregate query per chunk of stakeholders (a single query
+        when scoring everyone) and writes the scores back with bulk UPDATEs.
+        Stakeholders without interactions in the window are reset to 0.
         
-        # Variety score (0-2 points)
-        interaction_types = set(i.interaction_type for i in interactions)
-        variety_score = min(len(interaction_types) * 0.5, 2.0)
+        Args:
+            stakeholder_ids: Optional iterable of ids to limit scoring to
         
-        # Follow-up score (0-1 point)
-        follow_ups = [i for i in interactions if i.follow_up_required]
-        follow_up_score = 0.0
-        if follow_ups:
-            completed = sum(1 for i in follow_ups if i.follow_up_completed)
-            follow_up_score = (completed / len(follow_ups)) * 1.0
+        Returns:
+            Dict mapping stakeholder id to its new non-zero score
+        """
+        cutoff_date = datetime.utcnow() - timedelta(days=StakeholderService.ENGAGEMENT_WINDOW_DAYS)
+        chunk_size = StakeholderService.SCORING_CHUNK_SIZE
         
-        total_score = frequency_score + sentiment_score + variety_score + follow_up_score
-        return round(total_score, 2)
+        if stakeholder_ids is None:
+            chunks = [None]
+        else:
+            ids = list(stakeholder_ids)
+            chunks = [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+        
+        follow_up = Interaction.follow_up_required.is_(True)
+        scores = {}
+        
+        for chunk in chunks:
+            stats = db.session.query(
+                Interaction.stakeholder_id,
+                func.count(Interaction.id),
+                func.sum(case((Interaction.sentiment == 'positive', 1), else_=0)),
+                func.count(distinct(Interaction.interaction_type)),
+                func.sum(case((follow_up, 1), else_=0)),
+                func.sum(case((and_(follow_up, Interaction.follow_up_completed.is_(True)), 1), else_=0))
+            ).filter(
+                Interaction.date >= cutoff_date
+            )
+            if chunk is not None:
+                stats = stats.filter(Interaction.stakeholder_id.in_(chunk))
+            
+            for stakeholder_id, *counts in stats.group_by(Interaction.stakeholder_id):
+                scores[stakeholder_id] = StakeholderService.score_engagement(*counts)
+            
+            # Reset stakeholders that no longer have any recent interaction
+            stale = Stakeholder.query.filter(
+                Stakeholder.engagement_score != 0.0,
+                ~db.session.query(Interaction.id).filter(
+                    Interaction.stakeholder_id == Stakeholder.id,
+                    Interaction.date >= cutoff_date
+                ).exists()
+            )
+            if chunk is not None:
+                stale = stale.filter(Stakeholder.id.in_(chunk))
+            stale.update({Stakeholder.engagement_score: 0.0}, synchronize_session=False)
+        
+        rows = [{'id': sid, 'engagement_score': score} for sid, score in scores.items()]
+        for i in range(0, len(rows), chunk_size):
+            db.session.execute(update(Stakeholder), rows[i:i + chunk_size])
+        
+        db.session.commit()
+        
+        return scores
     
     @staticmethod
-    def update_relationship_health(stakeholder_id):
+    def update_relationship_health(stakeholder_id, commit=True):
         """
         Update stakeholder relationship health based on recent interactions
         Updates influence and interest scores
+        
+        Reads the window from the per-day interaction buckets (at most one
+        row per day) rather than the interactions themselves. Flush any
+        pending interaction writes first so the buckets include them.
+        
+        The window adjustment replaces the one applied by the previous
+        update (kept in interest_adjustment) instead of adding to it, so
+        repeated updates over the same window leave the score unchanged,
+        and an empty window restores the score without adjustment.
+        
+        Args:
+            stakeholder_id: Stakeholder to update
+            commit: Commit the change (False to leave it in the caller's transaction)
         """
         stakeholder = Stakeholder.query.get(stakeholder_id)
         if not stakeholder:
             return None
         
-        # Get recent interactions (90 days)
-        cutoff_date = datetime.utcnow() - timedelta(days=90)
-        interactions = Interaction.query.filter(
-            Interaction.stakeholder_id == stakeholder_id,
-            Interaction.date >= cutoff_date
-        ).all()
+        # Recent interaction totals (90 days)
+        cutoff_day = (datetime.utcnow() - timedelta(days=StakeholderService.HEALTH_WINDOW_DAYS)).date()
+        count, positive_count, impact_total = StakeholderInteractionDaily.window_totals(stakeholder_id, cutoff_day)
         
-        if interactions:
+        interest_adjustment = 0.0
+        if count:
             # Calculate average impact
-            avg_impact = sum(i.impact_on_relationship or 0.0 for i in interactions) / len(interactions)
+            avg_impact = impact_total / count
             
             # Adjust interest score based on interaction sentiment and impact
-            positive_ratio = sum(1 for i in interactions if i.sentiment == 'positive') / len(interactions)
+            positive_ratio = positive_count / count
             interest_adjustment = (positive_ratio - 0.5) * 2.0 + avg_impact
-            
-            # Update interest score (bounded between -10 and 10)
-            new_interest = stakeholder.interest_score + interest_adjustment
-            stakeholder.interest_score = max(-10.0, min(10.0, new_interest))
-            
-            # Recalculate relationship status
-            stakeholder.sentiment = stakeholder.calculate_relationship_status()
-            
+        
+        # Update interest score from its unadjusted base (bounded between -10 and 10)
+        base_interest = stakeholder.interest_score - (stakeholder.interest_adjustment or 0.0)
+        new_interest = max(-10.0, min(10.0, base_interest + interest_adjustment))
+        stakeholder.interest_score = new_interest
+        stakeholder.interest_adjustment = new_interest - base_interest
+        
+        # Recalculate relationship status
+        stakeholder.sentiment = stakeholder.calculate_relationship_status()
+        
+        if commit:
             db.session.commit()
         
         return stakeholder
@@ -99,46 +207,124 @@ class StakeholderService:
         Get high-priority stakeholders that need attention
         Based on influence score, recent interaction frequency, and overdue follow-ups
         """
-        # High influence stakeholders with no recent interactions
-        cutoff_date = datetime.utcnow() - timedelta(days=30)
+        now = datetime.utcnow()
+        cutoff_date = now - timedelta(days=30)
         
-        high_influence = Stakeholder.query.filter(
-            Stakeholder.influence_score >= 7.0
-        ).all()
+        # High influence stakeholders with no recent interactions or
+        # overdue follow-ups, ranked by influence plus outstanding work
+        overdue_follow_ups = db.session.query(
+            Interaction.stakeholder_id,
+            func.count(Interaction.id).label('count')
+        ).filter(
+            Interaction.open_follow_up(),
+            Interaction.follow_up_date < now
+        ).group_by(Interaction.stakeholder_id).subquery()
+        
+        open_tasks = db.session.query(
+            Task.stakeholder_id,
+            func.count(Task.id).label('count')
+        ).filter(
+            Task.status.in_(['open', 'in_progress'])
+        ).group_by(Task.stakeholder_id).subquery()
+        
+        overdue_count = func.coalesce(overdue_follow_ups.c.count, 0)
+        open_task_count = func.coalesce(open_tasks.c.count, 0)
+        no_recent = db.or_(
+            Stakeholder.last_interaction_at.is_(None),
+            Stakeholder.last_interaction_at < cutoff_date
+        )
+        priority_score = (
+            Stakeholder.influence_score
+            + overdue_count * 1.0
+            + open_task_count * 0.5
+        ).label('priority_score')
+        
+        rows = db.session.query(
+            Stakeholder,
+            no_recent.label('no_recent_interaction'),
+            overdue_count.label('overdue_follow_ups'),
+            open_task_count.label('open_tasks'),
+            priority_score
+        ).outerjoin(
+            overdue_follow_ups, overdue_follow_ups.c.stakeholder_id == Stakeholder.id
+        ).outerjoin(
+            open_tasks, open_tasks.c.stakeholder_id == Stakeholder.id
+        ).filter(
+            Stakeholder.influence_score >= 7.0,
+            db.or_(no_recent, overdue_count > 0)
+        ).order_by(
+            priority_score.desc(),
+            Stakeholder.id
+        ).limit(limit).all()
         
         priority_stakeholders = []
-        for stakeholder in high_influence:
-            recent_interactions = Interaction.query.filter(
-                Interaction.stakeholder_id == stakeholder.id,
-                Interaction.date >= cutoff_date
-            ).count()
+        for stakeholder, no_recent_interaction, overdue, tasks, score in rows:
+            reasons = []
+            if no_recent_interaction:
+                reasons.append('High influence, no recent interaction')
+            if overdue:
+                reasons.append(f'{overdue} overdue follow-up(s)')
+            if tasks:
+                reasons.append(f'{tasks} open task(s)')
             
-            if recent_interactions == 0:
-                priority_stakeholders.append({
-                    'stakeholder': stakeholder.to_dict(),
-                    'reason': 'High influence, no recent interaction',
-                    'priority_score': stakeholder.influence_score
-                })
-        
-        # Sort by priority score
-        priority_stakeholders.sort(key=lambda x: x['priority_score'], reverse=True)
+            priority_stakeholders.append({
+                'stakeholder': stakeholder.to_dict(),
+                'reason': '; '.join(reasons),
+                'priority_score': round(score, 2),
+                'overdue_follow_ups': overdue,
+                'open_tasks': tasks
+            })
         
-        return priority_stakeholders[:limit]
+        return priority_stakeholders
     
     @staticmethod
     def bulk_update_tags(stakeholder_ids, tags_to_add=None, tags_to_remove=None):
-        """Bulk update tags for multiple stakeholders"""
-        stakeholders = Stakeholder.query.filter(Stakeholder.id.in_(stakeholder_ids)).all()
+        """
+        Bulk update tags for multiple stakeholders
+        
+        Works through the ids in chunks: each chunk reads only (id, tags),
+        writes the changed rows in one executemany UPDATE by primary key
+        and rewrites their tag links, without loading ORM objects.
+        
+        Args:
+            stakeholder_ids: Stakeholder ids to update
+            tags_to_add: Tags appended when missing
+            tags_to_remove: Tags removed when present
         
-        for stakeholder in stakeholders:
-            if tags_to_add:
-                for tag in tags_to_add:
-                    stakeholder.add_tag(tag)
+        Returns:
+            Dict with matched (existing stakeholders) and updated (rows
+            whose tags changed) counts
+        """
+        tags_to_add = clean_tags(tags_to_add)
+        remove = set(tags_to_remove or [])
+        ids = sorted(set(stakeholder_ids))
+        chunk_size = StakeholderService.TAGGING_CHUNK_SIZE
+        
+        matched = updated = 0
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            rows = db.session.execute(
+                db.select(Stakeholder.id, Stakeholder.tags).where(Stakeholder.id.in_(chunk))
+            ).all()
+            matched += len(rows)
+            
+            now = datetime.utcnow()
+            changes = []
+            for stakeholder_id, tags in rows:
+                current = list(tags or [])
+                new_tags = [t for t in current if t not in remove]
+                new_tags.extend(t for t in tags_to_add if t not in new_tags)
+                if new_tags != current:
+                    changes.append({'id': stakeholder_id, 'tags': new_tags, 'updated_at': now})
             
-            if tags_to_remove:
-                for tag in tags_to_remove:
-                    stakeholder.remove_tag(tag)
+            if changes:
+                db.session.execute(update(Stakeholder), changes)
+                sync_tag_links(
+                    db.session.connection(), Stakeholder,
+                    {row['id']: row['tags'] for row in changes}
+                )
+                updated += len(changes)
         
         db.session.commit()
         
-        return len(stakeholders)
+        return {'matched': matched, 'updated': updated}
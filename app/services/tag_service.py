@@ -0,0 +1,98 @@
+"""
+Tag Service - Indexed Tag Filtering and Facets
+"""
+from sqlalchemy import distinct, func
+from app.models.tag import Tag, TAG_LINKS, sync_tag_links
+from app import db
+
+class InvalidTagMatchError(ValueError):
+    """Raised for a tag_match other than 'all' or 'any'"""
+
+class TagService:
+    """
+    Business logic for tag queries
+    Filters and facet counts run against the indexed tag link tables
+    """
+    
+    # Objects resynchronized per statement batch when backfilling links
+    BACKFILL_CHUNK_SIZE = 1000
+    
+    @staticmethod
+    def filter_by_tags(query, model, tags, match='all'):
+        """
+        Restrict a query to objects carrying the given tags
+        
+        Args:
+            query: Query over model
+            model: Tagged model class
+            tags: Tag names to filter on
+            match: 'all' to require every tag, 'any' for at least one
+        
+        Raises:
+            InvalidTagMatchError: match is neither 'all' nor 'any'
+        """
+        if match not in ('all', 'any'):
+            raise InvalidTagMatchError("tag_match must be 'all' or 'any'")
+        tags = set(tags)
+        if not tags:
+            return query
+        
+        link, entity_column = TAG_LINKS[model]
+        tagged = db.select(entity_column).join(
+            Tag, Tag.id == link.c.tag_id
+        ).where(Tag.name.in_(tags))
+        
+        if match == 'all' and len(tags) > 1:
+            tagged = tagged.group_by(entity_column).having(
+                func.count(distinct(link.c.tag_id)) == len(tags)
+            )
+        
+        return query.filter(model.id.in_(tagged))
+    
+    @staticmethod
+    def facet_counts(model, query=None, limit=50):
+        """
+        Count objects per tag
+        
+        Args:
+            model: Tagged model class
+            query: Optional filtered query over model to count within
+            limit: Maximum number of tags returned
+        
+        Returns:
+            List of {'tag': name, 'count': n}, most used first
+        """
+        link, entity_column = TAG_LINKS[model]
+        count = func.count(entity_column).label('count')
+        
+        facets = db.session.query(Tag.name, count).join(
+            link, link.c.tag_id == Tag.id
+        )
+        if query is not None:
+            facets = facets.filter(entity_column.in_(
+                query.with_entities(model.id).order_by(None).subquery()
+            ))
+        
+        rows = facets.group_by(Tag.name).order_by(count.desc(), Tag.name).limit(limit).all()
+        return [{'tag': name, 'count': n} for name, n in rows]
+    
+    @staticmethod
+    def backfill_links(model):
+        """
+        Rebuild the tag links of every object from its JSON tags
+        
+        Returns:
+            Number of objects processed
+        """
+        chunk_size = TagService.BACKFILL_CHUNK_SIZE
+        rows = db.session.execute(
+            db.select(model.id, model.tags).order_by(model.id).execution_options(yield_per=chunk_size)
+        )
+        
+        processed = 0
+        for partition in rows.partitions():
+            sync_tag_links(db.session.connection(), model, {oid: tags or [] for oid, tags in partition})
+            processed += len(partition)
+        
+        db.session.commit()
+        return processed
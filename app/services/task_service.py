@@ -2,9 +2,16 @@
 Task Service - Todoist-style Task Management Business Logic
 """
 from app.models.task import Task
+from app.models.interaction import Interaction
 from app.models.user import User
+from app.models.stakeholder import Stakeholder
+from app.models.campaign import Campaign
+from app.models.tag import InvalidTagsError, clean_tags, sync_tag_links
 from app import db
-from datetime import datetime, timedelta
+from app.caching import cached_until
+from datetime import datetime, timedelta, timezone
+from dateutil.parser import isoparse
+from sqlalchemy import and_, case, func, insert, update
 
 class TaskService:
     """
@@ -12,38 +19,49 @@ class TaskService:
     Todoist-inspired simple and effective task tracking
     """
     
+    # Tasks written per bulk statement
+    BULK_CHUNK_SIZE = 1000
+    
+    # Foreign key fields of bulk-written tasks and the models they reference
+    BULK_REFERENCES = {
+        'assigned_to': User,
+        'stakeholder_id': Stakeholder,
+        'campaign_id': Campaign
+    }
+    
     @staticmethod
     def get_user_task_dashboard(user_id):
         """
         Get comprehensive task dashboard for user
         Includes overdue, today, upcoming, and completed tasks
+        
+        Active tasks due within the week are fetched once (using the
+        assigned_to/status/due_date index) and bucketed with a CASE
+        expression; recently completed tasks are a second query.
         """
         now = datetime.utcnow()
         today_end = now.replace(hour=23, minute=59, second=59)
         week_end = now + timedelta(days=7)
         
-        # Overdue tasks
-        overdue = Task.query.filter(
-            Task.assigned_to == user_id,
-            Task.status.in_(['open', 'in_progress']),
-            Task.due_date < now
-        ).order_by(Task.due_date.asc()).all()
-        
-        # Today's tasks
-        today = Task.query.filter(
-            Task.assigned_to == user_id,
-            Task.status.in_(['open', 'in_progress']),
-            Task.due_date >= now,
-            Task.due_date <= today_end
-        ).order_by(Task.priority.desc()).all()
+        bucket = case(
+            (Task.due_date < now, 'overdue'),
+            (Task.due_date <= today_end, 'today'),
+            else_='this_week'
+        ).label('bucket')
         
-        # This week's tasks
-        this_week = Task.query.filter(
+        active = db.session.query(Task, bucket).filter(
             Task.assigned_to == user_id,
             Task.status.in_(['open', 'in_progress']),
-            Task.due_date > today_end,
             Task.due_date <= week_end
-        ).order_by(Task.due_date.asc()).all()
+        ).order_by(Task.due_date.asc(), Task.id.asc()).all()
+        
+        buckets = {'overdue': [], 'today': [], 'this_week': []}
+        for task, name in active:
+            buckets[name].append(task)
+        
+        overdue = buckets['overdue']
+        today = sorted(buckets['today'], key=lambda t: t.priority, reverse=True)
+        this_week = buckets['this_week']
         
         # Recently completed
         completed = Task.query.filter(
@@ -64,53 +82,295 @@ class TaskService:
         }
     
     @staticmethod
-    def bulk_assign_tasks(task_ids, user_id):
-        """Bulk assign tasks to user"""
-        tasks = Task.query.filter(Task.id.in_(task_ids)).all()
+    @cached_until('tasks')
+    def latest_passed_due_date():
+        """
+        Most recent due date already passed, read from the due_date index
         
-        for task in tasks:
-            task.assign(user_id)
+        Changes whenever another task falls due, i.e. whenever a task's
+        is_overdue may have turned true without any write. Cached until
+        the next due date passes or tasks change, so the two index reads
+        run once per change rather than once per request.
+        """
+        now = datetime.utcnow()
+        passed = db.session.query(func.max(Task.due_date)).filter(Task.due_date < now).scalar()
+        upcoming = db.session.query(func.min(Task.due_date)).filter(Task.due_date >= now).scalar()
+        return passed, upcoming
+    
+    @staticmethod
+    def _chunks(values, size):
+        for start in range(0, len(values), size):
+            yield values[start:start + size]
+    
+    @staticmethod
+    def _parse_due_date(value):
+        if value is None or isinstance(value, datetime):
+            return value
+        value = isoparse(value)
+        # Stored timestamps are naive UTC
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+    
+    @staticmethod
+    def _existing_ids(model, ids):
+        """Subset of ids with a row in model's table (one IN query per chunk)"""
+        existing = set()
+        for chunk in TaskService._chunks(list(ids), TaskService.BULK_CHUNK_SIZE):
+            existing.update(db.session.scalars(db.select(model.id).where(model.id.in_(chunk))))
+        return existing
+    
+    @staticmethod
+    def bulk_create_tasks(items, created_by):
+        """
+        Bulk create tasks
+        
+        Valid items are inserted in chunks of BULK_CHUNK_SIZE with one
+        executemany INSERT per chunk; invalid items are reported and
+        skipped without failing the rest. Referenced users, stakeholders
+        and campaigns are looked up once per call, and items referencing
+        a missing one are reported rather than failing the INSERT.
+        
+        Args:
+            items: List of task dicts (same fields as the create endpoint)
+            created_by: Id of the creating user
+        
+        Returns:
+            Dict with created/failed counts and a per-item result list of
+            {'index', 'id'} or {'index', 'error'}
+        """
+        results = [None] * len(items)
+        rows = []
+        now = datetime.utcnow()
+        
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or not item.get('title'):
+                results[index] = {'index': index, 'error': 'Title is required'}
+                continue
+            
+            priority = item.get('priority', 'medium')
+            status = item.get('status', 'open')
+            if priority not in Task.PRIORITIES:
+                results[index] = {'index': index, 'error': f'Invalid priority: {priority}'}
+                continue
+            if status not in Task.STATUSES:
+                results[index] = {'index': index, 'error': f'Invalid status: {status}'}
+                continue
+            
+            try:
+                due_date = TaskService._parse_due_date(item.get('due_date'))
+            except (TypeError, ValueError):
+                results[index] = {'index': index, 'error': 'Invalid due_date'}
+                continue
+            
+            try:
+                tags = clean_tags(item.get('tags'))
+            except InvalidTagsError as exc:
+                results[index] = {'index': index, 'error': str(exc)}
+                continue
+            
+            invalid = [field for field in TaskService.BULK_REFERENCES
+                       if item.get(field) is not None and
+                       (not isinstance(item[field], int) or isinstance(item[field], bool))]
+            if invalid:
+                results[index] = {'index': index, 'error': f'{invalid[0]} must be an id'}
+                continue
+            
+            rows.append((index, {
+                'title': item['title'],
+                'description': item.get('description'),
+                'status': status,
+                'priority': priority,
+                'assigned_to': item.get('assigned_to'),
+                'created_by': created_by,
+                'stakeholder_id': item.get('stakeholder_id'),
+                'campaign_id': item.get('campaign_id'),
+                'due_date': due_date,
+                'completed_at': now if status == 'completed' else None,
+                'tags': tags,
+                'created_at': now,
+                'updated_at': now
+            }))
+        
+        for field, model in TaskService.BULK_REFERENCES.items():
+            ids = {row[field] for _, row in rows if row[field] is not None}
+            if not ids:
+                continue
+            missing = ids - TaskService._existing_ids(model, ids)
+            for index, row in rows:
+                if row[field] in missing:
+                    results[index] = {'index': index, 'error': f'{field} {row[field]} does not exist'}
+            rows = [(index, row) for index, row in rows if row[field] not in missing]
+        
+        for chunk in TaskService._chunks(rows, TaskService.BULK_CHUNK_SIZE):
+            ids = db.session.scalars(
+                insert(Task).returning(Task.id, sort_by_parameter_order=True),
+                [row for _, row in chunk]
+            ).all()
+            
+            tags_by_id = {}
+            for (index, row), task_id in zip(chunk, ids):
+                results[index] = {'index': index, 'id': task_id}
+                if row['tags']:
+                    tags_by_id[task_id] = row['tags']
+            sync_tag_links(db.session.connection(), Task, tags_by_id)
         
         db.session.commit()
         
-        return len(tasks)
+        created = len(rows)
+        return {'created': created, 'failed': len(items) - created, 'results': results}
     
     @staticmethod
-    def bulk_complete_tasks(task_ids):
-        """Bulk complete tasks"""
-        tasks = Task.query.filter(Task.id.in_(task_ids)).all()
+    def _bulk_update(task_ids, values, changed=None):
+        """
+        Apply one UPDATE per chunk of task ids
         
-        for task in tasks:
-            task.complete()
+        Args:
+            task_ids: Task ids to update
+            values: Column values to set
+            changed: Optional condition selecting the rows that actually
+                need the update; the others are reported as unchanged
+        
+        Returns:
+            Dict with updated/unchanged/not_found counts and per-id results
+        """
+        ids = list(dict.fromkeys(task_ids))
+        values = dict(values, updated_at=datetime.utcnow())
+        outcome = {}
+        
+        for chunk in TaskService._chunks(ids, TaskService.BULK_CHUNK_SIZE):
+            needs_update = changed if changed is not None else db.true()
+            existing = db.session.execute(
+                db.select(Task.id, needs_update).where(Task.id.in_(chunk))
+            ).all()
+            
+            to_update = [task_id for task_id, needs in existing if needs]
+            outcome.update({task_id: 'unchanged' for task_id, needs in existing if not needs})
+            
+            if to_update:
+                db.session.execute(
+                    update(Task).where(Task.id.in_(to_update)).values(**values),
+                    execution_options={'synchronize_session': False}
+                )
+                outcome.update({task_id: 'updated' for task_id in to_update})
+                if values.get('status') == 'completed':
+                    # The UPDATE skips the flush hook completing follow-ups
+                    Interaction.complete_follow_ups(db.session, db.select(Task.interaction_id).where(
+                        Task.id.in_(to_update), Task.interaction_id.isnot(None)
+                    ))
         
         db.session.commit()
         
-        return len(tasks)
+        results = [{'id': task_id, 'result': outcome.get(task_id, 'not_found')} for task_id in ids]
+        counts = {'updated': 0, 'unchanged': 0, 'not_found': 0}
+        for item in results:
+            counts[item['result']] += 1
+        return {**counts, 'results': results}
+    
+    @staticmethod
+    def bulk_assign_tasks(task_ids, user_id):
+        """
+        Bulk assign tasks to user
+        
+        Raises:
+            ValueError: When the user does not exist
+        """
+        if not TaskService._existing_ids(User, [user_id]):
+            raise ValueError(f'User {user_id} does not exist')
+        
+        return TaskService._bulk_update(
+            task_ids,
+            {'assigned_to': user_id},
+            changed=db.or_(Task.assigned_to.is_(None), Task.assigned_to != user_id)
+        )
+    
+    @staticmethod
+    def bulk_update_status(task_ids, status):
+        """
+        Bulk change task status
+        
+        Mirrors Task.complete()/reopen(): completing stamps completed_at,
+        reopening clears it, and tasks already in the status are left as is.
+        """
+        if status not in Task.STATUSES:
+            raise ValueError(f'Invalid status: {status}')
+        
+        values = {'status': status}
+        if status == 'completed':
+            values['completed_at'] = datetime.utcnow()
+        elif status == 'open':
+            values['completed_at'] = None
+        
+        return TaskService._bulk_update(task_ids, values, changed=Task.status != status)
     
     @staticmethod
-    def get_team_workload_distribution():
+    def bulk_complete_tasks(task_ids):
+        """Bulk complete tasks"""
+        return TaskService.bulk_update_status(task_ids, 'completed')
+    
+    @staticmethod
+    def get_team_workload_distribution(by_priority=False, by_campaign=False):
         """
         Get workload distribution across team members
+        
+        Open and overdue counts (and the optional per-priority breakdown)
+        come from one grouped query with conditional aggregation; the
+        per-campaign breakdown adds a single grouped query.
+        
+        Args:
+            by_priority: Include open task counts per priority
+            by_campaign: Include open task counts per campaign
         """
-        users = User.query.filter_by(is_active=True).all()
+        now = datetime.utcnow()
+        active = Task.status.in_(['open', 'in_progress'])
         
-        distribution = []
-        for user in users:
-            open_tasks = Task.query.filter(
-                Task.assigned_to == user.id,
-                Task.status.in_(['open', 'in_progress'])
-            ).count()
-            
-            overdue_tasks = Task.query.filter(
-                Task.assigned_to == user.id,
-                Task.status.in_(['open', 'in_progress']),
-                Task.due_date < datetime.utcnow()
-            ).count()
+        columns = [
+            User,
+            func.count(Task.id).label('open_tasks'),
+            func.coalesce(func.sum(case((Task.due_date < now, 1), else_=0)), 0).label('overdue_tasks')
+        ]
+        if by_priority:
+            columns += [
+                func.coalesce(func.sum(case((Task.priority == priority, 1), else_=0)), 0).label(priority)
+                for priority in Task.PRIORITIES
+            ]
+        
+        rows = db.session.query(*columns).outerjoin(
+            Task, and_(Task.assigned_to == User.id, active)
+        ).filter(
+            User.is_active.is_(True)
+        ).group_by(User.id).order_by(User.id).all()
+        
+        campaigns = {}
+        if by_campaign:
+            campaign_counts = db.session.query(
+                Task.assigned_to,
+                Task.campaign_id,
+                func.count(Task.id)
+            ).join(
+                User, User.id == Task.assigned_to
+            ).filter(
+                active,
+                User.is_active.is_(True)
+            ).group_by(Task.assigned_to, Task.campaign_id).all()
             
-            distribution.append({
+            for user_id, campaign_id, count in campaign_counts:
+                campaigns.setdefault(user_id, []).append({
+                    'campaign_id': campaign_id,
+                    'open_tasks': count
+                })
+        
+        distribution = []
+        for user, open_tasks, overdue_tasks, *priority_counts in rows:
+            entry = {
                 'user': user.to_dict(),
                 'open_tasks': open_tasks,
                 'overdue_tasks': overdue_tasks
-            })
+            }
+            if by_priority:
+                entry['by_priority'] = dict(zip(Task.PRIORITIES, priority_counts))
+            if by_campaign:
+                entry['by_campaign'] = campaigns.get(user.id, [])
+            distribution.append(entry)
         
         return distribution
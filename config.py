@@ -24,6 +24,16 @@ class Config:
     # Redis settings
     REDIS_URL = os.environ.get('REDIS_URL') or 'redis://localhost:6379/0'
     
+    # Cache settings (Flask-Caching)
+    CACHE_ENABLED = True
+    CACHE_TYPE = 'RedisCache'
+    CACHE_REDIS_URL = REDIS_URL
+    CACHE_KEY_PREFIX = 'stakeholder:'
+    CACHE_DEFAULT_TIMEOUT = 300
+    
+    # JSON encoding: 'orjson', 'stdlib', or 'auto' (orjson when installed)
+    JSON_BACKEND = os.environ.get('JSON_BACKEND') or 'auto'
+    
     # CORS settings
     CORS_HEADERS = 'Content-Type'
     
@@ -31,6 +41,24 @@ class Config:
     DEFAULT_PAGE_SIZE = 50
     MAX_PAGE_SIZE = 100
     
+    # Background jobs (see app/jobs.py)
+    JOBS_ENABLED = True
+    JOBS_BACKEND = 'redis'
+    JOBS_REDIS_URL = REDIS_URL
+    JOBS_KEY_PREFIX = 'stakeholder:jobs:'
+    JOBS_MAX_ATTEMPTS = 3
+    JOBS_RETRY_DELAY = 30  # seconds, doubled on each retry
+    JOBS_RESULT_TTL = 86400  # seconds finished jobs stay visible
+    JOBS_VISIBILITY_TIMEOUT = 600  # seconds before an abandoned job is requeued
+    JOBS_SCHEDULE = [
+        {'name': 'stakeholder.engagement', 'interval': 3600},
+        {'name': 'analytics.warm', 'interval': 300},
+        {'name': 'follow_ups.scan', 'interval': 900}
+    ]
+    
+    # Influence graph (seconds before the in-memory graph is reloaded)
+    INFLUENCE_GRAPH_MAX_AGE = 300
+    
     # File upload settings
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = os.path.join(os.getcwd(), 'uploads')
@@ -65,6 +93,11 @@ class TestingConfig(Config):
     # Use SQLite for testing
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     
+    # In-process cache and job queue instead of Redis
+    CACHE_TYPE = 'SimpleCache'
+    JOBS_BACKEND = 'memory'
+    JOBS_SCHEDULE = []
+    
     # Disable CSRF for testing
     WTF_CSRF_ENABLED = False
 